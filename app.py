@@ -3,27 +3,50 @@ from flask import Flask
 from dash import Dash
 import dash_bootstrap_components as dbc
 from flask_login import LoginManager
-import pandas as pd # Adicionado para o caso de o df falhar
-import sys # Adicionado para o caso de o df falhar
+import os
 
 # Importações dos seus módulos
 import database
-from logic.data_processing import load_and_prepare_data
+from logic.dataset import get_dataset
 from config import SECRET_KEY
 from components.layout import create_main_layout, create_error_layout
 from logic.callbacks import register_callbacks
+from logic.compression import register_response_hooks
+from logic.metrics import instrument_callbacks, register_metrics_route
+from logic.export import register_export_routes
+from logic.api import register_api_routes
+from components.header import TOPBAR_NAV_ITEMS
+
+def serve_layout():
+    """
+    Layout servido a cada carregamento de página. Os dados só são carregados aqui,
+    no primeiro uso, e não no import do módulo (cold start rápido em serverless).
+    """
+    try:
+        dataset = get_dataset()
+        return create_main_layout(dataset.df)
+    except Exception as e:
+        # Se ocorrer QUALQUER erro durante o carregamento, exibe uma página de erro segura.
+        # A próxima requisição tenta carregar novamente.
+        print(f"ERRO FATAL AO CARREGAR OS DADOS: {e}")
+        return create_error_layout(str(e))
 
 # Função única para criar a instância da aplicação
 def create_app_instance():
     """
-    Cria e configura as instâncias do Flask e do Dash,
-    incluindo tratamento de erros no carregamento de dados.
+    Cria e configura as instâncias do Flask e do Dash. Não carrega dados:
+    o carregamento é adiado para o primeiro uso (ver logic/dataset.py).
     """
     flask_server = Flask(__name__)
     flask_server.config.update(SECRET_KEY=SECRET_KEY)
-    
-    with flask_server.app_context():
-        database.init_db()
+    register_response_hooks(flask_server)  # gzip/brotli + cache de assets com fingerprint
+
+    # As migrações rodam fora do boot (`python database.py migrate`); aqui só uma checagem barata.
+    if os.getenv("SCHEMA_CHECK_ON_BOOT", "1") != "0":
+        try:
+            database.check_schema_version()
+        except Exception as e:
+            print(f"AVISO: não foi possível verificar a versão do esquema: {e}")
 
     dash_app = Dash(__name__, server=flask_server,
                     external_stylesheets=[
@@ -32,7 +55,7 @@ def create_app_instance():
                     ],
                     suppress_callback_exceptions=True)
     dash_app.title = "FleetMaster"
-    
+
     # Configuração do Flask-Login
     login_manager = LoginManager()
     login_manager.init_app(flask_server)
@@ -41,29 +64,19 @@ def create_app_instance():
     @login_manager.user_loader
     def load_user(user_id):
         return database.get_user_by_id(user_id)
-    
-    try:
-        # 1. Tenta carregar os dados
-        df = load_and_prepare_data()
 
-        # 2. Verificação crucial (opcional, mas recomendado)
-        if not isinstance(df, pd.DataFrame) or df.empty:
-            raise ValueError("A função load_and_prepare_data() retornou um DataFrame vazio ou inválido.")
+    dash_app.layout = serve_layout
+    register_callbacks(dash_app)
 
-        # 3. Se os dados forem carregados com sucesso, cria o layout principal
-        print("Dados carregados com sucesso. Construindo layout principal...")
-        dash_app.layout = create_main_layout(df)
-        register_callbacks(dash_app, df)
-
-    except Exception as e:
-        # 4. Se ocorrer QUALQUER erro durante o carregamento, captura a exceção
-        print(f"ERRO FATAL AO CARREGAR OS DADOS: {e}")
-        
-        # 5. Em vez de quebrar, exibe uma página de erro segura
-        dash_app.layout = create_error_layout(str(e))
-        # Callbacks não são registrados, pois não há dados para eles
+    # Tempo, CPU e tamanho de payload de cada callback, expostos em /metrics
+    instrument_callbacks(dash_app, known_pages=[item['href'] for item in TOPBAR_NAV_ITEMS] + ['/login', '/logout'])
+    register_metrics_route(flask_server)
+    # Exportação CSV/XLSX das viagens filtradas e da matriz (streaming, login obrigatório)
+    register_export_routes(flask_server)
+    # API de agregados para BI (JSON/CSV com ETag; sessão ou HTTP Basic)
+    register_api_routes(flask_server, login_manager)
 
     return dash_app, flask_server
 
 
-app, server = create_app_instance()
\ No newline at end of file
+app, server = create_app_instance()
@@ -0,0 +1,332 @@
+# bench/loadtest.py
+"""
+Teste de carga local: N supervisores simultâneos contra os endpoints do Dash.
+
+Cada usuário simulado abre a página, faz login pelo callback handle_login e repete uma
+sequência realista de callbacks em /_dash-update-component:
+  navegação (Análise Geral, Matriz, Eficiência), mudança de filtros, limpar filtros.
+A paginação da matriz é nativa do DataTable (no navegador, sem callback); por isso ela
+entra como tempo de leitura na página da matriz, não como requisição.
+
+Modo padrão (offline): sobe o app no próprio processo sobre o dataset sintético
+(bench/synthetic.py via LOCAL_DATA_DIR) e com um usuário em memória, sem Postgres.
+Com --url, ataca um servidor já rodando (use --username/--password de um usuário real).
+
+Relata vazão e latência p50/p95/p99 por callback.
+
+Uso:
+    python bench/loadtest.py --users 12 --iterations 5
+    python bench/loadtest.py --size 1m --users 24 --think-ms 200
+    python bench/loadtest.py --url http://localhost:8050 --username admin --password ...
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+
+import numpy as np
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from bench.synthetic import ensure_dataset, parse_size, DEFAULT_SEED  # noqa: E402
+
+LOADTEST_USERNAME = 'carga'
+LOADTEST_PASSWORD = 'carga123'
+DATA_PAGES = ['/', '/matrix', '/efficiency']
+RENDER_OUTPUTS = [('page-content-container', 'children'), ('filter-panel-wrapper', 'style'), ('page-content-col', 'md')]
+FILTER_INPUTS = [('date-picker-range', 'start_date'), ('date-picker-range', 'end_date'),
+                 ('empresa-dropdown', 'value'), ('destino-dropdown', 'value'), ('material-dropdown', 'value'),
+                 ('placa-dropdown', 'value'), ('cliente-dropdown', 'value')]
+CLEAR_OUTPUTS = [('filtered-data-store', 'data')] + FILTER_INPUTS
+
+
+# --- Servidor local (modo offline) ---
+
+def start_local_server(size, seed, port):
+    """Sobe o app sobre o dataset sintético, com um usuário em memória no lugar do Postgres."""
+    os.environ["LOCAL_DATA_DIR"] = ensure_dataset(size, seed)
+    os.environ.setdefault("SCHEMA_CHECK_ON_BOOT", "0")
+
+    import database
+    from werkzeug.security import generate_password_hash
+    from werkzeug.serving import make_server, WSGIRequestHandler
+
+    # Apenas para o teste de carga: usuário em memória, sem banco
+    user = database.User(1, LOADTEST_USERNAME, generate_password_hash(LOADTEST_PASSWORD), True)
+    database.get_user_by_username = lambda username: user if username == user.username else None
+    database.get_user_by_id = lambda user_id: user if str(user_id) == '1' else None
+
+    import app as dash_module
+    from logic.dataset import get_dataset
+    get_dataset()  # aquece a carga antes de medir
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass  # uma linha por requisição esconderia o relatório
+
+    server = make_server('127.0.0.1', port, dash_module.server, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+# --- Cliente Dash ---
+
+def _output_spec(outputs):
+    if len(outputs) == 1:
+        component_id, prop = outputs[0]
+        return f"{component_id}.{prop}", {'id': component_id, 'property': prop}
+    joined = "...".join(f"{component_id}.{prop}" for component_id, prop in outputs)
+    return f"..{joined}..", [{'id': component_id, 'property': prop} for component_id, prop in outputs]
+
+
+def _plain_output(output):
+    """Remove o sufixo '@<hash>' que o Dash acrescenta às saídas com allow_duplicate."""
+    return ".".join(part.split('@')[0] for part in output.split('.'))
+
+
+class DashClient:
+    def __init__(self, base_url, stats):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        self.outputs = {}  # string de saída "limpa" -> string registrada no servidor
+
+    def load_dependencies(self):
+        status, body = self.get('dependencies', '/_dash-dependencies')
+        if status == 200:
+            for dep in json.loads(body):
+                plain = _plain_output(dep['output'])
+                if dep['output'] == plain:
+                    self.outputs[plain] = plain  # registro exato tem prioridade sobre allow_duplicate
+                else:
+                    self.outputs.setdefault(plain, dep['output'])
+
+    def _request(self, name, path, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, headers={
+            'Content-Type': 'application/json', 'Accept-Encoding': 'identity'
+        })
+        start = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=120) as response:
+                body = response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            body, status = e.read(), e.code
+        except Exception:
+            body, status = b'', 0
+        self.stats.record(name, time.perf_counter() - start, status, len(body))
+        return status, body
+
+    def get(self, name, path):
+        return self._request(name, path)
+
+    def callback(self, name, outputs, inputs, state=(), changed=None):
+        output, outputs_payload = _output_spec(outputs)
+        output = self.outputs.get(output, output)
+        payload = {
+            'output': output,
+            'outputs': outputs_payload,
+            'inputs': [{'id': component_id, 'property': prop, 'value': value} for (component_id, prop), value in inputs],
+            'state': [{'id': component_id, 'property': prop, 'value': value} for (component_id, prop), value in state],
+            'changedPropIds': changed or [f"{inputs[0][0][0]}.{inputs[0][0][1]}"],
+        }
+        status, body = self._request(name, '/_dash-update-component', payload)
+        if status != 200 or not body:
+            return None
+        result = json.loads(body)
+        if 'cacheKey' in result:
+            return self._poll_background(name, payload, result)
+        return result.get('response', {})
+
+    def _poll_background(self, name, payload, job, poll_s=0.25, timeout_s=300):
+        """Callback em segundo plano: consulta o job até a resposta final (conta como uma requisição)."""
+        start = time.perf_counter()
+        path = f"/_dash-update-component?cacheKey={job['cacheKey']}&job={job['job']}"
+        while time.perf_counter() - start < timeout_s:
+            time.sleep(poll_s)
+            status, body = self._request(f"{name}_poll", path, payload)
+            if status != 200:
+                break
+            result = json.loads(body) if body else {}
+            if result.get('response'):  # pode vir junto com a última atualização de progresso
+                self.stats.record(f"{name}_job", time.perf_counter() - start, 200, len(body))
+                return result['response']
+        self.stats.record(f"{name}_job", time.perf_counter() - start, 0, 0)
+        return None
+
+
+# --- Métricas ---
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.bytes = defaultdict(int)
+
+    def record(self, name, elapsed, status, size):
+        with self._lock:
+            self.latencies[name].append(elapsed)
+            self.bytes[name] += size
+            if status != 200:
+                self.errors[name] += 1
+
+    def report(self, wall_time):
+        total = sum(len(values) for values in self.latencies.values())
+        print(f"\n{total} requisições em {wall_time:.1f}s -> {total / wall_time:.1f} req/s")
+        print(f"{'callback':<22}{'n':>6}{'erros':>7}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'KB médio':>10}")
+        for name in sorted(self.latencies):
+            values = np.array(self.latencies[name]) * 1000
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            average_kb = self.bytes[name] / len(values) / 1024
+            print(f"{name:<22}{len(values):>6}{self.errors[name]:>7}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}{average_kb:>10.1f}")
+        return sum(self.errors.values())
+
+
+# --- Sequência de um supervisor ---
+
+def _find_props(layout, component_id):
+    """Procura as props de um componente no JSON do layout."""
+    stack = [layout]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            props = node.get('props', {})
+            if isinstance(props, dict) and props.get('id') == component_id:
+                return props
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return None
+
+
+def _find_options(layout, component_id):
+    """Opções de um dropdown no JSON do layout."""
+    props = _find_props(layout, component_id) or {}
+    return [option['value'] for option in props.get('options') or []]
+
+
+def simulate_user(base_url, username, password, iterations, think_s, date_bounds, stats, seed):
+    rng = random.Random(seed)
+    client = DashClient(base_url, stats)
+    client.get('index', '/')
+    status, body = client.get('layout', '/_dash-layout')
+    layout = json.loads(body) if status == 200 else {}
+    options = {component_id: _find_options(layout, component_id)
+               for component_id in ('empresa-dropdown', 'destino-dropdown', 'material-dropdown', 'cliente-dropdown')}
+    client.load_dependencies()
+
+    client.callback('handle_login', [('url', 'pathname'), ('login-output', 'children')],
+                    [(('login-button', 'n_clicks'), 1)],
+                    state=[(('username-input', 'value'), username), (('password-input', 'value'), password),
+                           (('remember-me-checkbox', 'value'), [])])
+
+    def render(pathname, token):
+        response = client.callback('render_page', RENDER_OUTPUTS, [
+            (('url', 'pathname'), pathname), (('filtered-data-store', 'data'), token),
+            (('filter-toggle-store', 'data'), {'is_hidden': False}),
+        ])
+        # Página pesada: o servidor devolve um placeholder e o cálculo roda como job
+        page = (response or {}).get('page-content-container', {}).get('children')
+        request = _find_props(page, 'background-page-request')
+        if request is not None:
+            client.callback('background_page', [('background-page-body', 'children')],
+                            [(('background-page-request', 'data'), request.get('data'))])
+
+    token = None
+    for _ in range(iterations):
+        for pathname in DATA_PAGES:
+            render(pathname, token)
+            time.sleep(think_s)
+
+        # Mudança de filtros: período aleatório + algumas seleções
+        start_date = end_date = None
+        if date_bounds:
+            first, last = date_bounds
+            span = max((last - first).days, 1)
+            offset = rng.randrange(span)
+            start_date = str(first.fromordinal(first.toordinal() + offset))
+            end_date = str(first.fromordinal(min(first.toordinal() + offset + rng.choice([7, 30, 90]), last.toordinal())))
+        selections = [rng.sample(values, min(len(values), rng.choice([0, 1, 2]))) for values in
+                      (options['empresa-dropdown'], options['destino-dropdown'], options['material-dropdown'])]
+        # Placa: busca por prefixo no servidor; às vezes escolhe uma das placas devolvidas
+        response = client.callback('search_plates', [('placa-dropdown', 'options')],
+                                   [(('placa-dropdown', 'search_value'), chr(65 + rng.randrange(26)))],
+                                   state=[(('placa-dropdown', 'value'), [])])
+        plates = [option['value'] for option in (response or {}).get('placa-dropdown', {}).get('options') or []]
+        selections.append(rng.sample(plates, 1) if plates and rng.random() < 0.3 else [])
+        selections.append(rng.sample(options['cliente-dropdown'], 1) if options['cliente-dropdown'] and rng.random() < 0.3 else [])
+        response = client.callback('update_filters', [('filtered-data-store', 'data')],
+                                   list(zip(FILTER_INPUTS, [start_date, end_date] + selections)))
+        if response:
+            token = response.get('filtered-data-store', {}).get('data', token)
+        render(rng.choice(DATA_PAGES), token)
+        time.sleep(think_s)
+
+        # Matriz: a paginação é local; o usuário só lê a tabela
+        render('/matrix', token)
+        time.sleep(think_s * 3)
+
+        response = client.callback('clear_filters', CLEAR_OUTPUTS, [(('clear-filters-button', 'n_clicks'), 1)])
+        if response:
+            token = response.get('filtered-data-store', {}).get('data', token)
+        render('/', token)
+        time.sleep(think_s)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=12, help="Usuários simultâneos")
+    parser.add_argument('--iterations', type=int, default=3, help="Repetições da sequência por usuário")
+    parser.add_argument('--think-ms', type=float, default=0, help="Pausa entre ações de um usuário")
+    parser.add_argument('--ramp-up-s', type=float, default=1.0, help="Intervalo para iniciar todos os usuários")
+    parser.add_argument('--size', default='100k', help="Tamanho do dataset sintético (modo offline)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--port', type=int, default=0, help="Porta do servidor local (0 = livre)")
+    parser.add_argument('--url', help="Servidor já rodando (desliga o modo offline)")
+    parser.add_argument('--username', default=LOADTEST_USERNAME)
+    parser.add_argument('--password', default=LOADTEST_PASSWORD)
+    args = parser.parse_args(argv)
+
+    server = None
+    date_bounds = None
+    if args.url:
+        base_url = args.url
+    else:
+        server, base_url = start_local_server(parse_size(args.size), args.seed, args.port)
+        from logic.dataset import get_dataset
+        df = get_dataset().df
+        date_bounds = (df['Data_Apenas'].min(), df['Data_Apenas'].max())
+        print(f"Servidor local em {base_url} com {len(df):,} linhas.")
+
+    stats = Stats()
+    threads = []
+    start = time.perf_counter()
+    for index in range(args.users):
+        thread = threading.Thread(target=simulate_user, args=(
+            base_url, args.username, args.password, args.iterations, args.think_ms / 1000,
+            date_bounds, stats, args.seed + index
+        ))
+        thread.start()
+        threads.append(thread)
+        time.sleep(args.ramp_up_s / max(args.users, 1))
+    for thread in threads:
+        thread.join()
+    errors = stats.report(time.perf_counter() - start)
+
+    if server is not None:
+        server.shutdown()
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,211 @@
+# bench/run.py
+"""
+Benchmark do pipeline carga -> filtro -> renderização sobre dados sintéticos.
+
+Para cada tamanho (viagens), mede tempo e pico de memória (RSS) de cada etapa:
+  fetch            leitura das fontes locais (CSV + SQLite no lugar de Sheets/Postgres)
+  prepare          padronização, limpeza e merges (prepare_data)
+  version          hash de conteúdo do dataset (compute_version)
+  filter           update_filtered_data_store: normalização + filtragem de cenários típicos
+  serialize        ida e volta do dataset no formato colunar (logic/serialization.py)
+  analysis_layout  create_analysis_tab_layout sobre o dataset completo
+  matrix_layout    create_matrix_tab_layout sobre o dataset completo
+
+Compara com bench/baseline.json e termina com código 1 se alguma etapa regredir além da
+tolerância. Os caches de resultado são desligados para medir o cálculo em si.
+
+Uso:
+    python bench/run.py                              # tamanhos padrão (10k, 100k)
+    python bench/run.py --sizes 10k,100k,1m,10m
+    python bench/run.py --update-baseline            # grava os resultados como nova referência
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+os.environ.setdefault("CACHE_BACKEND", "none")
+
+from bench.synthetic import ensure_dataset, parse_size, size_label, DEFAULT_SEED  # noqa: E402
+from logic.data_processing import fetch_source_frames, prepare_data  # noqa: E402
+from logic.dataset import compute_version  # noqa: E402
+from logic.filters import normalize_filters, apply_filters  # noqa: E402
+from logic.serialization import encode_frame, decode_frame  # noqa: E402
+from components.tabs.analysis_tab import create_analysis_tab_layout  # noqa: E402
+from components.tabs.matrix_tab import create_matrix_tab_layout  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_SIZES = '10k,100k'
+# Diferenças abaixo destes pisos são ruído de medição, não regressão
+MIN_TIME_DELTA_S = 0.05
+MIN_MEMORY_DELTA_MB = 5.0
+
+
+def filter_scenarios(df):
+    """Cenários típicos do painel: período recente, destinos específicos, empresa, tudo."""
+    last_day = df['Data_Apenas'].max()
+    first_day = df['Data_Apenas'].min()
+    recent_start = max(first_day, last_day - timedelta(days=29))
+    top_destinations = df['Destino'].value_counts().index[:3].tolist()
+    companies = sorted(df['Empresa'].dropna().unique())[:1]
+    return [
+        normalize_filters(recent_start, last_day),
+        normalize_filters(recent_start, last_day, destinos=top_destinations),
+        normalize_filters(first_day, last_day, empresas=companies),
+        normalize_filters(),
+    ]
+
+
+def _read_status_mb(field):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1024
+    raise OSError(field)
+
+
+def _reset_peak_rss():
+    """Zera o pico de RSS do processo (Linux: escrever 5 em /proc/self/clear_refs)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return _read_status_mb('VmRSS')
+    except OSError:
+        return None
+
+
+class StageMeter:
+    """
+    Mede tempo de parede e pico de memória de cada etapa.
+    Em Linux usa o pico de RSS (sem custo na execução); fora dele cai para tracemalloc,
+    que é bem mais lento em código com muitos objetos Python (tempos ficam inflados).
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.use_rss = _reset_peak_rss() is not None
+        if not self.use_rss:
+            tracemalloc.start()
+
+    def close(self):
+        if not self.use_rss:
+            tracemalloc.stop()
+
+    def measure(self, name, fn, *args):
+        gc.collect()
+        if self.use_rss:
+            start_memory = _reset_peak_rss()
+        else:
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        if self.use_rss:
+            peak_memory = _read_status_mb('VmHWM')
+        else:
+            peak_memory = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        self.stages[name] = {
+            'time_s': round(elapsed, 4),
+            'peak_mb': round(max(peak_memory - start_memory, 0), 2),
+        }
+        return result
+
+
+def run_size(n_trips, seed):
+    directory = ensure_dataset(n_trips, seed)
+    meter = StageMeter()
+    try:
+        frames = meter.measure('fetch', fetch_source_frames, directory)
+        df = meter.measure('prepare', prepare_data, *frames)
+        del frames
+        meter.measure('version', compute_version, df)
+        scenarios = filter_scenarios(df)
+        meter.measure('filter', lambda: [apply_filters(df, filters) for filters in scenarios])
+        meter.measure('serialize', lambda: decode_frame(encode_frame(df)))
+        meter.measure('analysis_layout', create_analysis_tab_layout, df, 'dark')
+        meter.measure('matrix_layout', create_matrix_tab_layout, df, 'dark')
+    finally:
+        meter.close()
+    return {'rows': int(len(df)), 'stages': meter.stages}
+
+
+def compare(results, baseline, time_tolerance, memory_tolerance):
+    """Lista as regressões (etapas mais lentas/pesadas que a referência além da tolerância)."""
+    regressions = []
+    for label, result in results.items():
+        reference = baseline.get(label)
+        if not reference:
+            continue
+        for stage, current in result['stages'].items():
+            ref = reference['stages'].get(stage)
+            if not ref:
+                continue
+            time_limit = max(ref['time_s'] * (1 + time_tolerance), ref['time_s'] + MIN_TIME_DELTA_S)
+            if current['time_s'] > time_limit:
+                regressions.append(f"{label}/{stage}: tempo {current['time_s']:.3f}s > limite {time_limit:.3f}s (ref. {ref['time_s']:.3f}s)")
+            memory_limit = max(ref['peak_mb'] * (1 + memory_tolerance), ref['peak_mb'] + MIN_MEMORY_DELTA_MB)
+            if current['peak_mb'] > memory_limit:
+                regressions.append(f"{label}/{stage}: memória {current['peak_mb']:.1f}MB > limite {memory_limit:.1f}MB (ref. {ref['peak_mb']:.1f}MB)")
+    return regressions
+
+
+def print_report(results, baseline):
+    print(f"\n{'tamanho':<9}{'etapa':<18}{'tempo (s)':>11}{'ref. (s)':>11}{'pico (MB)':>11}{'ref. (MB)':>11}")
+    for label, result in results.items():
+        reference = baseline.get(label, {}).get('stages', {})
+        for stage, current in result['stages'].items():
+            ref = reference.get(stage, {})
+            ref_time = f"{ref['time_s']:.3f}" if ref else '-'
+            ref_memory = f"{ref['peak_mb']:.1f}" if ref else '-'
+            print(f"{label:<9}{stage:<18}{current['time_s']:>11.3f}{ref_time:>11}{current['peak_mb']:>11.1f}{ref_memory:>11}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="Tamanhos separados por vírgula (ex.: 10k,100k,1m,10m)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help="Grava os resultados como nova referência")
+    parser.add_argument('--time-tolerance', type=float, default=0.5, help="Folga relativa de tempo (0.5 = +50%%)")
+    parser.add_argument('--memory-tolerance', type=float, default=0.25, help="Folga relativa de memória")
+    parser.add_argument('--output', help="Grava os resultados em JSON neste caminho")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results = {}
+    for n_trips in (parse_size(size) for size in args.sizes.split(',')):
+        label = size_label(n_trips)
+        print(f"--- Benchmark com {n_trips:,} viagens ---")
+        results[label] = run_size(n_trips, args.seed)
+
+    print_report(results, baseline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nReferência atualizada em {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print(f"REGRESSÃO: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+# bench/synthetic.py
+"""
+Gerador determinístico de dados sintéticos no formato das fontes reais.
+
+Produz, num diretório, os mesmos insumos que logic.data_processing.fetch_source_frames()
+lê quando LOCAL_DATA_DIR está definido:
+  - volume.csv     (planilha de Volume: TAG, Data, Hora, Volume com vírgula decimal, Placa, Destino, Material)
+  - frota.csv      (planilha de Frota: Placa, Empresa, Tipo)
+  - pricing.sqlite (tabela 'pricing' com o mesmo esquema do Postgres)
+
+As cardinalidades crescem com o volume de viagens como numa operação real: mais placas,
+destinos e dias de histórico; preços por destino em períodos trimestrais, com lacunas.
+"""
+import os
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SEED = 20240601
+DATA_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.data')
+
+# n_viagens -> (dias de histórico, placas, destinos, empresas)
+PROFILES = [
+    (10_000, (60, 40, 12, 3)),
+    (100_000, (365, 150, 25, 5)),
+    (1_000_000, (730, 400, 40, 8)),
+    (10_000_000, (1095, 800, 60, 10)),
+]
+MATERIALS = ['BRITA 0', 'BRITA 1', 'PO DE PEDRA', 'AREIA', 'RACHAO', 'BICA CORRIDA']
+START_DATE = pd.Timestamp('2023-01-02')
+PRICING_PERIOD_DAYS = 91
+PRICING_GAP_PROBABILITY = 0.1
+
+
+def parse_size(text):
+    """'10k' -> 10000, '1m' -> 1000000."""
+    text = text.strip().lower().replace('_', '')
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+
+def size_label(n_trips):
+    if n_trips >= 1_000_000 and n_trips % 1_000_000 == 0:
+        return f"{n_trips // 1_000_000}m"
+    if n_trips >= 1_000 and n_trips % 1_000 == 0:
+        return f"{n_trips // 1_000}k"
+    return str(n_trips)
+
+
+def profile_for(n_trips):
+    """Perfil de cardinalidades do maior tamanho de referência <= n_trips."""
+    chosen = PROFILES[0][1]
+    for size, profile in PROFILES:
+        if n_trips >= size:
+            chosen = profile
+    return chosen
+
+
+def generate_frames(n_trips, seed=DEFAULT_SEED):
+    """Gera (df_volume, df_frota, df_precificacao) em memória, já no formato bruto das fontes."""
+    rng = np.random.default_rng(seed)
+    n_days, n_plates, n_destinations, n_companies = profile_for(n_trips)
+
+    plates = np.array([f"{chr(65 + i % 26)}{chr(65 + (i // 26) % 26)}X{1000 + i}" for i in range(n_plates)])
+    destinations = np.array([f"DESTINO {i + 1:02d}" for i in range(n_destinations)])
+    companies = np.array([f"TRANSPORTADORA {chr(65 + i)}" for i in range(n_companies)])
+
+    # Placas e destinos com popularidade desigual (poucos concentram muitas viagens)
+    plate_weights = rng.pareto(2.0, n_plates) + 1
+    destination_weights = rng.pareto(1.5, n_destinations) + 1
+    plate_idx = rng.choice(n_plates, n_trips, p=plate_weights / plate_weights.sum())
+    destination_idx = rng.choice(n_destinations, n_trips, p=destination_weights / destination_weights.sum())
+    material_idx = rng.integers(0, len(MATERIALS), n_trips)
+
+    # Horário concentrado no 1º turno, com cauda noturna
+    day = rng.integers(0, n_days, n_trips)
+    minute_of_day = np.where(
+        rng.random(n_trips) < 0.75,
+        rng.integers(6 * 60, 18 * 60, n_trips),
+        (rng.integers(18 * 60, 30 * 60, n_trips)) % (24 * 60)
+    )
+    timestamps = START_DATE + pd.to_timedelta(day * 1440 + minute_of_day, unit='m')
+    order = np.argsort(timestamps.values, kind='stable')
+    timestamps = timestamps[order]
+
+    volume = np.round(rng.normal(28_000, 6_000, n_trips).clip(5_000, 45_000), 1)
+    df_volume = pd.DataFrame({
+        '': np.char.add('T', plate_idx[order].astype(str)),
+        'Data': timestamps.strftime('%Y-%m-%d'),
+        'Hora': timestamps.strftime('%H:%M:%S'),
+        'Volume': pd.Series(volume[order]).map('{:.1f}'.format).str.replace('.', ',', regex=False),
+        'Placa': plates[plate_idx[order]],
+        'Destino': destinations[destination_idx[order]],
+        'Material': np.array(MATERIALS)[material_idx[order]],
+    })
+
+    df_frota = pd.DataFrame({
+        'Placa': plates,
+        'Empresa': companies[rng.integers(0, n_companies, n_plates)],
+        'Tipo': rng.choice(['TRUCK', 'CARRETA', 'BASCULANTE'], n_plates),
+    })
+
+    pricing_rows = []
+    for destination in destinations:
+        for period_start in range(0, n_days, PRICING_PERIOD_DAYS):
+            if rng.random() < PRICING_GAP_PROBABILITY:
+                continue  # lacuna de precificação: viagens desse período ficam sem preço
+            start = START_DATE + pd.Timedelta(days=period_start)
+            end = START_DATE + pd.Timedelta(days=min(period_start + PRICING_PERIOD_DAYS, n_days) - 1)
+            pricing_rows.append((len(pricing_rows) + 1, destination, round(float(rng.uniform(8, 25)), 2),
+                                 start.date().isoformat(), end.date().isoformat()))
+    df_precificacao = pd.DataFrame(pricing_rows, columns=['id', 'destination', 'price_per_ton', 'start_date', 'end_date'])
+    return df_volume, df_frota, df_precificacao
+
+
+def write_dataset(directory, n_trips, seed=DEFAULT_SEED):
+    """Grava o dataset sintético em `directory` no formato esperado por LOCAL_DATA_DIR."""
+    os.makedirs(directory, exist_ok=True)
+    df_volume, df_frota, df_precificacao = generate_frames(n_trips, seed)
+    df_volume.to_csv(os.path.join(directory, 'volume.csv'), index=False)
+    df_frota.to_csv(os.path.join(directory, 'frota.csv'), index=False)
+
+    sqlite_path = os.path.join(directory, 'pricing.sqlite')
+    if os.path.exists(sqlite_path):
+        os.remove(sqlite_path)
+    with closing(sqlite3.connect(sqlite_path)) as conn:
+        conn.execute('''
+            CREATE TABLE pricing (
+                id INTEGER PRIMARY KEY,
+                destination TEXT NOT NULL,
+                price_per_ton REAL NOT NULL,
+                start_date DATE NOT NULL,
+                end_date DATE NOT NULL,
+                UNIQUE(destination, start_date, end_date)
+            )
+        ''')
+        conn.executemany("INSERT INTO pricing VALUES (?, ?, ?, ?, ?)", df_precificacao.itertuples(index=False))
+        conn.commit()
+    return directory
+
+
+def ensure_dataset(n_trips, seed=DEFAULT_SEED, root=DATA_ROOT):
+    """Retorna o diretório do dataset (n_trips, seed), gerando-o apenas na primeira vez."""
+    directory = os.path.join(root, f"trips-{n_trips}-seed-{seed}")
+    if not os.path.exists(os.path.join(directory, 'pricing.sqlite')):
+        print(f"-> Gerando dataset sintético com {n_trips:,} viagens em {directory}...")
+        write_dataset(directory, n_trips, seed)
+    return directory
@@ -1,7 +1,11 @@
 # components/common_components.py
+import uuid
+
 import dash_bootstrap_components as dbc
 from dash import dcc, html
 
+from logic.export import export_href, XLSX_EXPORT_MAX_ROWS
+
 def create_page_header(title, subtitle):
     """Cria um cabeçalho de página padrão e estilizado."""
     return html.Div([
@@ -38,4 +42,44 @@ def create_chart_card(title, description, figure):
             ])
         ],
         className="content-card"
-    )
\ No newline at end of file
+    )
+def create_background_page_placeholder(pathname, filter_token, title="Processando..."):
+    """
+    Placeholder de uma página calculada em segundo plano: guarda o pedido (rota + token de
+    filtros) e mostra o progresso até o job substituir 'background-page-body'.
+    """
+    return html.Div([
+        # 'nonce': cada visualização tem seu próprio job (o Dash apaga o resultado ao entregá-lo)
+        dcc.Store(id='background-page-request', data={'pathname': pathname, 'token': filter_token, 'nonce': uuid.uuid4().hex}),
+        html.Div(id='background-page-body', children=dbc.Card(
+            dbc.CardBody([
+                html.H4(title, className="chart-card-title mb-3"),
+                html.P("Esta página é calculada em segundo plano; você pode continuar navegando.",
+                       className="chart-card-description mb-3"),
+                html.Div(id='background-page-progress-wrapper', children=[
+                    dbc.Progress(id='background-page-progress', value=0, label="", striped=True, animated=True, className="mb-3"),
+                    dbc.Button("Cancelar", id='background-page-cancel', color="secondary", size="sm", n_clicks=0),
+                ]),
+            ]),
+            className="content-card"
+        )),
+    ])
+
+def create_export_buttons(kind, filters, label="Exportar", grain=None):
+    """
+    Links de download (CSV e XLSX) para /export/<kind>.<formato> com os filtros atuais
+    (e a granularidade escolhida, na matriz).
+    São links comuns, não dcc.Download: o arquivo vem em streaming direto da rota Flask.
+    O Excel é montado inteiro antes do download começar e tem limite de linhas (dica no botão).
+    """
+    return html.Div([
+        html.Span(label, className="me-2 chart-card-description"),
+        dbc.ButtonGroup([
+            dbc.Button([html.I(className="bi bi-filetype-csv me-1"), "CSV"], href=export_href(kind, 'csv', filters, grain),
+                       external_link=True, download="", color="secondary", outline=True, size="sm"),
+            dbc.Button([html.I(className="bi bi-file-earmark-spreadsheet me-1"), "Excel"], href=export_href(kind, 'xlsx', filters, grain),
+                       title=f"Até {XLSX_EXPORT_MAX_ROWS:,} linhas; o arquivo é montado antes do download começar. "
+                             "Para volumes maiores, use CSV.".replace(',', '.'),
+                       external_link=True, download="", color="secondary", outline=True, size="sm"),
+        ]),
+    ], className="d-flex align-items-center justify-content-end mb-3")
@@ -11,6 +11,7 @@ def create_filter_panel(df):
     """
     # Obtenção de valores únicos para os dropdowns
     empresas = sorted(df['Empresa'].dropna().unique()) if 'Empresa' in df.columns else []
+    clientes = sorted(df['Cliente'].dropna().unique()) if 'Cliente' in df.columns else []
     destinos = sorted(df['Destino'].dropna().unique()) if 'Destino' in df.columns else []
     materiais = sorted(df['Material'].dropna().unique()) if 'Material' in df.columns else []
 
@@ -39,6 +40,15 @@ def create_filter_panel(df):
                 className="mb-3"
             ),
 
+            html.Label("Cliente:", className="form-label"),
+            dcc.Dropdown(
+                id='cliente-dropdown',
+                options=[{'label': i, 'value': i} for i in clientes],
+                multi=True,
+                placeholder="Selecione...",
+                className="mb-3"
+            ),
+
             html.Label("Destino:", className="form-label"),
             dcc.Dropdown(
                 id='destino-dropdown',
@@ -56,6 +66,16 @@ def create_filter_panel(df):
                 placeholder="Selecione...",
                 className="mb-3"
             ),
+
+            # Placas: opções vêm do servidor conforme o texto digitado (ver logic/plate_index.py)
+            html.Label("Placa:", className="form-label"),
+            dcc.Dropdown(
+                id='placa-dropdown',
+                options=[],
+                multi=True,
+                placeholder="Digite a placa...",
+                className="mb-3"
+            ),
             
             # O botão de limpar filtros permanece aqui, o que está correto.
             dbc.Button("Limpar Filtros", id="clear-filters-button", color="secondary", className="mt-3 w-100"),
@@ -9,9 +9,12 @@ TOPBAR_NAV_ITEMS = [
     {"icon": "bi bi-graph-up", "label": "Análise Geral", "href": "/"},
     {"icon": "bi bi-grid-3x3-gap-fill", "label": "Análise Matricial", "href": "/matrix"},
     {"icon": "bi bi-speedometer", "label": "Análise de Eficiência", "href": "/efficiency"},
+    {"icon": "bi bi-stoplights", "label": "Congestionamento", "href": "/congestion"},
     {"icon": "bi bi-people-fill", "label": "Cadastro de Clientes", "href": "/register-client", "id": "nav-link-client-registration"},
+    {"icon": "bi bi-clock-history", "label": "Cadastro de Turnos", "href": "/register-shift", "id": "nav-link-shift-registration"},
     {"icon": "bi bi-cash-stack", "label": "Precificação", "href": "/pricing", "id": "nav-link-pricing"}, # ADICIONADO ID AQUI
     {"icon": "bi bi-person-gear", "label": "Gestão de Usuários", "href": "/management/users", "id": "nav-link-user-management", "admin_only": True},
+    {"icon": "bi bi-clipboard-data", "label": "Relatório de Carga", "href": "/management/load-report", "id": "nav-link-load-report", "admin_only": True},
     {"icon": "bi bi-tools", "label": "Gestão de Equipamentos", "href": "/management/equipment", "id": "nav-link-equipment"}, # ADICIONADO ID AQUI
     {"icon": "bi bi-gear", "label": "Configurações", "href": "/settings", "id": "nav-link-settings"}, # ADICIONADO ID AQUI
 ]
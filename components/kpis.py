@@ -2,8 +2,13 @@ import dash_bootstrap_components as dbc
 from dash import html
 import pandas as pd
 
-def create_kpi_layout(df, theme):
-    """Cria a seção de KPIs com o novo layout inspirado na imagem."""
+from logic.time_index import COMPARISON_MODES
+
+def create_kpi_layout(df, theme, distinct_vehicles=None):
+    """
+    Cria a seção de KPIs com o novo layout inspirado na imagem.
+    `distinct_vehicles`: placas distintas vindas dos resumos do cubo; sem ele, conta em df.
+    """
     
     if df.empty:
         return dbc.Row([
@@ -20,7 +25,10 @@ def create_kpi_layout(df, theme):
     total_revenue = df['Valor Bruto Total'].sum() if 'Valor Bruto Total' in df.columns else 0
     formatted_revenue = f"R$ {total_revenue:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
     
-    total_trips = df['Placa'].nunique() if 'Placa' in df.columns else 0
+    if distinct_vehicles is not None:
+        total_trips = distinct_vehicles
+    else:
+        total_trips = df['Placa'].nunique() if 'Placa' in df.columns else 0
     formatted_trips = f"{total_trips:,}".replace(",", ".")
     
     avg_ticket = (total_revenue / total_trips) if total_trips > 0 else 0
@@ -28,10 +36,10 @@ def create_kpi_layout(df, theme):
 
     # Lista de KPIs para criar os cards
     kpis = [
-        {"id": "kpi-total-volume", "title": "Volume Total (t)", "value": formatted_volume, "icon": "bi bi-database-fill-add"},
-        {"id": "kpi-total-revenue", "title": "Receita Total", "value": formatted_revenue, "icon": "bi bi-currency-dollar"},
-        {"id": "kpi-total-trips", "title": "Total de Viagens", "value": formatted_trips, "icon": "bi bi-truck"},
-        {"id": "kpi-avg-ticket", "title": "Ticket Médio", "value": formatted_avg_ticket, "icon": "bi bi-receipt-cutoff"},
+        {"id": "kpi-total-volume", "title": "Volume Total (t)", "value": formatted_volume, "icon": "bi bi-database-fill-add", "delta": True},
+        {"id": "kpi-total-revenue", "title": "Receita Total", "value": formatted_revenue, "icon": "bi bi-currency-dollar", "delta": True},
+        {"id": "kpi-total-trips", "title": "Total de Viagens", "value": formatted_trips, "icon": "bi bi-truck", "delta": True},
+        {"id": "kpi-avg-ticket", "title": "Ticket Médio", "value": formatted_avg_ticket, "icon": "bi bi-receipt-cutoff", "delta": True},
     ]
     
     # <<< NOVA ESTRUTURA PARA OS CARDS >>>
@@ -51,6 +59,8 @@ def create_kpi_layout(df, theme):
                         html.Div([
                             html.H6(kpi["title"], className="kpi-title"),
                             html.H4(kpi["value"], className="kpi-value", id=kpi["id"]),
+                            # Variação contra o período de comparação (preenchida por callback)
+                            html.Small(id=f"{kpi['id']}-delta", className="kpi-delta") if kpi.get("delta") else None,
                         ], className="kpi-text-container")
                     ]
                 ),
@@ -60,4 +70,17 @@ def create_kpi_layout(df, theme):
         )
         kpi_cards.append(card)
     
-    return dbc.Row(kpi_cards)
\ No newline at end of file
+    # Modo de comparação dos KPIs (as variações vêm do índice de somas acumuladas)
+    comparison_selector = dbc.Col(
+        dbc.RadioItems(
+            id='kpi-comparison-mode',
+            options=[{'label': 'Sem comparação', 'value': 'none'}]
+                    + [{'label': label, 'value': mode} for mode, label in COMPARISON_MODES.items()],
+            value='previous',
+            inline=True,
+            className="kpi-comparison-mode"
+        ),
+        width=12, className="mb-2"
+    )
+
+    return dbc.Row([comparison_selector] + kpi_cards)
\ No newline at end of file
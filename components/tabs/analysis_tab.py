@@ -1,10 +1,9 @@
 # components/tabs/analysis_tab.py
 from dash import html, dcc
 import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
-import plotly.express as px
 import pandas as pd
-from components.common_components import create_page_header, create_metric_card, create_chart_card
+import plotly.graph_objects as go
+from components.common_components import create_page_header, create_metric_card, create_chart_card, create_export_buttons
 from components.kpis import create_kpi_layout
 from config import THEME_COLORS
 from components.kpis import create_kpi_layout
@@ -12,9 +11,13 @@ from logic.analysis_functions import (
     calculate_secondary_kpis,
     get_volume_by_weekday,
     get_volume_by_hour,
+    get_weekday_hour_matrices,
     get_top_5_by_column,
+    DIAS_DA_SEMANA,
+    WEEKDAY_HOUR_WEIGHTS,
     create_figure_from_df
 )
+from logic.resample import GRAINS, DEFAULT_GRAIN
 
 # --- Funções auxiliares para criar componentes reusáveis ---
 
@@ -45,9 +48,86 @@ def create_chart_card(title, description, figure):
         className="content-card"
     )
 
-def create_analysis_tab_layout(dff, theme):
+def create_weekday_hour_figure(values, weight='volume', theme='dark'):
+    """Mapa de calor dia da semana x hora (values: matriz 7 x 24 do peso escolhido)."""
+    colors = THEME_COLORS[theme]
+    label = WEEKDAY_HOUR_WEIGHTS[weight][1]
+    fig = go.Figure(go.Heatmap(
+        z=values,
+        x=[f"{hour:02d}h" for hour in range(24)],
+        y=DIAS_DA_SEMANA,
+        colorscale='YlOrRd',
+        colorbar=dict(title=label),
+        hovertemplate=f"%{{y}} às %{{x}}: %{{z:,.0f}} ({label})<extra></extra>",
+    ))
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color=colors['foreground']),
+        margin=dict(t=10, b=10, l=10, r=10), height=320, yaxis=dict(autorange='reversed'),
+    )
+    return fig
+
+def create_weekday_hour_card(matrices, theme='dark'):
+    """Card do mapa de calor com o seletor de peso; as três matrizes ficam no store (troca sem refiltrar)."""
+    weights = [weight for weight in WEEKDAY_HOUR_WEIGHTS if weight in matrices]
+    return dbc.Card(
+        dbc.CardBody([
+            html.H5("Distribuição por Dia da Semana e Hora", className="chart-card-title"),
+            html.P("Concentração da produção em cada hora de cada dia da semana.", className="chart-card-description"),
+            dcc.RadioItems(
+                id='weekday-hour-weight',
+                options=[{'label': WEEKDAY_HOUR_WEIGHTS[weight][1], 'value': weight} for weight in weights],
+                value='volume',
+                inline=True,
+                className="kpi-comparison-mode"
+            ),
+            dcc.Store(id='weekday-hour-store', data={weight: matrices[weight].round(2).tolist() for weight in weights}),
+            dcc.Graph(id='weekday-hour-heatmap', figure=create_weekday_hour_figure(matrices['volume'], 'volume', theme), config={'displayModeBar': False}),
+        ]),
+        className="content-card"
+    )
+
+def create_time_series_figure(labels, sums, grain=DEFAULT_GRAIN, theme='dark'):
+    """Volume por período (barras), com receita e viagens no hover; sums: colunas volume, receita, viagens."""
+    colors = THEME_COLORS[theme]
+    fig = go.Figure(go.Bar(
+        x=list(labels),
+        y=sums[:, 0] if len(sums) else [],
+        customdata=sums[:, 1:] if len(sums) else None,
+        marker_color='#02971f',
+        hovertemplate="%{x}<br>Volume: %{y:,.0f}<br>Receita: R$ %{customdata[0]:,.2f}<br>Viagens: %{customdata[1]:,.0f}<extra></extra>",
+    ))
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color=colors['foreground']),
+        margin=dict(t=10, b=10, l=10, r=10), height=320, bargap=0.1,
+        xaxis=dict(title=GRAINS[grain][0], rangeslider=dict(visible=grain == 'hour')),
+        yaxis=dict(title='Volume'),
+    )
+    return fig
+
+def create_time_series_card(theme='dark'):
+    """Card da evolução no tempo com o seletor de granularidade; a figura vem do callback (séries pré-agregadas)."""
+    return dbc.Card(
+        dbc.CardBody([
+            html.H5("Evolução no Tempo", className="chart-card-title"),
+            html.P("Volume por hora, dia, semana ou mês no período filtrado.", className="chart-card-description"),
+            dcc.RadioItems(
+                id='time-grain',
+                options=[{'label': label, 'value': grain} for grain, (label, _) in GRAINS.items()],
+                value=DEFAULT_GRAIN,
+                inline=True,
+                className="kpi-comparison-mode"
+            ),
+            dcc.Graph(id='time-series-graph', config={'displayModeBar': False}),
+        ]),
+        className="content-card"
+    )
+
+def create_analysis_tab_layout(dff, theme, distinct_vehicles=None, export_filters=None, client_rollup=None):
     """
     Cria o layout completo para a aba 'Visão Geral da Produção' com todas as novas análises.
+    `distinct_vehicles`: veículos distintos já calculados pelo cubo (senão, contados em dff).
+    `export_filters`: filtros normalizados atuais; com eles, a aba mostra os links de exportação das viagens.
+    `client_rollup`: viagens, volume e receita por cliente (logic/clients.py); com ele, a aba mostra os totais por cliente.
     """
     
     if dff.empty:
@@ -57,6 +137,7 @@ def create_analysis_tab_layout(dff, theme):
     secondary_kpis = calculate_secondary_kpis(dff)
     df_volume_weekday = get_volume_by_weekday(dff)
     df_volume_hour = get_volume_by_hour(dff)
+    weekday_hour_matrices = get_weekday_hour_matrices(dff)
     df_top_destinos = get_top_5_by_column(dff, 'Destino', 'Volume')
     df_top_veiculos = get_top_5_by_column(dff, 'Placa', 'Volume')
 
@@ -73,12 +154,21 @@ def create_analysis_tab_layout(dff, theme):
     if fig_top_veiculos:
         fig_top_veiculos.update_layout(yaxis={'categoryorder':'total ascending'})
 
+    # Totais por cliente (já agregados pelo cubo)
+    has_clients = client_rollup is not None and not client_rollup.empty
+    if has_clients:
+        fig_client_revenue = create_figure_from_df(client_rollup, 'bar', 'Receita', 'Cliente', 'Receita por Cliente', orientation='h')
+        fig_client_revenue.update_layout(yaxis={'categoryorder': 'total ascending'})
+        fig_client_volume = create_figure_from_df(client_rollup, 'bar', 'Volume', 'Cliente', 'Volume por Cliente', orientation='h')
+        fig_client_volume.update_layout(yaxis={'categoryorder': 'total ascending'})
+
     # --- 3. Montar o Layout da página ---
     layout = html.Div([
         create_page_header("Visão Geral da Produção", "Dashboards e KPIs de produção da frota."),
+        create_export_buttons('trips', export_filters, "Exportar viagens filtradas") if export_filters is not None else html.Div(),
         
         # Linha dos KPIs principais (usando a função de kpis.py)
-        create_kpi_layout(dff, theme),
+        create_kpi_layout(dff, theme, distinct_vehicles=distinct_vehicles),
 
         # Linha dos novos KPIs secundários
         dbc.Row([
@@ -94,6 +184,22 @@ def create_analysis_tab_layout(dff, theme):
             dbc.Col(create_chart_card("Volume por Hora do Dia", "Picos de produção durante o dia", fig_volume_hour), lg=6, className="mb-4"),
         ]),
 
+        # Evolução no tempo na granularidade escolhida
+        dbc.Row([
+            dbc.Col(create_time_series_card(theme), width=12, className="mb-4"),
+        ]),
+
+        # Distribuição conjunta dia da semana x hora
+        dbc.Row([
+            dbc.Col(create_weekday_hour_card(weekday_hour_matrices, theme), width=12, className="mb-4"),
+        ]) if 'volume' in weekday_hour_matrices else html.Div(),
+
+        # Receita e volume por cliente
+        dbc.Row([
+            dbc.Col(create_chart_card("Receita por Cliente", "Valor bruto total de cada cliente no período", fig_client_revenue), lg=6, className="mb-4"),
+            dbc.Col(create_chart_card("Volume por Cliente", "Volume transportado para cada cliente no período", fig_client_volume), lg=6, className="mb-4"),
+        ]) if has_clients else html.Div(),
+
         # Linha dos gráficos de Top 5
         dbc.Row([
             dbc.Col(create_chart_card("Top 5 Destinos", "Maiores volumes por destino", fig_top_destinos), lg=6, className="mb-4"),
@@ -8,11 +8,12 @@ from dash import dash_table
 from config import THEME_COLORS # <<< ESSA IMPORTAÇÃO É CRUCIAL
 
 
-def create_client_registration_layout(dff, theme='dark'):
+def create_client_registration_layout(dff, theme='dark', destinations_without_client=None):
     """
     Cria o layout para a aba de 'Cadastro de Clientes',
     incluindo formulário de registro, lista de destinos sem cliente
     e a tabela de clientes cadastrados.
+    `destinations_without_client`: destinos sem cliente já calculados (logic/clients.py); senão, lidos de dff.
     """
     colors = THEME_COLORS[theme] # <<< ESSA LINHA DEVE ESTAR ASSIM
     # ... (restante do código) ...
@@ -25,10 +26,11 @@ def create_client_registration_layout(dff, theme='dark'):
     registered_destinations = {client['destination'] for client in registered_clients_db}
 
     # Identificar destinos sem cliente
-    destinations_without_client = [
-        dest for dest in unique_destinations_from_df 
-        if dest not in registered_destinations
-    ]
+    if destinations_without_client is None:
+        destinations_without_client = [
+            dest for dest in unique_destinations_from_df 
+            if dest not in registered_destinations
+        ]
 
     # Preparar dados para a dash_table.DataTable de clientes cadastrados
     clients_table_data = []
@@ -0,0 +1,77 @@
+# components/tabs/congestion_tab.py
+import dash_bootstrap_components as dbc
+from dash import html, dash_table
+import plotly.graph_objects as go
+from config import THEME_COLORS
+from logic.congestion import WINDOW_MINUTES, SHIFT_CHANGE_WINDOW_MINUTES, SHIFT_CHANGE_MARGIN_MINUTES
+from .analysis_tab import create_page_header, create_chart_card, create_metric_card
+
+
+def create_congestion_tab_layout(dff, theme='dark', congestion=None):
+    """
+    Cria o layout da aba 'Congestionamento': picos de chegadas por destino em janelas
+    deslizantes e mapa de calor destino x horário do dia.
+    `congestion`: resultado de logic.congestion.congestion_analysis() para dff.
+    """
+    if dff.empty or not congestion or congestion['peaks'].empty:
+        return dbc.Alert("Não há dados para os filtros selecionados.", color="info", className="m-4 text-center")
+
+    colors = THEME_COLORS[theme]
+    peaks = congestion['peaks']
+    heatmap = congestion['heatmap']
+    busiest = peaks.iloc[0]
+    largest_window = WINDOW_MINUTES[-1]
+    shift_change_peak = peaks.sort_values('Pico_Troca_Turno', ascending=False).iloc[0]
+
+    fig_heatmap = go.Figure(go.Heatmap(
+        z=heatmap['values'],
+        x=heatmap['slots'],
+        y=heatmap['destinations'],
+        colorscale='YlOrRd',
+        colorbar=dict(title="Chegadas/dia"),
+        hovertemplate="%{y} às %{x}: %{z:.2f} chegadas/dia<extra></extra>",
+    ))
+    fig_heatmap.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color=colors['foreground']),
+        margin=dict(t=10, b=10, l=10, r=10), height=max(300, 24 * len(heatmap['destinations']) + 120),
+        yaxis=dict(autorange='reversed'),
+    )
+
+    columns = [{"name": "Destino", "id": "Destino"}, {"name": "Chegadas", "id": "Chegadas", "type": "numeric"}]
+    for window in WINDOW_MINUTES:
+        columns += [
+            {"name": f"Pico {window} min", "id": f"Pico_{window}", "type": "numeric"},
+            {"name": f"Início do Pico {window} min", "id": f"Inicio_{window}"},
+        ]
+    columns.append({"name": f"Pico na Troca de Turno ({SHIFT_CHANGE_WINDOW_MINUTES} min)", "id": "Pico_Troca_Turno", "type": "numeric"})
+
+    return html.Div([
+        create_page_header("Congestionamento por Destino", "Chegadas em janelas deslizantes e horários de maior fila."),
+        dbc.Row([
+            create_metric_card(f"Maior Pico ({largest_window} min)", f"{busiest[f'Pico_{largest_window}']} chegadas",
+                               f"{busiest['Destino']} em {busiest[f'Inicio_{largest_window}']}"),
+            create_metric_card("Pico na Troca de Turno", f"{shift_change_peak['Pico_Troca_Turno']} chegadas",
+                               f"{shift_change_peak['Destino']} (±{SHIFT_CHANGE_MARGIN_MINUTES} min das trocas de turno)"),
+            create_metric_card("Destinos", f"{len(peaks)}", f"{congestion['days']} dias com viagens"),
+        ]),
+        dbc.Row([
+            dbc.Col(create_chart_card("Chegadas por Destino e Horário", "Média de chegadas por dia em faixas de 30 minutos.", fig_heatmap), width=12, className="mb-4"),
+        ]),
+        dbc.Card(
+            dbc.CardBody([
+                html.H5("Picos de Chegada por Destino", className="chart-card-title"),
+                html.P("Maior número de chegadas do destino dentro de cada janela.", className="chart-card-description"),
+                dash_table.DataTable(
+                    id='congestion-peaks-table',
+                    columns=columns,
+                    data=peaks.to_dict('records'),
+                    page_size=15,
+                    sort_action="native",
+                    style_table={'overflowX': 'auto'},
+                    style_cell={'textAlign': 'left', 'padding': '8px'},
+                    style_header={'fontWeight': 'bold'},
+                ),
+            ]),
+            className="content-card mb-4"
+        ),
+    ])
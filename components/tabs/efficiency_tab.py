@@ -1,12 +1,81 @@
 # components/tabs/efficiency_tab.py
 import dash_bootstrap_components as dbc
-from dash import html, dcc
+from dash import html, dcc, dash_table
+import numpy as np
 import plotly.graph_objects as go
 from config import THEME_COLORS
-from .analysis_tab import create_page_header, create_chart_card
+from logic.fleet_efficiency import CYCLE_MAX_MINUTES, MIN_CYCLES_FOR_RANKING
+from .analysis_tab import create_page_header, create_chart_card, create_metric_card
 
-def create_efficiency_tab_layout(dff, theme='dark'):
-    """Cria o layout completo para a aba 'Análise de Eficiência'."""
+
+def _format_number(value, decimals=1, suffix=""):
+    if value is None:
+        return "N/A"
+    return f"{value:,.{decimals}f}{suffix}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def create_cycle_time_section(efficiency, colors):
+    """Cards, distribuição do tempo de ciclo, utilização por turno e piores veículos."""
+    by_shift = efficiency['by_shift']
+    utilization = {row['Turno']: row['Utilizacao'] for row in by_shift.to_dict('records')}
+
+    # Distribuição (histograma em faixas de 10 min) dos ciclos de toda a frota filtrada
+    counts, edges = np.histogram(efficiency['cycle_minutes'], bins=np.arange(0, CYCLE_MAX_MINUTES + 10, 10))
+    fig_cycle = go.Figure(go.Bar(x=edges[:-1] + 5, y=counts, width=9, marker_color=colors['primary'],
+                                 hovertemplate="%{x:.0f} min: %{y} ciclos<extra></extra>"))
+    fig_cycle.update_layout(xaxis_title="Tempo de ciclo (min)", yaxis_title="Ciclos")
+
+    fig_utilization = go.Figure(go.Bar(x=by_shift['Turno'], y=by_shift['Utilizacao'] * 100, marker_color=colors['chart_3'],
+                                       text=[f"{value:.0%}" for value in by_shift['Utilizacao']], textposition='auto'))
+    fig_utilization.update_layout(yaxis_title="Utilização (%)", yaxis_range=[0, 100])
+
+    for fig in (fig_cycle, fig_utilization):
+        fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color=colors['foreground']), margin=dict(t=10, b=10, l=10, r=10))
+
+    worst = efficiency['worst_plates'].round({'Ciclo_Medio_Min': 1, 'Horas_Ociosas': 1, 'Viagens_Por_Hora': 2, 'Utilizacao': 3})
+    worst_table = dash_table.DataTable(
+        id='efficiency-worst-plates-table',
+        columns=[
+            {"name": "Placa", "id": "Placa"},
+            {"name": "Viagens", "id": "Viagens", "type": "numeric"},
+            {"name": "Ciclo Médio (min)", "id": "Ciclo_Medio_Min", "type": "numeric"},
+            {"name": "Horas Ociosas", "id": "Horas_Ociosas", "type": "numeric"},
+            {"name": "Viagens/h Operando", "id": "Viagens_Por_Hora", "type": "numeric"},
+            {"name": "Utilização", "id": "Utilizacao", "type": "numeric", "format": {"specifier": ".0%"}},
+        ],
+        data=worst.to_dict('records'),
+        sort_action="native",
+        style_table={'overflowX': 'auto'},
+        style_cell={'textAlign': 'left', 'padding': '8px'},
+        style_header={'fontWeight': 'bold'},
+    )
+
+    return [
+        dbc.Row([
+            create_metric_card("Ciclo Mediano", _format_number(efficiency['median_cycle'], 0, " min"), f"P90: {_format_number(efficiency['p90_cycle'], 0, ' min')}"),
+            create_metric_card("Viagens por Hora Operando", _format_number(efficiency['trips_per_hour'], 2), f"Ociosidade: {_format_number(efficiency['idle_hours'], 0, ' h')}"),
+            create_metric_card("Utilização por Turno", " / ".join(f"{value:.0%}" for value in utilization.values()) or "N/A", " / ".join(utilization) or "-"),
+        ]),
+        dbc.Row([
+            dbc.Col(create_chart_card("Distribuição do Tempo de Ciclo", f"Intervalo entre viagens da mesma placa no turno (até {CYCLE_MAX_MINUTES} min).", fig_cycle), lg=6, className="mb-4"),
+            dbc.Col(create_chart_card("Utilização por Turno", "Horas em ciclo sobre as horas dos turnos trabalhados.", fig_utilization), lg=6, className="mb-4"),
+        ]),
+        dbc.Card(
+            dbc.CardBody([
+                html.H5("Veículos com Maior Tempo de Ciclo", className="chart-card-title"),
+                html.P(f"Ciclo médio por placa (mínimo de {MIN_CYCLES_FOR_RANKING} ciclos no período).", className="chart-card-description"),
+                worst_table,
+            ]),
+            className="content-card mb-4"
+        ),
+    ]
+
+
+def create_efficiency_tab_layout(dff, theme='dark', efficiency=None):
+    """
+    Cria o layout completo para a aba 'Análise de Eficiência'.
+    `efficiency`: métricas de logic.fleet_efficiency.fleet_efficiency() para dff (opcional).
+    """
     if dff.empty:
         return dbc.Alert("Não há dados para os filtros selecionados.", color="info", className="m-4 text-center")
 
@@ -31,5 +100,6 @@ def create_efficiency_tab_layout(dff, theme='dark'):
             dbc.Col(create_chart_card("Desempenho por Turno", "Volume e viagens por turno.", fig_shift_performance), lg=6, className="mb-4"),
             # Outros gráficos de eficiência podem ser adicionados aqui
         ]),
+        *(create_cycle_time_section(efficiency, colors) if efficiency else []),
     ])
     return layout
\ No newline at end of file
@@ -0,0 +1,110 @@
+# components/tabs/load_report_tab.py
+from datetime import datetime
+
+from dash import html, dash_table
+import dash_bootstrap_components as dbc
+
+from components.common_components import create_page_header, create_metric_card
+
+TABLE_STYLE = dict(
+    style_table={'overflowX': 'auto'},
+    style_cell={'textAlign': 'left', 'padding': '8px', 'backgroundColor': 'transparent', 'color': 'hsl(var(--foreground))', 'border': '1px solid hsl(var(--border))'},
+    style_header={'backgroundColor': 'hsl(var(--secondary))', 'color': 'hsl(var(--foreground))', 'fontWeight': 'bold', 'border': '1px solid hsl(var(--border))'},
+)
+
+
+def _format_timestamp(value):
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value).strftime('%d/%m/%Y %H:%M:%S')
+    return str(value or '-')
+
+
+def _stage_rows(report):
+    total = report.get('total_seconds') or 0
+    rows = []
+    for stage in report.get('stages', []):
+        rows.append({
+            'name': stage['name'],
+            'seconds': stage['seconds'],
+            'share': f"{stage['seconds'] / total:.0%}" if total else '-',
+            'rows_in': stage.get('rows_in'),
+            'rows_out': stage.get('rows_out'),
+            'memory_delta_mb': stage.get('memory_delta_mb'),
+            'note': stage.get('note') or '',
+        })
+    return rows
+
+
+def create_load_report_layout(reports):
+    """
+    Layout da página de administração com o relatório por etapa das cargas de dados.
+    `reports`: dicts de LoadProfiler.report(), mais recente primeiro.
+    """
+    header = create_page_header("Relatório de Carga", "Tempo, linhas e memória de cada etapa da carga de dados.")
+    if not reports:
+        return html.Div([header, dbc.Alert("Nenhuma carga registrada ainda.", color="info", className="m-4")])
+
+    latest = reports[0]
+    slowest = max(latest.get('stages') or [{'name': '-', 'seconds': 0}], key=lambda stage: stage['seconds'])
+    alerts = []
+    if latest.get('error'):
+        alerts.append(dbc.Alert(f"A última carga falhou: {latest['error']}", color="danger"))
+    if latest.get('profile_path'):
+        alerts.append(dbc.Alert(f"Perfil cProfile: {latest['profile_path']}", color="secondary"))
+
+    return html.Div([
+        header,
+        *alerts,
+        dbc.Row([
+            create_metric_card("Tempo Total", f"{latest.get('total_seconds', 0):.2f} s", f"Origem: {latest.get('source', '-')}"),
+            create_metric_card("Linhas", f"{latest.get('rows') or 0:,}".replace(",", "."), f"Versão {latest.get('version') or '-'}"),
+            create_metric_card("Etapa Mais Lenta", slowest['name'], f"{slowest['seconds']:.2f} s"),
+        ]),
+        dbc.Card(
+            dbc.CardBody([
+                html.H4(f"Etapas da carga de {_format_timestamp(latest.get('started_at'))}", className="card-title mb-3"),
+                dash_table.DataTable(
+                    id='load-report-stages-table',
+                    columns=[
+                        {"name": "Etapa", "id": "name"},
+                        {"name": "Tempo (s)", "id": "seconds", "type": "numeric"},
+                        {"name": "% do Total", "id": "share"},
+                        {"name": "Linhas (entrada)", "id": "rows_in", "type": "numeric"},
+                        {"name": "Linhas (saída)", "id": "rows_out", "type": "numeric"},
+                        {"name": "Δ Memória (MB)", "id": "memory_delta_mb", "type": "numeric"},
+                        {"name": "Observação", "id": "note"},
+                    ],
+                    data=_stage_rows(latest),
+                    **TABLE_STYLE
+                ),
+            ]),
+            className="mb-4 content-card"
+        ),
+        dbc.Card(
+            dbc.CardBody([
+                html.H4("Histórico de Cargas", className="card-title mb-3"),
+                dash_table.DataTable(
+                    id='load-report-history-table',
+                    columns=[
+                        {"name": "Início", "id": "started_at"},
+                        {"name": "Versão", "id": "version"},
+                        {"name": "Origem", "id": "source"},
+                        {"name": "Linhas", "id": "rows", "type": "numeric"},
+                        {"name": "Tempo (s)", "id": "total_seconds", "type": "numeric"},
+                        {"name": "Erro", "id": "error"},
+                    ],
+                    data=[{
+                        'started_at': _format_timestamp(report.get('started_at')),
+                        'version': report.get('version') or '-',
+                        'source': report.get('source'),
+                        'rows': report.get('rows'),
+                        'total_seconds': report.get('total_seconds'),
+                        'error': report.get('error') or '',
+                    } for report in reports],
+                    page_size=10,
+                    **TABLE_STYLE
+                ),
+            ]),
+            className="mb-4 content-card"
+        ),
+    ])
@@ -1,28 +1,48 @@
 import dash_bootstrap_components as dbc
-from dash import html, dash_table
+from dash import html, dcc, dash_table
 import pandas as pd
 from logic.analysis_functions import create_matrix_data # <<< IMPORTAÇÃO CORRIGIDA
+from logic.resample import GRAINS, DEFAULT_GRAIN
+from components.common_components import create_export_buttons
 
-def create_matrix_tab_layout(dff, theme='dark'):
-    """Cria o layout completo para a aba 'Análise Matricial'."""
+def matrix_table_props(matrix_df):
+    """(colunas, dados) da DataTable da matriz."""
+    return [{"name": i, "id": i} for i in matrix_df.columns], matrix_df.to_dict('records')
+
+def create_matrix_tab_layout(dff, theme='dark', export_filters=None, matrix=None):
+    """
+    Cria o layout completo para a aba 'Análise Matricial'.
+    `export_filters`: filtros normalizados atuais; com eles, a aba mostra os links de exportação.
+    `matrix`: matriz diária já calculada (logic/resample.py); senão, calculada a partir de dff.
+    """
     
     if dff.empty:
         return dbc.Alert("Não há dados para exibir com os filtros selecionados.", color="info", className="m-4")
 
     # Chama a função de análise para criar os dados da matriz
-    matrix_df = create_matrix_data(dff)
+    matrix_df = matrix if matrix is not None else create_matrix_data(dff)
     
     if matrix_df.empty:
         return dbc.Alert("Não foi possível gerar a matriz com os dados disponíveis.", color="warning", className="m-4")
 
     # Define as colunas e os dados para a DataTable
-    cols_table = [{"name": i, "id": i} for i in matrix_df.columns]
-    data_table = matrix_df.to_dict('records')
+    cols_table, data_table = matrix_table_props(matrix_df)
 
     # Retorna o layout final da aba
     return html.Div([
         dbc.Card(className="table-card p-4", children=[
-            html.H4("Matriz de Desempenho Diário", className="chart-card-title mb-3"),
+            html.H4("Matriz de Desempenho", className="chart-card-title mb-3"),
+            # Links de exportação: refeitos pelo callback da granularidade (a exportação segue o seletor)
+            html.Div(id='matrix-export-buttons', children=create_export_buttons(
+                'matrix', export_filters, "Exportar matriz", grain=DEFAULT_GRAIN) if export_filters is not None else None),
+            # Granularidade do período: a troca vem do cache de matrizes, sem reagrupar as viagens
+            dcc.RadioItems(
+                id='matrix-grain',
+                options=[{'label': label, 'value': grain} for grain, (label, _) in GRAINS.items()],
+                value=DEFAULT_GRAIN,
+                inline=True,
+                className="kpi-comparison-mode mb-3"
+            ),
             dash_table.DataTable(
                 id='matrix-datatable',
                 columns=cols_table,
@@ -2,15 +2,75 @@
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 import pandas as pd
-from components.common_components import create_page_header
+from components.common_components import create_page_header, create_metric_card
 import database
 from dash import dash_table
 from config import THEME_COLORS 
 
-def create_pricing_registration_layout(dff, theme='dark'):
+
+def _coverage_table(table_id, df, colors, page_size=10):
+    return dash_table.DataTable(
+        id=table_id,
+        columns=[{"name": column, "id": column} for column in df.columns],
+        data=df.to_dict('records'),
+        page_size=page_size,
+        sort_action='native',
+        style_table={'overflowX': 'auto'},
+        style_cell={
+            'textAlign': 'left',
+            'padding': '8px',
+            'backgroundColor': colors['card_bg'],
+            'color': colors['text'],
+            'border': f'1px solid {colors["border"]}'
+        },
+        style_header={
+            'backgroundColor': colors['primary'],
+            'color': colors['foreground'],
+            'fontWeight': 'bold',
+            'border': f'1px solid {colors["border"]}'
+        },
+    )
+
+
+def create_pricing_coverage_content(coverage, theme='dark'):
+    """
+    Conteúdo da seção de cobertura: KPIs das viagens sem preço, tabela de buracos
+    (intervalos sem precificação com viagens) e tabela de períodos sobrepostos/encostados.
+    """
+    if coverage is None:
+        return dbc.Alert("Não foi possível calcular a cobertura da precificação.", color="warning")
+    colors = THEME_COLORS[theme]
+
+    gaps = coverage['gaps'].copy()
+    gaps['Volume'] = gaps['Volume'].map(lambda value: f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+    gaps['Sem Nenhum Preço'] = gaps['Sem Nenhum Preço'].map({True: 'Sim', False: 'Não'})
+    volume = f"{coverage['uncovered_volume']:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+    return html.Div([
+        dbc.Row([
+            create_metric_card("Viagens sem Preço", f"{coverage['uncovered_trips']:,}".replace(",", "."),
+                               f"de {coverage['trips']:,} viagens".replace(",", ".")),
+            create_metric_card("Volume sem Preço", f"{volume} t", "Volume com Valor Bruto zerado"),
+            create_metric_card("Parcela sem Preço", f"{coverage['uncovered_share']:.1%}".replace(".", ","), "Das viagens carregadas"),
+        ]),
+        html.H5("Períodos sem Precificação", className="card-title mt-2 mb-2"),
+        html.P("Intervalos de cada destino com viagens e sem preço cadastrado, do maior volume para o menor.",
+               className="chart-card-description mb-3"),
+        _coverage_table('pricing-gaps-table', gaps, colors) if len(gaps)
+        else dbc.Alert("Todas as viagens têm preço cadastrado.", color="success"),
+        html.H5("Períodos Sobrepostos ou Encostados", className="card-title mt-4 mb-2"),
+        html.P("Precificações que começam antes do fim (Sobreposição) ou no dia seguinte ao fim (Adjacente) "
+               "de outra precificação do mesmo destino.", className="chart-card-description mb-3"),
+        _coverage_table('pricing-overlaps-table', coverage['overlaps'], colors) if len(coverage['overlaps'])
+        else dbc.Alert("Nenhuma sobreposição entre precificações.", color="info"),
+    ])
+
+
+def create_pricing_registration_layout(dff, theme='dark', coverage=None):
     """
     Cria o layout para a aba de 'Cadastro de Precificação',
-    incluindo formulário de registro de preços e tabela de preços cadastrados.
+    incluindo formulário de registro de preços, tabela de preços cadastrados e
+    a cobertura da precificação (`coverage`, ver logic/pricing_coverage.py).
     """
     colors = THEME_COLORS[theme]
 
@@ -121,5 +181,14 @@ def create_pricing_registration_layout(dff, theme='dark'):
                 )
             ]),
             className="content-card mb-4"
+        ),
+
+        # Cobertura da precificação: viagens fora de qualquer período e períodos sobrepostos
+        dbc.Card(
+            dbc.CardBody([
+                html.H4("Cobertura da Precificação", className="card-title mb-3"),
+                html.Div(create_pricing_coverage_content(coverage, theme), id='pricing-coverage-section'),
+            ]),
+            className="content-card mb-4"
         )
-    ])
\ No newline at end of file
+    ])
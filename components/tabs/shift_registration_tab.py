@@ -1,42 +1,114 @@
-from dash import html, dcc
+from dash import html, dcc, dash_table
 import dash_bootstrap_components as dbc
 import database # Importa o módulo para buscar os clientes
+from components.common_components import create_page_header
+from config import THEME_COLORS
+from logic.shifts import DEFAULT_SHIFTS, OFF_SHIFT_LABEL
+
+SHIFT_TABLE_COLUMNS = [
+    {"name": "ID", "id": "id"},
+    {"name": "Cliente", "id": "client_name"},
+    {"name": "Turno", "id": "shift_name"},
+    {"name": "Início", "id": "start_time"},
+    {"name": "Fim", "id": "end_time"},
+]
+
+
+def shift_table_data():
+    """Turnos cadastrados no formato da tabela (horários em HH:MM)."""
+    rows = [dict(row) for row in database.get_all_shifts()]
+    for row in rows:
+        for column in ('start_time', 'end_time'):
+            row[column] = str(row[column])[:5]
+    return rows
+
+
+def create_shift_registration_layout(theme='dark'):
+    """Cria o layout do formulário de cadastro de turnos e a tabela de turnos cadastrados."""
+    colors = THEME_COLORS[theme]
 
-def create_shift_registration_layout():
-    """Cria o layout do formulário de cadastro de turnos."""
-    
     try:
-        # Busca os clientes já cadastrados para popular o dropdown
+        # Busca os clientes já cadastrados para popular o dropdown (um cliente pode ter vários destinos)
         clients = database.get_all_clients()
-        client_options = [{'label': client['name'], 'value': client['name']} for client in clients]
+        client_names = sorted({client['client_name'] for client in clients})
+        client_options = [{'label': name, 'value': name} for name in client_names]
     except Exception as e:
         print(f"Erro ao buscar clientes para o formulário de turnos: {e}")
         client_options = [] # Se falhar, o dropdown ficará vazio
 
-    return dbc.Card(
-        dbc.CardBody([
-            html.H5("Cadastrar Turno por Cliente", className="card-title"),
-            dbc.Row([
-                dbc.Col([
-                    html.Label("Selecione o Cliente"),
-                    dcc.Dropdown(id='shift-client-dropdown', options=client_options, placeholder="Cliente..."),
-                ], md=6),
-                dbc.Col([
-                    html.Label("Nome do Turno (Ex: Turno 1, Turno da Manhã)"),
-                    dbc.Input(id='shift-name-input', placeholder="Nome..."),
-                ], md=6),
-            ], className="mb-3"),
-            dbc.Row([
-                dbc.Col([
-                    html.Label("Horário de Início"),
-                    dbc.Input(id='shift-start-time-input', type='time', value="06:00"),
-                ], md=6),
-                dbc.Col([
-                    html.Label("Horário de Fim"),
-                    dbc.Input(id='shift-end-time-input', type='time', value="18:00"),
-                ], md=6),
+    try:
+        table_data = shift_table_data()
+    except Exception as e:
+        print(f"Erro ao buscar turnos cadastrados: {e}")
+        table_data = []
+
+    default_description = ", ".join(f"{name} {start}-{end}" for name, start, end in DEFAULT_SHIFTS)
+
+    return html.Div([
+        create_page_header("Cadastro de Turnos", "Defina os turnos de cada cliente; as viagens são re-rotuladas ao cadastrar."),
+
+        dbc.Card(
+            dbc.CardBody([
+                html.H5("Cadastrar Turno por Cliente", className="card-title"),
+                html.P(
+                    f"Turnos com fim anterior ao início atravessam a meia-noite (ex.: 22:00 a 06:00). "
+                    f"Destinos sem turnos próprios seguem a escala padrão ({default_description}); "
+                    f"horários fora dos turnos do cliente aparecem como '{OFF_SHIFT_LABEL}'.",
+                    className="chart-card-description mb-3"
+                ),
+                dbc.Row([
+                    dbc.Col([
+                        html.Label("Selecione o Cliente"),
+                        dcc.Dropdown(id='shift-client-dropdown', options=client_options, placeholder="Cliente..."),
+                    ], md=6),
+                    dbc.Col([
+                        html.Label("Nome do Turno (Ex: Turno 1, Turno da Manhã)"),
+                        dbc.Input(id='shift-name-input', placeholder="Nome..."),
+                    ], md=6),
+                ], className="mb-3"),
+                dbc.Row([
+                    dbc.Col([
+                        html.Label("Horário de Início"),
+                        dbc.Input(id='shift-start-time-input', type='time', value="06:00"),
+                    ], md=6),
+                    dbc.Col([
+                        html.Label("Horário de Fim"),
+                        dbc.Input(id='shift-end-time-input', type='time', value="18:00"),
+                    ], md=6),
+                ]),
+                dbc.Button("Cadastrar Turno", id="register-shift-button", color="primary", className="mt-4"),
+                html.Div(id="shift-registration-output", className="mt-3")
+            ]),
+            className="content-card mb-4"
+        ),
+
+        dbc.Card(
+            dbc.CardBody([
+                html.H4("Turnos Cadastrados", className="card-title mb-3"),
+                dash_table.DataTable(
+                    id='registered-shifts-table',
+                    columns=SHIFT_TABLE_COLUMNS,
+                    data=table_data,
+                    row_selectable='single', # Seleciona o turno a excluir
+                    selected_rows=[],
+                    page_size=10,
+                    style_table={'overflowX': 'auto'},
+                    style_cell={
+                        'textAlign': 'left',
+                        'padding': '8px',
+                        'backgroundColor': colors['card_bg'],
+                        'color': colors['text'],
+                        'border': f'1px solid {colors["border"]}'
+                    },
+                    style_header={
+                        'backgroundColor': colors['primary'],
+                        'color': colors['foreground'],
+                        'fontWeight': 'bold',
+                        'border': f'1px solid {colors["border"]}'
+                    },
+                ),
+                dbc.Button("Excluir Turno Selecionado", id="delete-shift-button", color="danger", outline=True, className="mt-3"),
             ]),
-            dbc.Button("Cadastrar Turno", id="register-shift-button", color="primary", className="mt-4"),
-            html.Div(id="shift-registration-output", className="mt-3")
-        ])
-    )
\ No newline at end of file
+            className="content-card mb-4"
+        ),
+    ])
@@ -5,6 +5,7 @@ from psycopg2.extras import DictCursor # <<< CORRIGIDO AQUI: DEVE SER DictCursor
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 from datetime import datetime
+import json
 import os
 from dotenv import load_dotenv
 
@@ -46,44 +47,139 @@ def get_db_connection():
         print(f"ERRO DE CONEXÃO COM O BANCO DE DADOS: {e}")
         raise
 
-def init_db():
+# --- Migrações de Esquema ---
+# Cada migração roda uma única vez, em ordem, e fica registrada na tabela schema_version.
+# Aplique-as fora do boot dos workers (deploy/release): `python database.py migrate`.
+# O boot da aplicação faz apenas uma consulta barata em check_schema_version().
+
+SCHEMA_LOCK_ID = 72541  # Chave do advisory lock que serializa migrações concorrentes
+
+def _migration_001_initial_schema(cursor):
+    # Tabela de Usuários
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            username VARCHAR(255) UNIQUE NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            is_admin BOOLEAN DEFAULT FALSE
+        );
+    ''')
+    # Tabela de Clientes
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS clients (
+            id SERIAL PRIMARY KEY,
+            client_name VARCHAR(255) NOT NULL,
+            destination VARCHAR(255) UNIQUE NOT NULL
+        );
+    ''')
+    # Tabela de Precificação
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS pricing (
+            id SERIAL PRIMARY KEY,
+            destination VARCHAR(255) NOT NULL,
+            price_per_ton REAL NOT NULL,
+            start_date DATE NOT NULL,
+            end_date DATE NOT NULL,
+            UNIQUE(destination, start_date, end_date)
+        );
+    ''')
+    # Adiciona um usuário admin padrão se não existir (o hash só é calculado aqui, uma vez)
+    cursor.execute("INSERT INTO users (username, password_hash, is_admin) VALUES (%s, %s, %s) ON CONFLICT (username) DO NOTHING;",
+                   ('admin', generate_password_hash(os.getenv("ADMIN_INITIAL_PASSWORD", "admin123")), True))
+
+def _migration_002_load_reports(cursor):
+    # Relatório por etapa de cada carga de dados (ver logic/load_report.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS load_reports (
+            id SERIAL PRIMARY KEY,
+            dataset_version VARCHAR(32),
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            total_seconds REAL NOT NULL,
+            row_count INTEGER,
+            report JSONB NOT NULL
+        );
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_load_reports_created_at ON load_reports (created_at DESC);")
+
+def _migration_003_shifts(cursor):
+    # Turnos por cliente; fim anterior ao início = turno que atravessa a meia-noite (ver logic/shifts.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS shifts (
+            id SERIAL PRIMARY KEY,
+            client_name VARCHAR(255) NOT NULL,
+            shift_name VARCHAR(255) NOT NULL,
+            start_time TIME NOT NULL,
+            end_time TIME NOT NULL,
+            UNIQUE(client_name, shift_name)
+        );
+    ''')
+
+# Lista ordenada de (versão, descrição, função). Novas migrações entram SEMPRE no final.
+MIGRATIONS = [
+    (1, 'esquema inicial (users, clients, pricing) e admin padrão', _migration_001_initial_schema),
+    (2, 'relatórios de carga de dados (load_reports)', _migration_002_load_reports),
+    (3, 'turnos por cliente (shifts)', _migration_003_shifts),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version():
+    """Retorna a versão de esquema aplicada no banco (0 se nunca migrado)."""
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
-            # Tabela de Usuários
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    id SERIAL PRIMARY KEY,
-                    username VARCHAR(255) UNIQUE NOT NULL,
-                    password_hash VARCHAR(255) NOT NULL,
-                    is_admin BOOLEAN DEFAULT FALSE
-                );
-            ''')
-            # Tabela de Clientes
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS clients (
-                    id SERIAL PRIMARY KEY,
-                    client_name VARCHAR(255) NOT NULL,
-                    destination VARCHAR(255) UNIQUE NOT NULL
-                );
-            ''')
-            # Tabela de Precificação
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS pricing (
-                    id SERIAL PRIMARY KEY,
-                    destination VARCHAR(255) NOT NULL,
-                    price_per_ton REAL NOT NULL,
-                    start_date DATE NOT NULL,
-                    end_date DATE NOT NULL,
-                    UNIQUE(destination, start_date, end_date)
-                );
-            ''')
-            conn.commit()
-
-            # Adiciona um usuário admin padrão se não existir
-            cursor.execute("INSERT INTO users (username, password_hash, is_admin) VALUES (%s, %s, %s) ON CONFLICT (username) DO NOTHING;",
-                           ('admin', generate_password_hash('admin123'), True))
-            conn.commit()
-            print("Usuário 'admin' padrão criado (ou já existia).")
+            try:
+                cursor.execute("SELECT MAX(version) FROM schema_version")
+            except psycopg2.errors.UndefinedTable:
+                conn.rollback()
+                return 0
+            row = cursor.fetchone()
+            return row[0] or 0
+
+def check_schema_version():
+    """
+    Verificação barata usada no boot: uma única consulta, sem DDL e sem hashing.
+    Retorna True se o banco está na versão esperada pelo código.
+    """
+    current = get_schema_version()
+    if current < SCHEMA_VERSION:
+        print(f"AVISO: esquema do banco na versão {current}, código espera {SCHEMA_VERSION}. Rode `python database.py migrate`.")
+        return False
+    return True
+
+def migrate_db():
+    """Aplica as migrações pendentes. Seguro para rodar várias vezes e em paralelo."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", (SCHEMA_LOCK_ID,))
+            try:
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY,
+                        description VARCHAR(255) NOT NULL,
+                        applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+                    );
+                ''')
+                conn.commit()
+
+                cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+                current = cursor.fetchone()[0]
+                for version, description, apply_migration in MIGRATIONS:
+                    if version <= current:
+                        continue
+                    apply_migration(cursor)
+                    cursor.execute("INSERT INTO schema_version (version, description) VALUES (%s, %s)", (version, description))
+                    conn.commit()
+                    print(f"Migração {version} aplicada: {description}")
+                return max(current, SCHEMA_VERSION)
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", (SCHEMA_LOCK_ID,))
+                conn.commit()
+
+def init_db():
+    # Mantido por compatibilidade: equivale a aplicar as migrações pendentes.
+    return migrate_db()
 
 # --- Funções de Usuário ---
 def add_user(username, password, is_admin=False):
@@ -184,6 +280,42 @@ def delete_client(client_id):
                 conn.rollback()
                 return False
 
+# --- Funções de Turnos ---
+def add_shift(client_name, shift_name, start_time, end_time):
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            try:
+                cursor.execute("INSERT INTO shifts (client_name, shift_name, start_time, end_time) VALUES (%s, %s, %s, %s)",
+                               (client_name, shift_name, start_time, end_time))
+                conn.commit()
+                return True
+            except psycopg2.errors.UniqueViolation:
+                conn.rollback()
+                print(f"Erro: turno '{shift_name}' já cadastrado para o cliente {client_name}.")
+                return False
+            except Exception as e:
+                print(f"Erro ao adicionar turno: {e}")
+                conn.rollback()
+                return False
+
+def get_all_shifts():
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=DictCursor) as cursor:
+            cursor.execute("SELECT * FROM shifts ORDER BY client_name, start_time")
+            return cursor.fetchall()
+
+def delete_shift(shift_id):
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            try:
+                cursor.execute("DELETE FROM shifts WHERE id = %s", (shift_id,))
+                conn.commit()
+                return True
+            except Exception as e:
+                print(f"Erro ao deletar turno {shift_id}: {e}")
+                conn.rollback()
+                return False
+
 # --- Funções de Precificação ---
 def add_pricing(destination, price_per_ton, start_date_str, end_date_str):
     with get_db_connection() as conn:
@@ -243,9 +375,38 @@ def get_price_for_date(destination, target_date_obj):
                 return price_data['price_per_ton']
             return None
 
-# Para testar (opcional)
+# --- Relatórios de Carga de Dados ---
+def add_load_report(report):
+    """Grava o relatório de uma carga (dict de LoadProfiler.report())."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            try:
+                cursor.execute(
+                    "INSERT INTO load_reports (dataset_version, total_seconds, row_count, report) VALUES (%s, %s, %s, %s)",
+                    (report.get('version'), report.get('total_seconds', 0), report.get('rows'), json.dumps(report))
+                )
+                conn.commit()
+                return True
+            except Exception as e:
+                print(f"Erro ao gravar relatório de carga: {e}")
+                conn.rollback()
+                return False
+
+def get_recent_load_reports(limit=20):
+    """Relatórios de carga mais recentes primeiro (o JSONB já volta como dict)."""
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=DictCursor) as cursor:
+            cursor.execute("SELECT created_at, report FROM load_reports ORDER BY created_at DESC LIMIT %s", (limit,))
+            return cursor.fetchall()
+
+# Uso: `python database.py migrate` aplica as migrações; sem argumentos, testa a conexão.
 if __name__ == '__main__':
+    import sys
     load_dotenv()
+    if sys.argv[1:] == ['migrate']:
+        version = migrate_db()
+        print(f"Esquema do banco na versão {version}.")
+        sys.exit(0)
     try:
         conn_test = get_db_connection()
         if conn_test:
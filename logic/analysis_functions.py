@@ -1,7 +1,17 @@
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 
+from logic.resample import DEFAULT_GRAIN, build_matrix_cells, matrix_from_cells
+
+DIAS_DA_SEMANA = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
+# Pesos do mapa de calor dia da semana x hora: chave -> (coluna somada, rótulo); None = contagem de viagens
+WEEKDAY_HOUR_WEIGHTS = {
+    'volume': ('Volume', 'Volume'),
+    'revenue': ('Valor Bruto Total', 'Receita'),
+    'trips': (None, 'Viagens'),
+}
+
 def calculate_secondary_kpis(dff: pd.DataFrame) -> dict:
     """Calcula uma variedade de KPIs secundários a partir do DataFrame."""
     if dff.empty:
@@ -33,8 +43,7 @@ def get_volume_by_weekday(dff: pd.DataFrame) -> pd.DataFrame:
     """Agrupa o volume por dia da semana."""
     if dff.empty or 'Dia_Da_Semana_Num' not in dff.columns: return pd.DataFrame()
     volume_por_dia = dff.groupby('Dia_Da_Semana_Num')['Volume'].sum().reset_index()
-    dias = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
-    volume_por_dia['Dia_Da_Semana'] = pd.Categorical(volume_por_dia['Dia_Da_Semana_Num'].map(lambda x: dias[x]), categories=dias, ordered=True)
+    volume_por_dia['Dia_Da_Semana'] = pd.Categorical(volume_por_dia['Dia_Da_Semana_Num'].map(lambda x: DIAS_DA_SEMANA[x]), categories=DIAS_DA_SEMANA, ordered=True)
     return volume_por_dia.sort_values('Dia_Da_Semana_Num')
 
 def get_volume_by_hour(dff: pd.DataFrame) -> pd.DataFrame:
@@ -42,22 +51,33 @@ def get_volume_by_hour(dff: pd.DataFrame) -> pd.DataFrame:
     if dff.empty or 'Hora_Do_Dia' not in dff.columns: return pd.DataFrame()
     return dff.groupby('Hora_Do_Dia')['Volume'].sum().reset_index()
 
+def get_weekday_hour_matrices(dff: pd.DataFrame) -> dict:
+    """
+    Distribuição conjunta dia da semana x hora (7 x 24) para cada peso de WEEKDAY_HOUR_WEIGHTS:
+    um np.bincount ponderado sobre o código dia*24 + hora das colunas inteiras já calculadas.
+    """
+    if dff.empty or 'Dia_Da_Semana_Num' not in dff.columns or 'Hora_Do_Dia' not in dff.columns:
+        return {}
+    cells = dff['Dia_Da_Semana_Num'].to_numpy(dtype=np.int64) * 24 + dff['Hora_Do_Dia'].to_numpy(dtype=np.int64)
+    matrices = {}
+    for weight, (column, _) in WEEKDAY_HOUR_WEIGHTS.items():
+        if column is not None and column not in dff.columns:
+            continue
+        weights = None if column is None else np.nan_to_num(dff[column].to_numpy(dtype=float))
+        matrices[weight] = np.bincount(cells, weights=weights, minlength=7 * 24).reshape(7, 24)
+    return matrices
+
 def get_top_5_by_column(dff: pd.DataFrame, column: str, value_col: str) -> pd.DataFrame:
     """Retorna o Top 5 de uma coluna com base na soma de outra."""
     if dff.empty or column not in dff.columns or value_col not in dff.columns: return pd.DataFrame()
     return dff.groupby(column)[value_col].sum().nlargest(5).reset_index()
 
-def create_matrix_data(dff: pd.DataFrame) -> pd.DataFrame:
-    """Cria o DataFrame formatado para a tabela da Análise Matricial."""
-    if dff.empty or not all(col in dff.columns for col in ['Data_Apenas', 'TAG', 'Volume', 'Placa']):
+def create_matrix_data(dff: pd.DataFrame, grain=DEFAULT_GRAIN) -> pd.DataFrame:
+    """Cria o DataFrame formatado para a tabela da Análise Matricial (período x TAG, ver logic/resample.py)."""
+    if dff.empty or not all(col in dff.columns for col in ['Data_Hora', 'TAG', 'Volume', 'Placa']):
         print("AVISO em create_matrix_data: DataFrame vazio ou faltando colunas essenciais.")
         return pd.DataFrame()
-    
-    grouped = dff.groupby(['Data_Apenas', 'TAG']).agg(
-        Volume_Total=('Volume', 'sum'),
-        N_Viagens=('Placa', 'nunique')
-    ).reset_index()
-    return grouped
+    return matrix_from_cells(build_matrix_cells(dff), grain)
 
 def create_figure_from_df(fig_df: pd.DataFrame, chart_type: str, x_col: str, y_col: str, title: str, orientation='v', color_sequence=None) -> go.Figure:
     """
@@ -86,7 +106,8 @@ def create_figure_from_df(fig_df: pd.DataFrame, chart_type: str, x_col: str, y_c
     if color_sequence is None:
         color_sequence = default_color_sequence
 
-    # Criação da figura
+    # Criação da figura (plotly.express é pesado: importado só quando um gráfico é gerado)
+    import plotly.express as px
     if chart_type == 'bar':
         fig = px.bar(fig_df, x=x_col, y=y_col, title=title, text_auto='.2s',
                      color_discrete_sequence=color_sequence, orientation=orientation)
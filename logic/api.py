@@ -0,0 +1,359 @@
+# logic/api.py
+"""
+API somente leitura de agregados para ferramentas de BI: GET /api/v1/aggregate.
+
+Parâmetros (query string):
+  - group_by: dimensões separadas por vírgula, em ordem (day, week, destino, empresa,
+    material, placa, cliente). Vazio = um total único. week = semana ISO (data da segunda-feira).
+  - metrics: volume, revenue, trips (separadas por vírgula; padrão: todas).
+  - start_date, end_date (AAAA-MM-DD) e empresas, clientes, destinos, materiais, placas
+    (parâmetro repetido por valor): os mesmos filtros do painel (normalize_filters).
+  - format: json (padrão) ou csv.
+
+As respostas saem dos agregados já calculados: o cubo da versão do dataset (células dia x
+dimensões) quando a consulta não envolve placas; as linhas filtradas em cache quando envolve;
+e o arquivo de histórico para períodos anteriores à janela quente (logic/archive.py).
+O corpo pronto fica no cache de resultados por (versão, consulta), e o ETag é derivado só da
+versão e da consulta normalizada: um If-None-Match igual responde 304 sem tocar nos dados.
+Consultas que leem o arquivo de histórico incluem a versão do arquivo na versão.
+
+Autenticação: sessão do painel (Flask-Login) ou HTTP Basic com usuário e senha do painel.
+Credenciais Basic verificadas ficam em memória por API_AUTH_CACHE_SECONDS (o hash de senha
+é lento de propósito; clientes de BI repetem as mesmas credenciais a cada chamada), e
+falhas seguidas do mesmo endereço são bloqueadas por um tempo (resposta 429).
+"""
+import csv
+import hashlib
+import hmac
+import io
+import json
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from flask import Response, request, jsonify
+from flask_login import current_user
+
+import database
+from logic.archive import get_archive
+from logic.cache import get_result_cache
+from logic.cube import get_cube
+from logic.dataset import get_dataset
+from logic.filters import LIST_FILTERS, normalize_filters, filters_key, get_filtered_frame
+
+# Dimensões de agrupamento: nome na API -> chave do filtro (None = dimensão de tempo)
+API_GROUPS = {
+    'day': None,
+    'week': None,
+    'destino': 'destinos',
+    'empresa': 'empresas',
+    'material': 'materiais',
+    'placa': 'placas',
+    'cliente': 'clientes',
+}
+# Métricas: nome na API -> coluna somada (None = contagem de viagens)
+API_METRICS = {
+    'volume': 'Volume',
+    'revenue': 'Valor Bruto Total',
+    'trips': None,
+}
+API_FORMATS = {
+    'json': 'application/json',
+    'csv': 'text/csv',
+}
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+# Tempo que credenciais Basic verificadas ficam em memória (0 = verifica a senha em toda chamada)
+API_AUTH_CACHE_SECONDS = int(os.getenv("API_AUTH_CACHE_SECONDS", "300"))
+# Falhas de autenticação por endereço em API_AUTH_WINDOW_SECONDS antes de bloquear o endereço
+API_AUTH_MAX_FAILURES = int(os.getenv("API_AUTH_MAX_FAILURES", "10"))
+API_AUTH_WINDOW_SECONDS = int(os.getenv("API_AUTH_WINDOW_SECONDS", "300"))
+
+# Chave aleatória do processo: as credenciais em memória ficam só como HMAC, nunca em texto
+_auth_secret = os.urandom(32)
+_verified = {}   # usuário -> (HMAC(usuário, senha), usuário do banco, validade)
+_failures = {}   # endereço -> instantes das falhas recentes
+_auth_lock = threading.Lock()
+
+
+class QueryError(ValueError):
+    """Parâmetro inválido na consulta (resposta 400)."""
+
+
+def _split(raw) -> list:
+    return [item.strip().lower() for item in (raw or '').split(',') if item.strip()]
+
+
+def parse_query(args) -> dict:
+    """Consulta normalizada a partir da query string (levanta QueryError se inválida)."""
+    groups = _split(args.get('group_by'))
+    unknown = [group for group in groups if group not in API_GROUPS]
+    if unknown or len(set(groups)) != len(groups):
+        raise QueryError(f"group_by inválido: {', '.join(unknown) or 'dimensão repetida'} (use {', '.join(API_GROUPS)}).")
+    metrics = _split(args.get('metrics')) or list(API_METRICS)
+    unknown = [metric for metric in metrics if metric not in API_METRICS]
+    if unknown:
+        raise QueryError(f"metrics inválido: {', '.join(unknown)} (use {', '.join(API_METRICS)}).")
+    export_format = (args.get('format') or 'json').lower()
+    if export_format not in API_FORMATS:
+        raise QueryError(f"format inválido: {export_format} (use {', '.join(API_FORMATS)}).")
+    try:
+        filters = normalize_filters(args.get('start_date'), args.get('end_date'),
+                                    **{key: args.getlist(key) for key in LIST_FILTERS})
+    except (ValueError, TypeError):
+        raise QueryError("start_date/end_date inválidos (use AAAA-MM-DD).")
+    return {'groups': groups, 'metrics': list(dict.fromkeys(metrics)), 'filters': filters, 'format': export_format}
+
+
+def query_key(query) -> tuple:
+    return (tuple(query['groups']), tuple(query['metrics']), query['format']) + filters_key(query['filters'])
+
+
+def make_etag(version, query) -> str:
+    """ETag da resposta: versão dos dados (data_version) + consulta normalizada, sem tocar nos dados."""
+    digest = hashlib.blake2b(repr((version,) + query_key(query)).encode(), digest_size=12)
+    return digest.hexdigest()
+
+
+def _week_start(days: np.ndarray) -> np.ndarray:
+    # 1970-01-01 foi uma quinta-feira: segunda-feira da semana = dia - (dia + 3) % 7
+    return days - (days + 3) % 7
+
+
+def _day_labels(days: np.ndarray) -> list:
+    return (days.astype('datetime64[D]')).astype(str).tolist()
+
+
+def _aggregate_cube(dataset, query) -> pd.DataFrame:
+    """Agrupa as células do cubo (sem placas): uma chave inteira por grupo, np.unique e np.bincount."""
+    cube = get_cube(dataset)
+    mask = cube.mask(query['filters']) if len(cube) else np.zeros(0, dtype=bool)
+    days = cube.days[mask]
+    keys, decoders = [], []
+    for group in query['groups']:
+        if group in ('day', 'week'):
+            values = days if group == 'day' else _week_start(days)
+            decoders.append(_day_labels)
+        else:
+            values = cube.codes[API_GROUPS[group]][mask].astype(np.int64)
+            labels = np.array(cube.label_values[API_GROUPS[group]] + [None], dtype=object)
+            decoders.append(lambda codes, labels=labels: labels[codes].tolist())  # -1 -> None
+        keys.append(values)
+
+    # Chave combinada em base mista (cada grupo deslocado para 0..n-1)
+    combined = np.zeros(len(days), dtype=np.int64)
+    offsets, radixes = [], []
+    for values in keys:
+        offset = int(values.min()) if len(values) else 0
+        radix = int(values.max()) - offset + 1 if len(values) else 1
+        combined = combined * radix + (values - offset)
+        offsets.append(offset)
+        radixes.append(radix)
+    cells, inverse = np.unique(combined, return_inverse=True)
+
+    columns = {}
+    remainder = cells
+    for group, offset, radix, decode in reversed(list(zip(query['groups'], offsets, radixes, decoders))):
+        remainder, values = np.divmod(remainder, radix)
+        columns[group] = decode(values + offset)
+    frame = pd.DataFrame({group: columns[group] for group in query['groups']})
+    sums = {'trips': cube.trips[mask], 'volume': cube.volume[mask], 'revenue': cube.value[mask]}
+    for metric in query['metrics']:
+        frame[metric] = np.bincount(inverse, weights=sums[metric], minlength=len(cells))
+    return frame
+
+
+def _group_columns(chunk: pd.DataFrame, groups) -> pd.DataFrame:
+    # Colunas de agrupamento de um lote de viagens (dia/semana como datetime64[D])
+    days = chunk['Data_Hora'].to_numpy().astype('datetime64[D]')
+    columns = {}
+    for group in groups:
+        if group == 'day':
+            columns[group] = days
+        elif group == 'week':
+            columns[group] = _EPOCH + _week_start((days - _EPOCH).astype(np.int64))
+        else:
+            column = LIST_FILTERS[API_GROUPS[group]]
+            columns[group] = chunk[column].astype(object).to_numpy() if column in chunk.columns else np.full(len(chunk), None)
+    return pd.DataFrame(columns, index=chunk.index)
+
+
+def _aggregate_rows(chunks, query) -> pd.DataFrame:
+    """Agrupa lotes de viagens (linhas filtradas em cache ou lotes do arquivo) e soma os parciais."""
+    partials = []
+    for chunk in chunks:
+        frame = _group_columns(chunk, query['groups'])
+        frame['trips'] = 1
+        for metric, column in API_METRICS.items():
+            if column is not None:
+                frame[metric] = chunk[column].to_numpy(dtype=float) if column in chunk.columns else 0.0
+        if query['groups']:
+            frame = frame.groupby(query['groups'], dropna=False, sort=False).sum()
+        else:
+            frame = frame.sum().to_frame().T
+        partials.append(frame)
+    if not partials:
+        return pd.DataFrame(columns=query['groups'] + query['metrics'])
+    total = pd.concat(partials)
+    total = total.groupby(level=list(range(len(query['groups']))), dropna=False).sum().reset_index() \
+        if query['groups'] else total.sum().to_frame().T
+    for group in ('day', 'week'):
+        if group in total.columns:
+            total[group] = _day_labels(total[group].to_numpy())
+    return total[query['groups'] + query['metrics']]
+
+
+def _uses_archive(archive, filters) -> bool:
+    # Período (ou histórico inteiro, sem datas) anterior à janela quente
+    return archive is not None and (not filters.get('start_date') or archive.covers(filters['start_date']))
+
+
+def data_version(dataset, query) -> str:
+    """Versão dos dados da resposta: a do dataset, mais a do arquivo quando a consulta o lê."""
+    archive = get_archive(dataset)
+    return f"{dataset.version}+{archive.version}" if _uses_archive(archive, query['filters']) else dataset.version
+
+
+def aggregate(dataset, query) -> pd.DataFrame:
+    """Tabela agregada da consulta: grupos (em ordem) + métricas, ordenada pelos grupos."""
+    filters = query['filters']
+    archive = get_archive(dataset)
+    if _uses_archive(archive, filters):
+        # Período (ou histórico inteiro, sem datas) anterior à janela quente: varre o arquivo
+        if filters.get('start_date'):
+            start, end = (date.fromisoformat(filters[key]) for key in ('start_date', 'end_date'))
+        else:
+            start, end = min(archive.partitions), date.max - timedelta(days=1)
+        columns = [LIST_FILTERS[API_GROUPS[group]] for group in query['groups'] if API_GROUPS[group]]
+        columns += [column for column in API_METRICS.values() if column]
+        frame = _aggregate_rows(archive.scan(filters, columns, start, end), query)
+    elif 'placa' in query['groups'] or filters.get('placas'):
+        frame = _aggregate_rows([get_filtered_frame(dataset, filters)], query)
+    else:
+        frame = _aggregate_cube(dataset, query)
+    if 'trips' in frame.columns:
+        frame['trips'] = frame['trips'].astype(np.int64)
+    # Somas de ponto flutuante com 4 casas (sem resíduos como 0.30000000000000004)
+    for metric in ('volume', 'revenue'):
+        if metric in frame.columns:
+            frame[metric] = frame[metric].astype(float).round(4)
+    if query['groups']:
+        frame = frame.sort_values(query['groups'], na_position='last', kind='stable')
+    return frame.reset_index(drop=True)
+
+
+def render_body(dataset, query, frame: pd.DataFrame) -> bytes:
+    """Corpo da resposta no formato pedido (JSON com metadados, ou CSV padrão com cabeçalho)."""
+    if query['format'] == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerow(frame.columns)
+        writer.writerows(frame.itertuples(index=False, name=None))
+        return buffer.getvalue().encode('utf-8')
+    rows = frame.astype(object).where(frame.notna(), None).to_dict('records')
+    return json.dumps({
+        'version': dataset.version,
+        'group_by': query['groups'],
+        'metrics': query['metrics'],
+        'filters': query['filters'],
+        'rows': rows,
+    }, ensure_ascii=False, default=lambda value: value.item() if hasattr(value, 'item') else str(value)).encode('utf-8')
+
+
+def _credential_digest(username, password) -> bytes:
+    return hmac.new(_auth_secret, f"{username}\x00{password}".encode(), hashlib.sha256).digest()
+
+
+def _recent_failures(address, now) -> list:
+    # Falhas do endereço dentro da janela (chamado com _auth_lock)
+    recent = [moment for moment in _failures.get(address, ()) if now - moment < API_AUTH_WINDOW_SECONDS]
+    if recent:
+        _failures[address] = recent
+    else:
+        _failures.pop(address, None)
+    return recent
+
+
+def is_blocked(address) -> bool:
+    """True se o endereço passou de API_AUTH_MAX_FAILURES falhas na janela."""
+    with _auth_lock:
+        return len(_recent_failures(address, time.monotonic())) >= API_AUTH_MAX_FAILURES
+
+
+def load_user_from_basic_auth(flask_request):
+    """
+    request_loader do Flask-Login: usuário do painel via HTTP Basic, só nas rotas /api/.
+    Credenciais já verificadas respondem da memória (comparação em tempo constante);
+    endereços bloqueados por falhas seguidas não chegam a verificar a senha.
+    """
+    auth = flask_request.authorization
+    if not flask_request.path.startswith('/api/') or auth is None or not auth.username:
+        return None
+    address = flask_request.remote_addr or '-'
+    digest = _credential_digest(auth.username, auth.password or '')
+    now = time.monotonic()
+    with _auth_lock:
+        cached = _verified.get(auth.username)
+        if cached and cached[2] > now and hmac.compare_digest(cached[0], digest):
+            return cached[1]
+        if len(_recent_failures(address, now)) >= API_AUTH_MAX_FAILURES:
+            return None
+
+    try:
+        user = database.get_user_by_username(auth.username)
+    except Exception as e:
+        print(f"AVISO: autenticação da API indisponível: {e}")
+        return None
+    valid = bool(user) and database.check_password(user.password_hash, auth.password or '')
+    with _auth_lock:
+        if valid:
+            if API_AUTH_CACHE_SECONDS > 0:
+                _verified[auth.username] = (digest, user, now + API_AUTH_CACHE_SECONDS)
+                for key in [key for key, (_, _, expires) in _verified.items() if expires <= now]:
+                    del _verified[key]
+            return user
+        _verified.pop(auth.username, None)  # senha trocada: esquece a credencial antiga
+        _failures.setdefault(address, []).append(now)
+        if len(_failures) > 10000:
+            for stale in [key for key, moments in _failures.items() if now - moments[-1] >= API_AUTH_WINDOW_SECONDS]:
+                del _failures[stale]
+    return None
+
+
+def register_api_routes(server, login_manager):
+    """Expõe /api/v1/aggregate no servidor Flask (sessão do painel ou HTTP Basic)."""
+    login_manager.request_loader(load_user_from_basic_auth)
+
+    @server.route('/api/v1/aggregate')
+    def aggregate_endpoint():
+        # Cliente de API não segue o redirecionamento para /login: responde 401 com o desafio Basic
+        if not current_user.is_authenticated:
+            if is_blocked(request.remote_addr or '-'):
+                return Response(json.dumps({'error': 'muitas tentativas de autenticação; tente mais tarde'}), status=429,
+                                mimetype='application/json', headers={'Retry-After': str(API_AUTH_WINDOW_SECONDS)})
+            return Response(json.dumps({'error': 'autenticação necessária'}), status=401, mimetype='application/json',
+                            headers={'WWW-Authenticate': 'Basic realm="FleetMaster API"'})
+        try:
+            query = parse_query(request.args)
+        except QueryError as e:
+            return jsonify(error=str(e)), 400
+        dataset = get_dataset()
+        version = data_version(dataset, query)
+        etag = make_etag(version, query)
+        headers = {'Cache-Control': 'private, no-cache', 'Vary': 'Authorization, Cookie'}
+        if request.if_none_match.contains(etag):
+            response = Response(status=304, headers=headers)
+            response.set_etag(etag)
+            return response
+
+        body = get_result_cache().get_or_compute(
+            'api_aggregate', version, query_key(query),
+            lambda: render_body(dataset, query, aggregate(dataset, query)),
+            dumps=bytes, loads=bytes
+        )
+        response = Response(body, mimetype=API_FORMATS[query['format']], headers=headers)
+        response.set_etag(etag)
+        return response
@@ -0,0 +1,299 @@
+# logic/archive.py
+"""
+Histórico fora da memória: arquivo de viagens particionado por mês em Parquet.
+
+Com HISTORY_ARCHIVE_DIR definido, as viagens preparadas ficam em um arquivo por mês
+(trips-AAAA-MM.parquet, colunar, comprimido) e o dataset em memória de cada worker fica só
+com a janela quente: os últimos HOT_WINDOW_DAYS dias. Páginas e filtros dentro da janela
+quente operam sobre ela, com a mesma latência de antes.
+
+Cada versão dos dados tem seu próprio diretório imutável (<HISTORY_ARCHIVE_DIR>/<versão>/),
+gravado uma única vez: o primeiro worker que carrega a versão a monta num diretório
+temporário, sob um lock de arquivo, e a publica com um rename atômico; os demais encontram o
+diretório pronto e não gravam nada. CURRENT aponta para a versão mais recente. Nenhum worker
+apaga partições: versões antigas saem por scripts/prune_archive.py (fora dos workers), só
+depois de ARCHIVE_KEEP_SECONDS sem uso, então leituras em andamento nunca perdem arquivos.
+
+Consultas que precisam de períodos anteriores à janela varrem o arquivo: só as partições
+que cruzam o período, só as colunas necessárias, em lotes de ARCHIVE_BATCH_ROWS linhas.
+Totais (ex.: comparação dos KPIs com o mesmo período do ano anterior) são agregados lote a
+lote, com memória limitada ao tamanho do lote; páginas filtradas por um período anterior à
+janela usam um dataset só com as viagens do período (logic/dataset.dataset_for_filters).
+
+Requer pyarrow (em requirements.txt, o mesmo de logic/serialization.py); se ele faltar,
+o modo arquivo fica desligado com um AVISO e o dataset inteiro continua em memória.
+"""
+import os
+import re
+import shutil
+import time
+from contextlib import contextmanager
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from logic.cache import get_result_cache, dump_json, load_json
+from logic.cube import distinct_vehicles
+from logic.filters import LIST_FILTERS, filters_key, filter_mask
+
+# Diretório do arquivo de histórico (vazio = modo arquivo desligado)
+HISTORY_ARCHIVE_DIR = os.getenv("HISTORY_ARCHIVE_DIR")
+# Dias mais recentes mantidos em memória em modo arquivo
+HOT_WINDOW_DAYS = int(os.getenv("HOT_WINDOW_DAYS", "400"))
+# Linhas por lote na leitura do arquivo (e por row group na escrita)
+ARCHIVE_BATCH_ROWS = 65_536
+# Versões do arquivo sem uso há mais que isso podem ser removidas por scripts/prune_archive.py
+ARCHIVE_KEEP_SECONDS = int(os.getenv("ARCHIVE_KEEP_SECONDS", "86400"))
+
+_PARTITION_PATTERN = re.compile(r'^trips-(\d{4})-(\d{2})\.parquet$')
+_VERSION_PATTERN = re.compile(r'^[0-9a-f]+$')
+_CURRENT_FILE = 'CURRENT'
+_LOCK_FILE = '.lock'
+
+
+def _parquet():
+    """pyarrow.parquet sob demanda; None se o pyarrow não estiver instalado."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def _partition_name(month: np.datetime64) -> str:
+    return f"trips-{str(month)[:7]}.parquet"
+
+
+@contextmanager
+def _archive_lock(archive_dir):
+    """Lock exclusivo entre processos (fcntl); sem fcntl, só o rename atômico evita gravações duplicadas."""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(os.path.join(archive_dir, _LOCK_FILE), 'a') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _write_partitions(pa, df: pd.DataFrame, directory) -> int:
+    # Uma partição Parquet por mês em `directory`; retorna quantas foram gravadas
+    months = df['Data_Hora'].to_numpy().astype('datetime64[M]')
+    order = np.argsort(months, kind='stable')
+    sorted_months = months[order]
+    bounds = np.flatnonzero(np.r_[True, sorted_months[1:] != sorted_months[:-1], True])
+    written = 0
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        if np.isnat(sorted_months[lo]):
+            continue
+        table = pa.Table.from_pandas(df.iloc[order[lo:hi]], preserve_index=False)
+        pa.parquet.write_table(table, os.path.join(directory, _partition_name(sorted_months[lo])),
+                               compression='zstd', row_group_size=ARCHIVE_BATCH_ROWS)
+        written += 1
+    return written
+
+
+def _set_current(archive_dir, version):
+    tmp_path = os.path.join(archive_dir, f".{_CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(archive_dir, _CURRENT_FILE))
+
+
+def current_version(archive_dir=HISTORY_ARCHIVE_DIR):
+    """Versão apontada por CURRENT (a mais recente publicada), ou None."""
+    try:
+        with open(os.path.join(archive_dir, _CURRENT_FILE)) as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    return version if _VERSION_PATTERN.match(version) else None
+
+
+def write_archive(df: pd.DataFrame, version, archive_dir=HISTORY_ARCHIVE_DIR) -> bool:
+    """
+    Publica as viagens preparadas da versão `version` em <archive_dir>/<versão>/ (uma partição
+    Parquet por mês). Só o primeiro processo grava: os demais encontram o diretório pronto.
+    Nada é apagado aqui (ver prune_archive). False se não foi possível gravar.
+    """
+    pa = _parquet()
+    if pa is None:
+        print("AVISO: pyarrow não instalado; modo arquivo desligado (histórico inteiro em memória).")
+        return False
+    target = os.path.join(archive_dir, version)
+    build_dir = os.path.join(archive_dir, f".build-{version}-{os.getpid()}")
+    try:
+        os.makedirs(archive_dir, exist_ok=True)
+        with _archive_lock(archive_dir):
+            if os.path.isdir(target):
+                print(f"-> Histórico da versão {version} já arquivado em {target}.")
+            else:
+                os.makedirs(build_dir)
+                written = _write_partitions(pa, df, build_dir)
+                os.rename(build_dir, target)  # troca atômica: leitores nunca veem a versão pela metade
+                print(f"-> Histórico arquivado: {written} partições mensais em {target}.")
+            if current_version(archive_dir) != version:
+                _set_current(archive_dir, version)
+        return True
+    except Exception as e:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        if os.path.isdir(target):
+            return True  # outro processo (sem lock de arquivo) publicou a mesma versão antes
+        print(f"AVISO: não foi possível gravar o arquivo de histórico: {e}")
+        return False
+
+
+def prune_archive(archive_dir=HISTORY_ARCHIVE_DIR, keep_seconds=ARCHIVE_KEEP_SECONDS) -> list:
+    """
+    Remove versões do arquivo (e montagens interrompidas) sem uso há mais que keep_seconds,
+    nunca a versão CURRENT. Para rodar fora dos workers (scripts/prune_archive.py).
+    Retorna os diretórios removidos.
+    """
+    current = current_version(archive_dir)
+    now = time.time()
+    removed = []
+    with _archive_lock(archive_dir):
+        for entry in os.scandir(archive_dir):
+            is_version = _VERSION_PATTERN.match(entry.name) and entry.name != current
+            if not entry.is_dir() or not (is_version or entry.name.startswith('.build-')):
+                continue
+            if now - entry.stat().st_mtime > keep_seconds:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed.append(entry.path)
+    return removed
+
+
+def hot_window(df: pd.DataFrame, days=HOT_WINDOW_DAYS) -> pd.DataFrame:
+    """Viagens dos últimos `days` dias (contados a partir do último dia com viagens)."""
+    if df.empty:
+        return df
+    day = df['Data_Hora'].to_numpy().astype('datetime64[D]')
+    cutoff = day.max() - np.timedelta64(days - 1, 'D')
+    return df[day >= cutoff].reset_index(drop=True)
+
+
+class HistoryArchive:
+    """Partições mensais do arquivo e a data a partir da qual o dataset em memória cobre o histórico."""
+
+    def __init__(self, archive_dir, version, partitions, hot_start: date):
+        self.archive_dir = archive_dir  # diretório da versão (imutável)
+        self.version = version
+        self.partitions = partitions  # primeiro dia do mês (date) -> caminho, em ordem
+        self.hot_start = hot_start
+
+    def _touch(self):
+        # Marca a versão como em uso: prune_archive só remove versões paradas há ARCHIVE_KEEP_SECONDS
+        try:
+            os.utime(self.archive_dir)
+        except OSError:
+            pass
+
+    def covers(self, start) -> bool:
+        """True se o período que começa em `start` precisa do arquivo (começa antes da janela quente)."""
+        return self.hot_start is not None and date.fromisoformat(str(start)[:10]) < self.hot_start
+
+    def partitions_between(self, start: date, end: date):
+        """Caminhos das partições cujo mês cruza [start, end]."""
+        first_month = start.replace(day=1)
+        return [path for month, path in self.partitions.items() if first_month <= month <= end]
+
+    def scan(self, filters, columns, start: date, end: date):
+        """
+        Lotes (DataFrames) com as linhas do período que passam pelos filtros de lista,
+        lendo só as partições do período e só as colunas pedidas (+ as dos filtros).
+        """
+        pa = _parquet()
+        self._touch()
+        list_filters = dict(filters or {}, start_date=None, end_date=None)
+        needed = list(dict.fromkeys(['Data_Hora'] + list(columns) + [
+            column for key, column in LIST_FILTERS.items() if list_filters.get(key)
+        ]))
+        lo = np.datetime64(start.isoformat(), 'D')
+        hi = np.datetime64(end.isoformat(), 'D') + np.timedelta64(1, 'D')
+        for path in self.partitions_between(start, end):
+            parquet_file = pa.parquet.ParquetFile(path)
+            available = [column for column in needed if column in parquet_file.schema_arrow.names]
+            for batch in parquet_file.iter_batches(batch_size=ARCHIVE_BATCH_ROWS, columns=available):
+                chunk = batch.to_pandas()
+                moments = chunk['Data_Hora'].to_numpy()
+                mask = (moments >= lo) & (moments < hi) & filter_mask(chunk, list_filters)
+                if mask.any():
+                    yield chunk[mask]
+
+    def totals(self, filters, start, end) -> dict:
+        """Volume, receita, viagens e veículos distintos do período, agregados lote a lote (com cache)."""
+        start, end = date.fromisoformat(str(start)[:10]), date.fromisoformat(str(end)[:10])
+        list_filters = dict(filters or {}, start_date=None, end_date=None)
+
+        def compute():
+            sums = {'volume': 0.0, 'revenue': 0.0, 'trips': 0}
+            plates = set()
+            for chunk in self.scan(list_filters, ['Volume', 'Valor Bruto Total', 'Placa'], start, end):
+                sums['volume'] += float(np.nansum(chunk['Volume'].to_numpy(dtype=float)))
+                if 'Valor Bruto Total' in chunk.columns:
+                    sums['revenue'] += float(np.nansum(chunk['Valor Bruto Total'].to_numpy(dtype=float)))
+                sums['trips'] += len(chunk)
+                plates.update(chunk['Placa'].dropna().unique().tolist())
+            sums['vehicles'] = len(plates)
+            return sums
+
+        return get_result_cache().get_or_compute(
+            'archive_totals', self.version, (start.isoformat(), end.isoformat()) + filters_key(list_filters)[2:],
+            compute, dumps=dump_json, loads=load_json
+        )
+
+
+def open_archive(archive_dir, version, hot_start: date):
+    """Versão `version` do arquivo de histórico, ou None se ela não existir (ou sem pyarrow)."""
+    if not archive_dir or not version or _parquet() is None:
+        return None
+    version_dir = os.path.join(archive_dir, version)
+    if not os.path.isdir(version_dir):
+        return None
+    partitions = {}
+    for name in sorted(os.listdir(version_dir)):
+        match = _PARTITION_PATTERN.match(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = os.path.join(version_dir, name)
+    archive = HistoryArchive(version_dir, version, partitions, hot_start) if partitions else None
+    if archive is not None:
+        archive._touch()
+    return archive
+
+
+def get_archive(dataset):
+    """
+    Arquivo de histórico da versão atual (None fora do modo arquivo), aberto uma vez por versão:
+    a versão gravada na carga deste dataset, ou CURRENT (dataset vindo do snapshot).
+    """
+    if not HISTORY_ARCHIVE_DIR:
+        return None
+
+    def build(ds):
+        days = ds.df['Data_Hora'].dropna()
+        hot_start = days.min().date() if len(days) else None
+        return open_archive(HISTORY_ARCHIVE_DIR, ds.archive_version or current_version(HISTORY_ARCHIVE_DIR), hot_start)
+    return dataset.derive('archive', build)
+
+
+def period_totals(dataset, filters, start, end, index) -> dict:
+    """Somas do período: do índice em memória se a janela quente cobre o período, senão do arquivo."""
+    archive = get_archive(dataset)
+    if archive is not None and archive.covers(start):
+        totals = archive.totals(filters, start, end)
+        return {measure: totals[measure] for measure in ('volume', 'revenue', 'trips')}
+    return index.totals(start, end)
+
+
+def period_vehicles(dataset, filters, start, end) -> int:
+    """Veículos distintos do período: cubo da janela quente, ou varredura do arquivo para períodos anteriores."""
+    archive = get_archive(dataset)
+    if archive is not None and archive.covers(start):
+        return archive.totals(filters, start, end)['vehicles']
+    return distinct_vehicles(dataset, dict(filters, start_date=str(start)[:10], end_date=str(end)[:10]))
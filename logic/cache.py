@@ -0,0 +1,290 @@
+# logic/cache.py
+"""
+Cache de resultados compartilhado entre workers.
+
+Dois níveis:
+  1. LRU em memória no próprio processo (objetos já decodificados);
+  2. backend compartilhado entre os workers do host (bytes):
+       - 'disk'  (padrão): arquivos em CACHE_DIR. Em Linux o padrão é /dev/shm, ou seja,
+                 memória compartilhada; aponte para um disco comum se preferir persistência;
+       - 'redis' (opcional): qualquer servidor com protocolo Redis, via CACHE_REDIS_URL;
+       - 'none': só o nível em memória.
+
+Toda chave leva a versão do dataset: quando os dados mudam, a versão muda e todas as
+entradas antigas deixam de ser lidas de uma só vez (invalidação atômica). Entradas de
+versões antigas expiram por TTL; no disco, o total fica limitado a CACHE_DISK_MAX_MB
+(as entradas mais antigas saem primeiro).
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from logic.metrics import record_cache_event
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "disk").lower()
+CACHE_DIR = os.getenv("CACHE_DIR") or os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "fleetmaster-cache"
+)
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "3600"))
+LOCAL_CACHE_ITEMS = int(os.getenv("LOCAL_CACHE_ITEMS", "128"))
+# Limite do backend em disco (em /dev/shm é memória do host)
+CACHE_DISK_MAX_MB = int(os.getenv("CACHE_DISK_MAX_MB", "512"))
+KEY_PREFIX = "fleetmaster"
+
+
+# --- Serialização dos valores ---
+
+def dump_array(array: np.ndarray) -> bytes:
+    return json.dumps({'dtype': array.dtype.str, 'shape': array.shape}).encode() + b'\n' + array.tobytes()
+
+
+def load_array(raw: bytes) -> np.ndarray:
+    header, _, body = raw.partition(b'\n')
+    meta = json.loads(header)
+    return np.frombuffer(body, dtype=np.dtype(meta['dtype'])).reshape(meta['shape'])
+
+
+def dump_json(value) -> bytes:
+    from plotly.io.json import to_json_plotly  # serializa figuras e componentes Dash
+    return to_json_plotly(value).encode()
+
+
+def load_json(raw: bytes):
+    return json.loads(raw)
+
+
+# --- Backends compartilhados ---
+
+class CacheBackend:
+    """Interface mínima: bytes por chave, com TTL."""
+    name = 'none'
+
+    def get(self, key: str):
+        return None
+
+    def set(self, key: str, value: bytes, ttl: int = CACHE_TTL_SECONDS):
+        pass
+
+
+class DiskBackend(CacheBackend):
+    """Um arquivo por chave em <dir>/<versão>/<namespace>/; gravação atômica via os.replace."""
+    name = 'disk'
+    PRUNE_INTERVAL_SECONDS = 60
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_DISK_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._last_prune = 0.0
+        self._error_logged = False
+        os.makedirs(directory, exist_ok=True)
+
+    def _log_error(self, e):
+        if not self._error_logged:
+            print(f"AVISO: não foi possível gravar no cache em disco ({self.directory}), seguindo sem ele: {e}")
+            self._error_logged = True
+
+    def _path(self, key):
+        version, namespace, digest = key.split(':')[1:4]
+        return os.path.join(self.directory, version, namespace, digest[:2], digest)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > CACHE_TTL_SECONDS:
+                return None
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def set(self, key, value, ttl=CACHE_TTL_SECONDS):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+            os.utime(os.path.join(self.directory, key.split(':')[1]))  # marca a versão como em uso
+        except OSError as e:
+            # Disco cheio, sem permissão etc.: o valor segue só na memória local
+            self._log_error(e)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+        self._prune()
+
+    def _prune(self):
+        """
+        Remove diretórios de versões que ninguém grava há mais que o TTL e, se o total passar
+        de max_bytes, as entradas expiradas e depois as mais antigas até voltar ao limite.
+        """
+        now = time.time()
+        if now - self._last_prune < self.PRUNE_INTERVAL_SECONDS:
+            return
+        self._last_prune = now
+        entries = []
+        for version in os.scandir(self.directory):
+            try:
+                if not version.is_dir():
+                    continue
+                if now - version.stat().st_mtime > CACHE_TTL_SECONDS:
+                    shutil.rmtree(version.path, ignore_errors=True)
+                    continue
+                for root, _, files in os.walk(version.path):
+                    for name in files:
+                        path = os.path.join(root, name)
+                        stat = os.stat(path)
+                        entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes and now - mtime <= CACHE_TTL_SECONDS:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                continue
+
+
+class RedisBackend(CacheBackend):
+    """Backend opcional com protocolo Redis (requer o pacote `redis`)."""
+    name = 'redis'
+
+    def __init__(self, url=CACHE_REDIS_URL):
+        import redis
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self._error_logged = False
+
+    def _log_error(self, e):
+        if not self._error_logged:
+            print(f"AVISO: cache Redis indisponível, seguindo sem ele: {e}")
+            self._error_logged = True
+
+    def get(self, key):
+        try:
+            return self.client.get(key)
+        except Exception as e:
+            self._log_error(e)
+            return None
+
+    def set(self, key, value, ttl=CACHE_TTL_SECONDS):
+        try:
+            self.client.set(key, value, ex=ttl)
+        except Exception as e:
+            self._log_error(e)
+
+
+def build_backend(kind=CACHE_BACKEND) -> CacheBackend:
+    try:
+        if kind == 'disk':
+            return DiskBackend()
+        if kind == 'redis':
+            return RedisBackend()
+    except Exception as e:
+        print(f"AVISO: não foi possível iniciar o cache '{kind}' ({e}); usando apenas memória local.")
+    return CacheBackend()
+
+
+# --- Cache de resultados (memória local + backend compartilhado) ---
+
+def make_key(namespace, version, key) -> str:
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+    return f"{KEY_PREFIX}:{version}:{namespace}:{digest}"
+
+
+class ResultCache:
+    def __init__(self, backend: CacheBackend, local_items=LOCAL_CACHE_ITEMS):
+        self.backend = backend
+        self.local_items = local_items
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+
+    def _local_get(self, full_key):
+        with self._lock:
+            if full_key in self._local:
+                self._local.move_to_end(full_key)
+                return True, self._local[full_key]
+        return False, None
+
+    def _local_put(self, full_key, value):
+        with self._lock:
+            self._local[full_key] = value
+            self._local.move_to_end(full_key)
+            while len(self._local) > self.local_items:
+                self._local.popitem(last=False)
+
+    def peek(self, namespace, version, key, loads):
+        """(True, valor) se já estiver em algum nível do cache; (False, None) sem calcular nada."""
+        full_key = make_key(namespace, version, key)
+        found, value = self._local_get(full_key)
+        if found:
+            return True, value
+        raw = self.backend.get(full_key)
+        if raw is None:
+            return False, None
+        try:
+            value = loads(raw)
+        except Exception:
+            return False, None
+        self._local_put(full_key, value)
+        return True, value
+
+    def get_or_compute(self, namespace, version, key, compute, dumps, loads, ttl=CACHE_TTL_SECONDS):
+        """
+        Retorna o valor de (namespace, versão, chave): memória local, depois backend
+        compartilhado, e só então `compute()`. O valor é compartilhado: não modifique-o.
+        """
+        full_key = make_key(namespace, version, key)
+        found, value = self._local_get(full_key)
+        if found:
+            self.stats['local_hits'] += 1
+            record_cache_event(namespace, 'local_hit')
+            return value
+
+        raw = self.backend.get(full_key)
+        if raw is not None:
+            try:
+                value = loads(raw)
+            except Exception as e:
+                print(f"AVISO: entrada de cache corrompida em {namespace} ({e}); recalculando.")
+            else:
+                self.stats['shared_hits'] += 1
+                record_cache_event(namespace, 'shared_hit')
+                self._local_put(full_key, value)
+                return value
+
+        self.stats['misses'] += 1
+        record_cache_event(namespace, 'miss')
+        value = compute()
+        self.backend.set(full_key, dumps(value), ttl)
+        self._local_put(full_key, value)
+        return value
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache(build_backend())
+    return _result_cache
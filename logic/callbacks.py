@@ -4,22 +4,90 @@
 from dash import Input, Output, State, html, dcc, exceptions, no_update
 import dash_bootstrap_components as dbc
 import pandas as pd
-from io import StringIO
 from flask_login import login_user, logout_user, current_user
 from datetime import datetime # Para manipulação de datas
 
 import database
+from logic.dataset import get_dataset, dataset_for_filters, recent_load_reports, reassign_shifts, reassign_clients
+from logic.filters import normalize_filters, filters_key, make_filter_token, filters_from_token, get_filtered_frame
+from logic.singleflight import SingleFlight
+from logic.cube import facet_options, distinct_vehicles
+from logic.plate_index import plate_options
+from logic.time_index import period_comparison, get_time_index
+from logic.resample import GRAINS, matrix_table
+from logic.archive import period_vehicles
+from logic.fleet_efficiency import fleet_efficiency
+from logic.congestion import congestion_analysis
+from logic.pricing_coverage import get_pricing_coverage
+from logic.clients import client_rollup, unmapped_destinations
+from logic.shifts import find_overlap, parse_minute
+from logic.jobs import get_background_manager, require_login_for_outputs
+from logic.cache import get_result_cache, dump_json, load_json
 from components.header import TOPBAR_NAV_ITEMS
-from components.common_components import create_page_header
-from components.tabs.analysis_tab import create_analysis_tab_layout
-from components.tabs.matrix_tab import create_matrix_tab_layout
+from components.common_components import create_page_header, create_background_page_placeholder, create_export_buttons
+from components.tabs.analysis_tab import create_analysis_tab_layout, create_weekday_hour_figure, create_time_series_figure
+from components.tabs.matrix_tab import create_matrix_tab_layout, matrix_table_props
 from components.tabs.efficiency_tab import create_efficiency_tab_layout
+from components.tabs.congestion_tab import create_congestion_tab_layout
 from components.tabs.user_management_tab import create_user_management_layout
 from components.tabs.client_registration_tab import create_client_registration_layout
-from components.tabs.pricing_registration_tab import create_pricing_registration_layout
+from components.tabs.pricing_registration_tab import create_pricing_registration_layout, create_pricing_coverage_content
+from components.tabs.shift_registration_tab import create_shift_registration_layout, shift_table_data
+from components.tabs.load_report_tab import create_load_report_layout
+
+# Páginas de análise: layout depende só de (versão do dataset, filtros, página)
+DATA_PAGE_LAYOUTS = {
+    "/": create_analysis_tab_layout,
+    "/matrix": create_matrix_tab_layout,
+    "/efficiency": create_efficiency_tab_layout,
+    "/congestion": create_congestion_tab_layout,
+}
+
+# Argumentos extras de cada página, calculados com as estruturas derivadas da versão do dataset
+DATA_PAGE_EXTRAS = {
+    "/": lambda dataset, filters, dff: {'distinct_vehicles': distinct_vehicles(dataset, filters), 'export_filters': filters,
+                                        'client_rollup': client_rollup(dataset, filters)},
+    "/matrix": lambda dataset, filters, dff: {'export_filters': filters, 'matrix': matrix_table(dataset, filters)},
+    "/efficiency": lambda dataset, filters, dff: {'efficiency': fleet_efficiency(dataset, dff)},
+    "/congestion": lambda dataset, filters, dff: {'congestion': congestion_analysis(dataset, dff)},
+}
+
+# Páginas pesadas: com o gerenciador de jobs disponível, são calculadas em segundo plano
+# (subprocesso) na primeira vez; as visitas seguintes saem direto do cache de resultados.
+BACKGROUND_PAGES = {"/matrix": "Calculando a matriz..."}
+
+# Usuários abrindo a mesma página com os mesmos filtros ao mesmo tempo compartilham um único cálculo
+_page_flight = SingleFlight('pages')
+
+def _build_data_page(dataset, filters, pathname):
+    # O layout serializado (figuras incluídas) fica no cache compartilhado entre workers
+    def compute():
+        dff = get_filtered_frame(dataset, filters)
+        extras = DATA_PAGE_EXTRAS[pathname](dataset, filters, dff) if pathname in DATA_PAGE_EXTRAS else {}
+        return DATA_PAGE_LAYOUTS[pathname](dff, 'dark', **extras)
+    return get_result_cache().get_or_compute(
+        'page', dataset.version, (pathname, filters_key(filters)), compute,
+        dumps=dump_json, loads=load_json
+    )
+
+def _load_reports():
+    # Histórico do banco; sem banco, os relatórios deste processo
+    try:
+        return [row['report'] for row in database.get_recent_load_reports()]
+    except Exception as e:
+        print(f"AVISO: não foi possível ler os relatórios de carga do banco: {e}")
+        return recent_load_reports()
+
+def _pricing_coverage(dataset):
+    # Cobertura da precificação cadastrada; None se o banco não responder
+    try:
+        return get_pricing_coverage(dataset, database.get_all_pricing())
+    except Exception as e:
+        print(f"AVISO: não foi possível calcular a cobertura da precificação: {e}")
+        return None
 
 # --- 2. FUNÇÃO DE REGISTRO DE CALLBACKS ---
-def register_callbacks(app, df): # 'app' e 'df' são passados aqui
+def register_callbacks(app): # Os dados são obtidos sob demanda via get_dataset()
     # TODOS OS CALLBACKS ABAIXO ESTÃO CORRETAMENTE INDENTADOS.
 
     # CALLBACK 1: O "PORTEIRO" DE VISIBILIDADE
@@ -44,7 +112,7 @@ def register_callbacks(app, df): # 'app' e 'df' são passados aqui
         Input('filtered-data-store', 'data'),
         Input('filter-toggle-store', 'data'), # NOVO INPUT
     )
-    def render_page_content_and_title(pathname, jsonified_data, filter_toggle_state): # NOVO ARGUMENTO
+    def render_page_content_and_title(pathname, filter_token, filter_toggle_state): # NOVO ARGUMENTO
         # Lógica de autenticação
         if not current_user.is_authenticated:
             if pathname == "/logout":
@@ -52,15 +120,14 @@ def register_callbacks(app, df): # 'app' e 'df' são passados aqui
             else:
                 raise exceptions.PreventUpdate
 
-        dff = pd.read_json(StringIO(jsonified_data), orient='split') if jsonified_data else df.copy()
-        dff['Data_Hora'] = pd.to_datetime(dff['Data_Hora'])
-        dff['Data_Apenas'] = pd.to_datetime(dff['Data_Apenas']).dt.date
-        dff['Dia_Da_Semana_Num'] = dff['Data_Hora'].dt.dayofweek
+        # O store traz só o token de filtros; o DataFrame é resolvido no servidor, já tipado
+        dataset = get_dataset()
+        filters = filters_from_token(filter_token)
         
         page_content = html.Div()
         
         # Determine se o filtro deveria estar visível pelo pathname
-        filter_visible_by_pathname = (pathname in ["/", "/matrix", "/efficiency"])
+        filter_visible_by_pathname = (pathname in DATA_PAGE_LAYOUTS)
         
         # Determine o estado atual do filtro pelo botão de alternar
         is_hidden_by_toggle = filter_toggle_state.get('is_hidden', False)
@@ -74,20 +141,31 @@ def register_callbacks(app, df): # 'app' e 'df' são passados aqui
             final_content_col_width = 12
 
         # Roteamento de conteúdo com base no pathname
-        if pathname == "/":
-            page_content = create_analysis_tab_layout(dff, 'dark')
-        elif pathname == "/matrix":
-            page_content = create_matrix_tab_layout(dff, 'dark')
-        elif pathname == "/efficiency":
-            page_content = create_efficiency_tab_layout(dff, 'dark')
+        if pathname in BACKGROUND_PAGES and get_background_manager() is not None:
+            dataset = dataset_for_filters(dataset, filters)  # período anterior à janela quente: lido do arquivo
+            found, cached_page = get_result_cache().peek('page', dataset.version, (pathname, filters_key(filters)), load_json)
+            page_content = cached_page if found else create_background_page_placeholder(pathname, filter_token, BACKGROUND_PAGES[pathname])
+        elif pathname in DATA_PAGE_LAYOUTS:
+            dataset = dataset_for_filters(dataset, filters)
+            page_content = _page_flight.do(
+                (dataset.version, filters_key(filters), pathname),
+                _build_data_page, dataset, filters, pathname
+            )
         elif pathname == "/register-client":
-            page_content = create_client_registration_layout(dff, 'dark')
+            page_content = create_client_registration_layout(get_filtered_frame(dataset, filters), 'dark', unmapped_destinations(dataset))
+        elif pathname == "/register-shift":
+            page_content = create_shift_registration_layout('dark')
         elif pathname == "/pricing":
-            page_content = create_pricing_registration_layout(dff, 'dark')
+            page_content = create_pricing_registration_layout(get_filtered_frame(dataset, filters), 'dark', _pricing_coverage(dataset))
         elif pathname == "/management/users":
             if not current_user.is_admin:
                 return (dbc.Alert("Acesso negado: Você não tem permissão para esta página.", color="danger", className="m-4"), final_filter_style, final_content_col_width)
             page_content = create_user_management_layout()
+        elif pathname == "/management/load-report":
+            if not current_user.is_admin:
+                return (dbc.Alert("Acesso negado: Você não tem permissão para esta página.", color="danger", className="m-4"), final_filter_style, final_content_col_width)
+            get_dataset()  # garante ao menos a carga atual no relatório
+            page_content = create_load_report_layout(_load_reports())
         elif pathname in ["/management/equipment", "/settings"]:
             page_title_text = next((item["label"] for item in TOPBAR_NAV_ITEMS if item["href"] == pathname), "Página")
             page_content = html.Div([create_page_header(page_title_text, f"Funcionalidade em desenvolvimento."), dbc.Alert("Em breve.", color="info", className="m-4")])
@@ -217,15 +295,10 @@ def register_callbacks(app, df): # 'app' e 'df' são passados aqui
                 no_update # Lista não muda
             )
 
-        # Lógica de cálculo que será usada em AMBOS os retornos (sucesso e falha)
-        unique_destinations_from_df = sorted(df['Destino'].dropna().unique()) if 'Destino' in df.columns else []
-        registered_clients = database.get_all_clients()
-        registered_destinations = {client['destination'] for client in registered_clients}
-        
-        destinations_without_client = [
-            dest for dest in unique_destinations_from_df 
-            if dest not in registered_destinations
-        ]
+        success = database.add_client(client_name, destination)
+        # Com o cliente novo, refaz as colunas Cliente/Turno (nova versão); a lista sai do cubo da versão
+        dataset = reassign_clients() if success else get_dataset()
+        destinations_without_client = unmapped_destinations(dataset)
 
         new_destinations_list_component = html.Div([
             dbc.ListGroup([
@@ -236,7 +309,7 @@ def register_callbacks(app, df): # 'app' e 'df' são passados aqui
         new_dropdown_options = [{'label': dest, 'value': dest} for dest in destinations_without_client]
 
 
-        if database.add_client(client_name, destination):
+        if success:
             return (
                 dbc.Alert(f"Cliente '{client_name}' para Destino '{destination}' cadastrado com sucesso!", color="success", duration=3000),
                 new_dropdown_options,
@@ -328,6 +401,7 @@ def register_callbacks(app, df): # 'app' e 'df' são passados aqui
             if 'price_per_ton' in row and pd.notnull(row['price_per_ton']):
                 row['price_per_ton'] = f"{row['price_per_ton']:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
+        df = get_dataset().df
         unique_destinations_from_df = sorted(df['Destino'].dropna().unique()) if 'Destino' in df.columns else []
         new_dropdown_options_pricing = [{'label': dest, 'value': dest} for dest in unique_destinations_from_df]
 
@@ -352,6 +426,94 @@ def register_callbacks(app, df): # 'app' e 'df' são passados aqui
                 pricing_table_data, # Atualiza a tabela (mesmo em caso de falha, para refletir o estado atual)
                 new_dropdown_options_pricing # Atualiza as opções do dropdown
             )
+
+    # NOVO CALLBACK: Recalcula a cobertura da precificação quando a tabela de preços muda
+    @app.callback(
+        Output('pricing-coverage-section', 'children'),
+        Input('registered-pricing-table', 'data'),
+        prevent_initial_call=True
+    )
+    def update_pricing_coverage(_pricing_table_data):
+        if not current_user.is_authenticated:
+            raise exceptions.PreventUpdate
+        return create_pricing_coverage_content(_pricing_coverage(get_dataset()), 'dark')
+
+    # NOVO CALLBACK: Para o cadastro de turnos por cliente
+    @app.callback(
+        Output('shift-registration-output', 'children'),
+        Output('registered-shifts-table', 'data'),
+        Output('shift-name-input', 'value'),
+        Input('register-shift-button', 'n_clicks'),
+        State('shift-client-dropdown', 'value'),
+        State('shift-name-input', 'value'),
+        State('shift-start-time-input', 'value'),
+        State('shift-end-time-input', 'value'),
+        prevent_initial_call=True
+    )
+    def handle_shift_registration(n_clicks, client_name, shift_name, start_time, end_time):
+        if not current_user.is_authenticated:
+            raise exceptions.PreventUpdate
+
+        shift_name = (shift_name or "").strip()
+        if not all([client_name, shift_name, start_time, end_time]):
+            return dbc.Alert("Preencha o cliente, o nome e os horários do turno.", color="warning", duration=3000), no_update, no_update
+        try:
+            parse_minute(start_time), parse_minute(end_time)
+        except ValueError:
+            return dbc.Alert("Horário inválido. Use HH:MM.", color="danger", duration=3000), no_update, no_update
+
+        # Turnos do mesmo cliente não podem se sobrepor (inclusive os que atravessam a meia-noite)
+        client_shifts = [
+            (row['shift_name'], row['start_time'], row['end_time'])
+            for row in database.get_all_shifts() if row['client_name'] == client_name
+        ]
+        overlapping = find_overlap(client_shifts, start_time, end_time)
+        if overlapping:
+            return (
+                dbc.Alert(f"O turno se sobrepõe ao turno '{overlapping}' do cliente '{client_name}'.", color="danger", duration=5000),
+                no_update, no_update
+            )
+
+        if not database.add_shift(client_name, shift_name, start_time, end_time):
+            return (
+                dbc.Alert(f"Falha ao cadastrar turno. O turno '{shift_name}' pode já existir para '{client_name}'.", color="danger", duration=5000),
+                shift_table_data(), shift_name
+            )
+
+        # Re-rotula as viagens com os turnos cadastrados (nova versão do dataset)
+        reassign_shifts()
+        return (
+            dbc.Alert(f"Turno '{shift_name}' ({start_time} a {end_time}) cadastrado para '{client_name}'. Viagens re-rotuladas.", color="success", duration=3000),
+            shift_table_data(), None
+        )
+
+    # NOVO CALLBACK: Exclusão do turno selecionado na tabela
+    @app.callback(
+        Output('shift-registration-output', 'children', allow_duplicate=True),
+        Output('registered-shifts-table', 'data', allow_duplicate=True),
+        Output('registered-shifts-table', 'selected_rows'),
+        Input('delete-shift-button', 'n_clicks'),
+        State('registered-shifts-table', 'selected_rows'),
+        State('registered-shifts-table', 'data'),
+        prevent_initial_call=True
+    )
+    def handle_shift_deletion(n_clicks, selected_rows, table_data):
+        if not current_user.is_authenticated or not n_clicks:
+            raise exceptions.PreventUpdate
+        if not selected_rows or not table_data or selected_rows[0] >= len(table_data):
+            return dbc.Alert("Selecione na tabela o turno a excluir.", color="warning", duration=3000), no_update, no_update
+
+        row = table_data[selected_rows[0]]
+        if not database.delete_shift(row['id']):
+            return dbc.Alert(f"Falha ao excluir o turno '{row['shift_name']}'.", color="danger", duration=5000), shift_table_data(), []
+
+        # Re-rotula as viagens sem o turno excluído (nova versão do dataset)
+        reassign_shifts()
+        return (
+            dbc.Alert(f"Turno '{row['shift_name']}' de '{row['client_name']}' excluído. Viagens re-rotuladas.", color="success", duration=3000),
+            shift_table_data(), []
+        )
+
     # Este é o callback que faltava para conectar os filtros aos gráficos.
     # ==================================================================
     @app.callback(
@@ -360,37 +522,153 @@ def register_callbacks(app, df): # 'app' e 'df' são passados aqui
         Input('date-picker-range', 'end_date'),
         Input('empresa-dropdown', 'value'),
         Input('destino-dropdown', 'value'),
-        Input('material-dropdown', 'value')
+        Input('material-dropdown', 'value'),
+        Input('placa-dropdown', 'value'),
+        Input('cliente-dropdown', 'value')
     )
-    def update_filtered_data_store(start_date, end_date, selected_empresas, selected_destinos, selected_materiais):
+    def update_filtered_data_store(start_date, end_date, selected_empresas, selected_destinos, selected_materiais, selected_placas,
+                                   selected_clientes=None):
         """
         Este callback é acionado sempre que um filtro é alterado.
-        Ele filtra o DataFrame principal e salva o resultado no dcc.Store.
+        Ele normaliza os filtros e salva no dcc.Store apenas o token (versão + filtros);
+        a filtragem acontece no servidor, coalescida entre usuários (ver logic/filters.py).
         """
-        # Começa com uma cópia do DataFrame original
-        dff = df.copy()
+        filters = normalize_filters(
+            start_date, end_date,
+            empresas=selected_empresas, destinos=selected_destinos, materiais=selected_materiais,
+            placas=selected_placas, clientes=selected_clientes
+        )
+        return make_filter_token(get_dataset(), filters)
+  
 
-        # 1. Filtro por Data
-        if start_date and end_date:
-            start_date_obj = pd.to_datetime(start_date).date()
-            end_date_obj = pd.to_datetime(end_date).date()
-            dff = dff[dff['Data_Apenas'].between(start_date_obj, end_date_obj)]
+    # CALLBACK 5.1: OPÇÕES DOS FILTROS EM CASCATA
+    @app.callback(
+        Output('empresa-dropdown', 'options'),
+        Output('destino-dropdown', 'options'),
+        Output('material-dropdown', 'options'),
+        Output('cliente-dropdown', 'options'),
+        Input('filtered-data-store', 'data'),
+    )
+    def update_filter_options(filter_token):
+        """
+        Recalcula as opções de cada dropdown (com contagem de viagens) a partir da seleção
+        das outras dimensões, usando o cubo pré-agregado da versão atual do dataset.
+        Dispara também no carregamento, então as opções nunca ficam presas a uma versão antiga.
+        """
+        filters = filters_from_token(filter_token)
+        options = facet_options(dataset_for_filters(get_dataset(), filters), filters)
+        return options['empresas'], options['destinos'], options['materiais'], options['clientes']
 
-        # 2. Filtro por Empresa
-        if selected_empresas: # Se a lista não estiver vazia
-            dff = dff[dff['Empresa'].isin(selected_empresas)]
+    # CALLBACK 5.2: BUSCA DE PLACAS NO SERVIDOR
+    @app.callback(
+        Output('placa-dropdown', 'options'),
+        Input('placa-dropdown', 'search_value'),
+        State('placa-dropdown', 'value'),
+    )
+    def search_plate_options(search_value, selected_placas):
+        """
+        Devolve as placas (com mais viagens primeiro) que começam com o texto digitado,
+        a partir do índice ordenado da versão atual; as já selecionadas continuam nas opções.
+        """
+        return plate_options(get_dataset(), search_value, selected_placas)
 
-        # 3. Filtro por Destino
-        if selected_destinos: # Se a lista não estiver vazia
-            dff = dff[dff['Destino'].isin(selected_destinos)]
+    # CALLBACK 5.3: COMPARAÇÃO DOS KPIs COM OUTRO PERÍODO
+    KPI_DELTA_IDS = ['kpi-total-volume', 'kpi-total-revenue', 'kpi-total-trips', 'kpi-avg-ticket']
 
-        # 4. Filtro por Material
-        if selected_materiais: # Se a lista não estiver vazia
-            dff = dff[dff['Material'].isin(selected_materiais)]
+    @app.callback(
+        [Output(f'{kpi_id}-delta', prop) for kpi_id in KPI_DELTA_IDS for prop in ('children', 'className')],
+        Input('kpi-comparison-mode', 'value'),
+        Input('filtered-data-store', 'data'),
+    )
+    def update_kpi_comparison(mode, filter_token):
+        """
+        Variação dos KPIs contra o período anterior de mesmo tamanho (ou o mesmo período
+        do ano anterior). Volume e receita saem do índice de somas acumuladas; veículos
+        distintos, da união dos resumos de placas do cubo. Nada refiltra as linhas e o
+        layout da página (em cache) não muda.
+        """
+        empty = ["", "kpi-delta"] * len(KPI_DELTA_IDS)
+        if not mode or mode == 'none':
+            return empty
+        dataset, filters = get_dataset(), filters_from_token(filter_token)
+        comparison = period_comparison(dataset, filters, mode)
+        if comparison is None:
+            return empty
+
+        vehicles = [
+            period_vehicles(dataset, filters, start, end)
+            for start, end in (comparison['period'], comparison['base_period'])
+        ]
+        revenue = [comparison['current']['revenue'], comparison['base']['revenue']]
+        pairs = [
+            (comparison['current']['volume'], comparison['base']['volume']),
+            tuple(revenue),
+            tuple(vehicles),
+            tuple(value / count if count else 0 for value, count in zip(revenue, vehicles)),
+        ]
 
-        # Converte o DataFrame filtrado para JSON e o armazena
-        return dff.to_json(date_format='iso', orient='split')
-  
+        base_start, base_end = (datetime.fromisoformat(day).strftime('%d/%m/%Y') for day in comparison['base_period'])
+        outputs = []
+        for current, base in pairs:
+            if not base:
+                outputs += [f"Sem dados em {base_start} – {base_end}", "kpi-delta"]
+                continue
+            delta = current / base - 1
+            arrow = "▲" if delta > 0 else "▼" if delta < 0 else "="
+            text = f"{arrow} {abs(delta):.1%} vs {base_start} – {base_end}".replace(".", ",")
+            outputs += [text, f"kpi-delta {'positive' if delta > 0 else 'negative' if delta < 0 else ''}".strip()]
+        return outputs
+
+    # CALLBACK 5.4: PESO DO MAPA DE CALOR DIA DA SEMANA x HORA
+    @app.callback(
+        Output('weekday-hour-heatmap', 'figure'),
+        Input('weekday-hour-weight', 'value'),
+        State('weekday-hour-store', 'data'),
+        prevent_initial_call=True
+    )
+    def update_weekday_hour_heatmap(weight, matrices):
+        """As três matrizes 7 x 24 já vêm com a página: trocar o peso não refiltra nem reagrupa."""
+        if not matrices or weight not in matrices:
+            raise exceptions.PreventUpdate
+        return create_weekday_hour_figure(matrices[weight], weight, 'dark')
+
+    # CALLBACK 5.5: EVOLUÇÃO NO TEMPO NA GRANULARIDADE ESCOLHIDA
+    @app.callback(
+        Output('time-series-graph', 'figure'),
+        Input('time-grain', 'value'),
+        State('filtered-data-store', 'data'),
+    )
+    def update_time_series(grain, filter_token):
+        """
+        Série do período filtrado lida do índice de somas acumuladas por hora (por versão e
+        filtros de lista): trocar a granularidade ou o período não reagrupa as viagens.
+        """
+        if grain not in GRAINS:
+            raise exceptions.PreventUpdate
+        filters = filters_from_token(filter_token)
+        dataset = dataset_for_filters(get_dataset(), filters)
+        labels, sums = get_time_index(dataset, filters).series(grain, filters.get('start_date'), filters.get('end_date'))
+        return create_time_series_figure(labels, sums, grain, 'dark')
+
+    # CALLBACK 5.6: GRANULARIDADE DA MATRIZ
+    @app.callback(
+        Output('matrix-datatable', 'columns'),
+        Output('matrix-datatable', 'data'),
+        Output('matrix-export-buttons', 'children'),
+        Input('matrix-grain', 'value'),
+        State('filtered-data-store', 'data'),
+        prevent_initial_call=True
+    )
+    def update_matrix_grain(grain, filter_token):
+        """
+        Matriz período x TAG na granularidade escolhida, do cache de matrizes (logic/resample.py),
+        e os links de exportação apontando para a mesma granularidade.
+        """
+        if grain not in GRAINS:
+            raise exceptions.PreventUpdate
+        filters = filters_from_token(filter_token)
+        columns, data = matrix_table_props(matrix_table(dataset_for_filters(get_dataset(), filters), filters, grain))
+        return columns, data, create_export_buttons('matrix', filters, "Exportar matriz", grain=grain)
 
     # CALLBACK 6: LIMPAR FILTROS
     @app.callback(
@@ -400,20 +678,61 @@ def register_callbacks(app, df): # 'app' e 'df' são passados aqui
         Output('empresa-dropdown', 'value'),
         Output('destino-dropdown', 'value'),
         Output('material-dropdown', 'value'),
+        Output('placa-dropdown', 'value'),
+        Output('cliente-dropdown', 'value'),
         Input('clear-filters-button', 'n_clicks'),
         prevent_initial_call=True
     )
     def clear_all_filters(n_clicks):
         """
-        Limpa todos os filtros de data, empresa, destino e material,
+        Limpa todos os filtros de data, empresa, cliente, destino, material e placa,
         restaurando os dados completos no dcc.Store.
         """
-        start_date = df['Data_Apenas'].min()
-        end_date = df['Data_Apenas'].max()
+        dataset = get_dataset()
+        start_date = dataset.df['Data_Apenas'].min()
+        end_date = dataset.df['Data_Apenas'].max()
         
-        return df.to_json(date_format='iso', orient='split'), \
+        return make_filter_token(dataset, normalize_filters(start_date, end_date)), \
                start_date, end_date, \
-               [], [], []
+               [], [], [], [], []
+
+    # CALLBACK 6.1: PÁGINAS PESADAS EM SEGUNDO PLANO (com progresso e cancelamento)
+    background_manager = get_background_manager()
+    if background_manager is not None:
+        # O job roda sem contexto de requisição: a autenticação é checada antes de dispará-lo
+        require_login_for_outputs(app.server, ['background-page-body'])
+
+        @app.callback(
+            Output('background-page-body', 'children'),
+            Input('background-page-request', 'data'),
+            background=True,
+            manager=background_manager,
+            progress=[Output('background-page-progress', 'value'), Output('background-page-progress', 'label')],
+            # Mudou filtro, página ou clicou em cancelar: o job em andamento é encerrado
+            cancel=[Input('filtered-data-store', 'data'), Input('url', 'pathname'), Input('background-page-cancel', 'n_clicks')],
+            interval=500,
+        )
+        def render_background_page(set_progress, page_request):
+            if not page_request or page_request.get('pathname') not in DATA_PAGE_LAYOUTS:
+                raise exceptions.PreventUpdate
+            set_progress((10, "Carregando dados..."))
+            filters = filters_from_token(page_request.get('token'))
+            dataset = dataset_for_filters(get_dataset(), filters)
+            set_progress((35, "Aplicando filtros..."))
+            get_filtered_frame(dataset, filters)
+            set_progress((70, "Montando a página..."))
+            # O resultado vai para o cache compartilhado: a próxima visita não dispara job
+            return _build_data_page(dataset, filters, page_request['pathname'])
+
+        @app.callback(
+            Output('background-page-body', 'children', allow_duplicate=True),
+            Input('background-page-cancel', 'n_clicks'),
+            prevent_initial_call=True
+        )
+        def show_background_page_cancelled(n_clicks):
+            if not n_clicks:
+                raise exceptions.PreventUpdate
+            return dbc.Alert("Cálculo cancelado. Ajuste os filtros ou abra a página novamente.", color="secondary", className="m-4")
 
     # CALLBACK 7: TOGGLE DA BARRA LATERAL (Agora não faz nada visualmente, só muda a classe)
     @app.callback(
@@ -421,7 +740,6 @@ def register_callbacks(app, df): # 'app' e 'df' são passados aqui
         [Input('navbar-toggler', 'n_clicks')], # Entrada do botão hamburguer
     )
     def toggle_navbar_collapse(n_clicks): # n_clicks é o único argumento agora
-        print(f"DEBUG: toggle_navbar_collapse acionado. n_clicks: {n_clicks}")
         if n_clicks is None:
             # Se não houve cliques ainda, o menu deve estar fechado
             return False
@@ -434,11 +752,13 @@ def register_callbacks(app, df): # 'app' e 'df' são passados aqui
         Output('nav-link-user-management', 'style'), # Esconde/mostra o link de gestão de usuários
         Output('header-user-name', 'children'), # Adicionado Output para o nome de usuário no header
         Output('nav-link-client-registration', 'style'), # ADICIONADO: Visibilidade do link de Cadastro de Clientes
+        Output('nav-link-load-report', 'style'), # Relatório de carga: apenas admin
+        Output('nav-link-shift-registration', 'style'), # Cadastro de turnos: mesma regra do cadastro de clientes
         Input('login-status-store', 'data'),
     )
     def update_user_management_link_and_info_and_header(login_status):
         """
-        Controla a visibilidade dos links 'Gestão de Usuários' e 'Cadastro de Clientes'
+        Controla a visibilidade dos links 'Gestão de Usuários', 'Relatório de Carga' e 'Cadastro de Clientes'
         com base no status de admin e atualiza o nome do usuário logado no cabeçalho.
         """
         if login_status and login_status.get('is_authenticated'):
@@ -457,7 +777,7 @@ def register_callbacks(app, df): # 'app' e 'df' são passados aqui
             # Visibilidade do link de Cadastro de Clientes (assumindo que qualquer usuário logado pode acessar)
             client_registration_style = {'display': 'flex'} # Visível para todos logados, ajuste se precisar de admin_only
 
-            return user_management_style, user_display_html, client_registration_style
+            return user_management_style, user_display_html, client_registration_style, user_management_style, client_registration_style
         else:
-            # Se não logado, esconder ambos os links e limpar nome de usuário
-            return {'display': 'none'}, "", {'display': 'none'}
\ No newline at end of file
+            # Se não logado, esconder os links e limpar nome de usuário
+            return {'display': 'none'}, "", {'display': 'none'}, {'display': 'none'}, {'display': 'none'}
\ No newline at end of file
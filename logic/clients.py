@@ -0,0 +1,78 @@
+# logic/clients.py
+"""
+Dimensão Cliente: cada viagem recebe o cliente cadastrado para o seu destino (tabela clients).
+
+O destino é fatorado uma vez e cada código de destino aponta para um código de cliente numa
+tabela de consulta do tamanho do número de destinos distintos; a coluna Cliente sai como
+pd.Categorical montado direto dos códigos, sem merge e sem uma string por linha.
+Destinos sem cliente ficam com UNMAPPED_CLIENT_LABEL.
+
+Quando os clientes mudam, logic/dataset.reassign_clients() refaz só essa coluna (e os turnos,
+que dependem do cliente de cada destino) e publica uma nova versão, sem recarregar as fontes.
+Filtro e totais por cliente saem do cubo (logic/cube.py), onde o cliente é mais uma dimensão.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import database
+from logic.cube import get_cube, cube_for_filters
+
+UNMAPPED_CLIENT_LABEL = 'Sem Cliente'
+CLIENT_COLUMNS = ['id', 'client_name', 'destination']
+
+
+def fetch_client_frame(local_dir=None) -> pd.DataFrame:
+    """
+    Clientes cadastrados (client_name, destination): do banco, ou de clients.csv em LOCAL_DATA_DIR.
+    Falhas não interrompem a carga: todos os destinos ficam sem cliente.
+    """
+    local_dir = local_dir or os.getenv("LOCAL_DATA_DIR")
+    try:
+        if local_dir:
+            clients_path = os.path.join(local_dir, 'clients.csv')
+            if not os.path.exists(clients_path):
+                return pd.DataFrame(columns=CLIENT_COLUMNS)
+            return pd.read_csv(clients_path, dtype=str)
+        return pd.DataFrame([dict(row) for row in database.get_all_clients()], columns=CLIENT_COLUMNS)
+    except Exception as e:
+        print(f"AVISO: clientes cadastrados indisponíveis ({e}); destinos ficam sem cliente.")
+        return pd.DataFrame(columns=CLIENT_COLUMNS)
+
+
+def assign_clients(destinos, df_clients: pd.DataFrame = None) -> pd.Categorical:
+    """Cliente de cada viagem (alinhado às linhas): consulta por código de destino, um índice por linha."""
+    codes, uniques = pd.factorize(destinos)
+    clients = df_clients.dropna(subset=['client_name', 'destination']) if df_clients is not None else pd.DataFrame(columns=CLIENT_COLUMNS)
+    # A coluna Destino sai da carga padronizada (clean_text_column: sem espaços nas pontas, maiúsculas);
+    # os destinos cadastrados passam pela mesma regra. Um cliente por destino
+    destinations = clients['destination'].astype(str).str.strip().str.upper()
+    mapped = pd.Series(clients['client_name'].to_numpy(), index=destinations.to_numpy())
+    mapped = mapped[~mapped.index.duplicated(keep='first')]
+
+    labels = list(dict.fromkeys(sorted(mapped.unique()) + [UNMAPPED_CLIENT_LABEL]))
+    unmapped_code = labels.index(UNMAPPED_CLIENT_LABEL)
+    # lookup[código do destino] = código do cliente; a última posição atende o código -1 (destino vazio)
+    lookup = np.full(len(uniques) + 1, unmapped_code, dtype=np.int64)
+    positions = mapped.index.get_indexer(pd.Index(uniques).astype(str)) if len(mapped) else np.full(len(uniques), -1)
+    found = positions >= 0
+    lookup[:-1][found] = pd.Index(labels).get_indexer(mapped.to_numpy()[positions[found]])
+    return pd.Categorical.from_codes(lookup[codes], categories=labels)
+
+
+def unmapped_destinations(dataset) -> list:
+    """Destinos da versão atual sem cliente cadastrado (ordenados), lidos das combinações do cubo."""
+    cube = get_cube(dataset)
+    unmapped_code = cube.label_codes['clientes'].get(UNMAPPED_CLIENT_LABEL)
+    if unmapped_code is None:
+        return []
+    codes = cube.combo_codes['destinos'][cube.combo_codes['clientes'] == unmapped_code]
+    return [cube.label_values['destinos'][code] for code in np.unique(codes[codes >= 0])]
+
+
+def client_rollup(dataset, filters) -> pd.DataFrame:
+    """Viagens, volume e receita por cliente no recorte dos filtros (do cubo), da maior receita para a menor."""
+    totals = cube_for_filters(dataset, filters).totals_by('clientes', filters)
+    totals = totals[totals['Viagens'] > 0].rename(columns={'label': 'Cliente', 'Valor': 'Receita'})
+    return totals.sort_values('Receita', ascending=False).reset_index(drop=True)
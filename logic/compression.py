@@ -0,0 +1,136 @@
+# logic/compression.py
+"""
+Compressão de respostas e cabeçalhos de cache para o servidor Flask.
+
+- Respostas textuais (JSON dos callbacks, HTML, CSS, JS) acima de COMPRESSION_MIN_SIZE bytes
+  são comprimidas com brotli (se o pacote estiver instalado) ou gzip, conforme o Accept-Encoding.
+- Arquivos de /assets/ com fingerprint na URL (?m=... gerado pelo Dash, ou ?v=... gerado por
+  scripts/build_assets.py) recebem cache longo e imutável; os demais, cache curto com revalidação.
+- Respostas em streaming (exportações) nunca são bufferizadas aqui.
+"""
+import gzip
+import os
+import threading
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele, só gzip
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_LEVEL_GZIP = 6
+COMPRESSION_LEVEL_BROTLI = 5
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/javascript', 'text/javascript', 'text/html',
+    'text/css', 'text/plain', 'text/csv', 'image/svg+xml',
+}
+# Arquivos estáticos maiores que isso não são lidos para a memória só para comprimir
+MAX_STATIC_COMPRESS_SIZE = 8 * 1024 * 1024
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+SHORT_CACHE_CONTROL = 'public, max-age=3600, must-revalidate'
+
+# Cache em memória das versões comprimidas de recursos com fingerprint: (path, query, encoding) -> bytes
+_static_cache = {}
+_static_cache_lock = threading.Lock()
+
+
+def choose_encoding(accept_encoding: str):
+    """Escolhe 'br' ou 'gzip' a partir do cabeçalho Accept-Encoding (respeitando q=0)."""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        token, _, params = part.strip().partition(';')
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token.strip().lower()] = quality
+
+    def allowed(encoding):
+        return accepted.get(encoding, accepted.get('*', 0)) > 0
+
+    if brotli is not None and allowed('br'):
+        return 'br'
+    if allowed('gzip'):
+        return 'gzip'
+    return None
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESSION_LEVEL_BROTLI)
+    return gzip.compress(data, compresslevel=COMPRESSION_LEVEL_GZIP)
+
+
+def _is_fingerprinted_asset():
+    return request.path.startswith('/assets/') and ('m' in request.args or 'v' in request.args)
+
+
+def _apply_cache_headers(response):
+    if not request.path.startswith('/assets/') or response.status_code not in (200, 304):
+        return
+    if _is_fingerprinted_asset():
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    else:
+        response.headers['Cache-Control'] = SHORT_CACHE_CONTROL
+
+
+def _compress_response(response):
+    if (response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    if response.direct_passthrough:
+        # Arquivos servidos via send_file: só comprime os pequenos o suficiente para ler de uma vez
+        if response.content_length is None or response.content_length > MAX_STATIC_COMPRESS_SIZE:
+            return response
+        response.direct_passthrough = False
+    elif response.is_streamed:
+        # Geradores (ex.: exportações) seguem em streaming, sem bufferizar
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if (response.content_length or 0) < COMPRESSION_MIN_SIZE:
+        return response
+    encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+    if encoding is None:
+        return response
+
+    cacheable = _is_fingerprinted_asset() or request.path.startswith('/_dash-component-suites/')
+    cache_key = (request.path, request.query_string, encoding)
+    compressed = _static_cache.get(cache_key) if cacheable else None
+    if compressed is None:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            return response
+        compressed = compress_bytes(data, encoding)
+        if cacheable:
+            with _static_cache_lock:
+                _static_cache[cache_key] = compressed
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    if response.headers.get('ETag'):
+        # A representação comprimida é outra: evita que caches confundam as duas
+        etag, is_weak = response.get_etag()
+        response.set_etag(f"{etag}-{encoding}", weak=is_weak)
+    return response
+
+
+def register_response_hooks(server):
+    """Instala compressão e cabeçalhos de cache no servidor Flask."""
+
+    @server.after_request
+    def optimize_response(response):
+        _apply_cache_headers(response)
+        return _compress_response(response)
+
+    return server
@@ -0,0 +1,145 @@
+# logic/congestion.py
+"""
+Fluxo de chegadas e congestionamento por destino.
+
+As chegadas (viagens) ficam ordenadas por (destino, horário) uma única vez por versão do
+dataset. Para as viagens filtradas, a contagem em janela deslizante de cada chegada é
+o número de chegadas do mesmo destino em [t, t + janela): com a chave combinada
+destino x minuto ordenada, o fim de todas as janelas sai de um único np.searchsorted,
+e a contagem é a diferença de posições. Janelas de destinos diferentes nunca se
+misturam porque a chave de cada destino fica numa faixa separada.
+
+Relata o pico de cada janela (15/30/60 min) por destino, o pico perto das trocas de
+turno (os horários de início e fim dos turnos da escala do destino, logic/shifts.py) e
+um mapa de calor destino x horário do dia (média de chegadas por dia).
+"""
+import numpy as np
+import pandas as pd
+
+from logic.shifts import ShiftTable, get_shift_table
+
+# Tamanhos das janelas deslizantes, em minutos
+WINDOW_MINUTES = (15, 30, 60)
+# Faixa do horário do dia no mapa de calor
+HEATMAP_SLOT_MINUTES = 30
+# Destinos no mapa de calor (os de mais chegadas)
+HEATMAP_MAX_DESTINATIONS = 25
+# Margem em torno das trocas de turno para o pico na troca
+SHIFT_CHANGE_MARGIN_MINUTES = 60
+# Janela usada no pico da troca de turno
+SHIFT_CHANGE_WINDOW_MINUTES = 30
+
+_MINUTES_PER_DAY = 24 * 60
+
+
+class ArrivalIndex:
+    """Posições das viagens ordenadas por (destino, minuto), com os códigos e minutos já ordenados."""
+
+    def __init__(self, order, destinations, minutes, labels):
+        self.order = order                # posição (iloc) no dataset de cada chegada ordenada
+        self.destinations = destinations  # código do destino (índice em labels)
+        self.minutes = minutes            # minutos desde 1970-01-01
+        self.labels = labels
+
+
+def build_arrival_index(df: pd.DataFrame) -> ArrivalIndex:
+    codes, labels = pd.factorize(df['Destino'], sort=True)
+    minutes = df['Data_Hora'].to_numpy().astype('datetime64[m]').astype(np.int64)
+    order = np.lexsort((minutes, codes))
+    order = order[codes[order] >= 0]
+    return ArrivalIndex(order, codes[order], minutes[order], list(labels))
+
+
+def get_arrival_index(dataset) -> ArrivalIndex:
+    """Chegadas ordenadas da versão atual, calculadas uma única vez por versão."""
+    return dataset.derive('arrival_index', lambda ds: build_arrival_index(ds.df))
+
+
+def rolling_counts(destinations, minutes, window) -> np.ndarray:
+    """
+    Chegadas do mesmo destino em [t, t + window) para cada chegada, com as entradas
+    ordenadas por (destino, minuto).
+    """
+    if not len(minutes):
+        return np.zeros(0, dtype=np.int64)
+    base = minutes.min()
+    span = int(minutes.max() - base) + window + 1
+    keys = destinations.astype(np.int64) * span + (minutes - base)
+    return np.searchsorted(keys, keys + window, side='left') - np.arange(len(keys))
+
+
+def _peak_by_destination(destinations, counts, n_destinations):
+    """
+    (pico, posição da chegada que abre a janela do pico) por destino; -1 sem chegadas.
+    As entradas estão ordenadas por destino, então cada destino é um trecho contíguo.
+    """
+    peaks = np.zeros(n_destinations, dtype=np.int64)
+    starts = np.full(n_destinations, -1, dtype=np.int64)
+    if len(counts):
+        bounds = np.flatnonzero(np.r_[True, destinations[1:] != destinations[:-1]])
+        segment_peaks = np.maximum.reduceat(counts, bounds)
+        at_peak = np.flatnonzero(counts == np.repeat(segment_peaks, np.diff(np.r_[bounds, len(counts)])))
+        segments = np.searchsorted(bounds, at_peak, side='right') - 1
+        first = at_peak[np.r_[True, segments[1:] != segments[:-1]]]
+        peaks[destinations[bounds]] = segment_peaks
+        starts[destinations[bounds]] = first
+    return peaks, starts
+
+
+def shift_change_distance(schedules, time_of_day, table: ShiftTable) -> np.ndarray:
+    """Minutos de cada chegada até a troca de turno mais próxima da escala do seu destino (circular no dia)."""
+    distance = np.full(len(time_of_day), _MINUTES_PER_DAY)
+    for schedule, changes in table.schedule_changes.items():
+        selected = np.flatnonzero(schedules == schedule)
+        for change in changes:
+            offset = np.abs(time_of_day[selected] - change)
+            distance[selected] = np.minimum(distance[selected], np.minimum(offset, _MINUTES_PER_DAY - offset))
+    return distance
+
+
+def _format_minute(minute):
+    return pd.Timestamp(np.datetime64(int(minute), 'm')).strftime('%d/%m/%Y %H:%M')
+
+
+def congestion_analysis(dataset, dff: pd.DataFrame, table: ShiftTable = None) -> dict:
+    """Picos de chegadas por destino e mapa de calor para as viagens filtradas (dff ⊂ dataset.df)."""
+    index = get_arrival_index(dataset)
+    table = table or get_shift_table(dataset)
+    selected = np.zeros(len(dataset.df), dtype=bool)
+    selected[dataset.df.index.get_indexer(dff.index)] = True
+    keep = selected[index.order]
+    destinations, minutes = index.destinations[keep], index.minutes[keep]
+    n_destinations = len(index.labels)
+
+    arrivals = np.bincount(destinations, minlength=n_destinations)
+    peaks = pd.DataFrame({'Destino': index.labels, 'Chegadas': arrivals})
+    for window in WINDOW_MINUTES:
+        peak, start = _peak_by_destination(destinations, rolling_counts(destinations, minutes, window), n_destinations)
+        peaks[f'Pico_{window}'] = peak
+        peaks[f'Inicio_{window}'] = [_format_minute(minutes[position]) if position >= 0 else '-' for position in start]
+
+    # Pico perto das trocas de turno (da escala de cada destino): só as janelas que começam dentro da margem
+    time_of_day = minutes % _MINUTES_PER_DAY
+    schedules = table.trip_schedules(pd.Index(index.labels))[destinations]
+    near_change = shift_change_distance(schedules, time_of_day, table) <= SHIFT_CHANGE_MARGIN_MINUTES
+    counts = rolling_counts(destinations, minutes, SHIFT_CHANGE_WINDOW_MINUTES)
+    peaks['Pico_Troca_Turno'], _ = _peak_by_destination(destinations[near_change], counts[near_change], n_destinations)
+    peaks = peaks[peaks['Chegadas'] > 0].sort_values(f'Pico_{WINDOW_MINUTES[-1]}', ascending=False).reset_index(drop=True)
+
+    # Mapa de calor: média de chegadas por dia em cada faixa do horário do dia
+    n_slots = _MINUTES_PER_DAY // HEATMAP_SLOT_MINUTES
+    days = minutes // _MINUTES_PER_DAY
+    n_days = int(np.count_nonzero(np.bincount(days - days.min()))) if len(days) else 1
+    grid = np.bincount(destinations * n_slots + time_of_day // HEATMAP_SLOT_MINUTES,
+                       minlength=n_destinations * n_slots).reshape(n_destinations, n_slots) / n_days
+    top = np.argsort(-arrivals, kind='stable')[:HEATMAP_MAX_DESTINATIONS]
+    top = top[arrivals[top] > 0]
+    return {
+        'peaks': peaks,
+        'heatmap': {
+            'destinations': [index.labels[code] for code in top],
+            'slots': [f"{slot * HEATMAP_SLOT_MINUTES // 60:02d}:{slot * HEATMAP_SLOT_MINUTES % 60:02d}" for slot in range(n_slots)],
+            'values': grid[top],
+        },
+        'days': n_days,
+    }
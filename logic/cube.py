@@ -0,0 +1,216 @@
+# logic/cube.py
+"""
+Cubo de agregados pré-calculado por versão do dataset.
+
+Cada linha do cubo é uma célula (dia x dimensões) com as medidas somadas: viagens,
+volume e valor bruto. As dimensões são codificadas como inteiros (códigos de
+pd.factorize, com rótulos ordenados), então filtros e contagens viram operações
+vetorizadas sobre algumas dezenas de milhares de células em vez de milhões de linhas.
+
+As células ficam ordenadas por dia, então o filtro de período é um recorte contíguo.
+Para as contagens por dimensão há ainda um índice denso: as combinações distintas de
+dimensões (sem o dia) e uma soma acumulada de viagens por dia x combinação; qualquer
+período vira a diferença de duas linhas, e o resto do cálculo percorre só as combinações.
+
+Usado para as opções em cascata dos filtros: cada dropdown mostra os valores possíveis
+(com contagem de viagens) dada a seleção atual das OUTRAS dimensões, e para totais por
+dimensão (ex.: receita por cliente, ver logic/clients.py). Cada célula leva também o
+resumo das suas placas, para contar veículos distintos de qualquer recorte.
+"""
+import numpy as np
+import pandas as pd
+
+from logic.filters import LIST_FILTERS
+from logic.plate_index import get_plate_index
+from logic.sketches import build_plate_sketch
+
+# Dimensões do cubo usado pelos filtros (chave do filtro -> coluna). Placas ficam de fora:
+# com centenas delas o cubo teria quase uma célula por viagem (ver logic/plate_index.py).
+# Cliente é função do destino, então não multiplica células nem combinações.
+FACET_DIMENSIONS = {key: column for key, column in LIST_FILTERS.items() if key != 'placas'}
+# Limite de células do índice denso dia x combinação (acima disso, varre as células do cubo)
+MAX_PREFIX_CELLS = 20_000_000
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+def _allowed(label_codes: dict, selected) -> np.ndarray:
+    """Tabela de consulta por código (+1 para o código -1 de vazio): True nos selecionados."""
+    table = np.zeros(len(label_codes) + 1, dtype=bool)
+    for value in selected:
+        code = label_codes.get(value)
+        if code is not None:
+            table[code + 1] = True
+    return table
+
+
+class Cube:
+    """Células agregadas (ordenadas por dia): códigos por dimensão + medidas."""
+
+    def __init__(self, labels, codes, days, trips, volume, value, plates=None):
+        self.labels = labels    # chave -> pd.Index com os rótulos ordenados
+        self.codes = codes      # chave -> códigos por célula (int32; -1 = vazio)
+        self.days = days        # dia de cada célula (dias desde 1970-01-01), crescente
+        self.trips = trips
+        self.volume = volume
+        self.value = value
+        self.plates = plates    # placas distintas por célula (logic/sketches.py)
+        self.first_day = int(days[0]) if len(days) else 0
+        self.label_values = {key: index.tolist() for key, index in labels.items()}
+        self.label_codes = {key: {label: code for code, label in enumerate(values)} for key, values in self.label_values.items()}
+        self._build_combo_index()
+
+    def __len__(self):
+        return len(self.days)
+
+    def _build_combo_index(self):
+        # Combinações distintas das dimensões (sem o dia) e viagens acumuladas por dia
+        combo_key = np.zeros(len(self), dtype=np.int64)
+        for key, codes in self.codes.items():
+            combo_key = combo_key * (len(self.labels[key]) + 1) + (codes.astype(np.int64) + 1)
+        combos, first_cell, cell_combo = np.unique(combo_key, return_index=True, return_inverse=True)
+        self.combo_codes = {key: codes[first_cell] for key, codes in self.codes.items()}
+        n_days = int(self.days[-1] - self.first_day + 1) if len(self) else 0
+        self.prefix_trips = None
+        if 0 < n_days * len(combos) <= MAX_PREFIX_CELLS:
+            flat = (self.days - self.first_day) * len(combos) + cell_combo
+            per_day = np.bincount(flat, weights=self.trips, minlength=n_days * len(combos)).reshape(n_days, len(combos))
+            self.prefix_trips = np.vstack([np.zeros((1, len(combos))), np.cumsum(per_day, axis=0)]).astype(np.int64)
+
+    @staticmethod
+    def day_code(date_value) -> int:
+        # Filtros normalizados trazem datas ISO ('AAAA-MM-DD'): conversão direta, sem inferir formato
+        return int((np.datetime64(str(date_value)[:10], 'D') - _EPOCH).astype(np.int64))
+
+    def day_range(self, filters):
+        """Índices de dia [lo, hi) relativos ao primeiro dia do cubo (recortados aos limites)."""
+        n_days = self.prefix_trips.shape[0] - 1 if self.prefix_trips is not None else int(self.days[-1] - self.first_day + 1)
+        if not (filters.get('start_date') and filters.get('end_date')):
+            return 0, n_days
+        lo = self.day_code(filters['start_date']) - self.first_day
+        hi = self.day_code(filters['end_date']) - self.first_day + 1
+        return min(max(lo, 0), n_days), min(max(hi, 0), n_days)
+
+    def mask(self, filters, exclude=None) -> np.ndarray:
+        """Células que passam pelos filtros normalizados, ignorando a dimensão `exclude`."""
+        mask = np.zeros(len(self), dtype=bool)
+        lo, hi = self.day_range(filters)
+        start, stop = np.searchsorted(self.days, [self.first_day + lo, self.first_day + hi])
+        mask[start:stop] = True
+        for key, codes in self.codes.items():
+            selected = filters.get(key)
+            if key != exclude and selected:
+                mask &= _allowed(self.label_codes[key], selected)[codes + 1]
+        return mask
+
+    def facet_counts(self, key, filters) -> np.ndarray:
+        """Viagens por código da dimensão `key` (ver labels[key]), dada a seleção das demais."""
+        n_labels = len(self.labels[key])
+        if self.prefix_trips is None:
+            mask = self.mask(filters, exclude=key)
+            codes, weights = self.codes[key][mask], self.trips[mask]
+        else:
+            lo, hi = self.day_range(filters)
+            keep = np.ones(len(self.combo_codes[key]), dtype=bool)
+            for other, other_codes in self.combo_codes.items():
+                selected = filters.get(other)
+                if other != key and selected:
+                    keep &= _allowed(self.label_codes[other], selected)[other_codes + 1]
+            codes = self.combo_codes[key][keep]
+            weights = (self.prefix_trips[hi] - self.prefix_trips[lo])[keep]
+        valid = codes >= 0
+        return np.bincount(codes[valid], weights=weights[valid], minlength=n_labels).astype(np.int64)
+
+    def totals_by(self, key, filters) -> pd.DataFrame:
+        """Viagens, volume e valor bruto por rótulo da dimensão `key` no recorte de todos os filtros."""
+        n_labels = len(self.labels[key])
+        mask = self.mask(filters) if len(self) else np.zeros(0, dtype=bool)
+        codes = self.codes[key][mask]
+        valid = codes >= 0
+        codes = codes[valid]
+        return pd.DataFrame({
+            'label': self.label_values[key],
+            'Viagens': np.bincount(codes, weights=self.trips[mask][valid], minlength=n_labels).astype(np.int64),
+            'Volume': np.bincount(codes, weights=self.volume[mask][valid], minlength=n_labels),
+            'Valor': np.bincount(codes, weights=self.value[mask][valid], minlength=n_labels),
+        })
+
+    def distinct_plates(self, filters) -> int:
+        """Veículos (placas) distintos no recorte: união dos resumos das células, sem varrer viagens."""
+        if self.plates is None or not len(self):
+            return 0
+        return self.plates.count(self.mask(filters))
+
+
+def build_cube(df: pd.DataFrame, dimensions=FACET_DIMENSIONS) -> Cube:
+    """Agrega o DataFrame preparado em células (dia x dimensões), ordenadas por dia."""
+    days = (df['Data_Hora'].to_numpy().astype('datetime64[D]') - _EPOCH).astype(np.int64)
+    labels, row_codes = {}, {}
+    for key, column in dimensions.items():
+        if column in df.columns:
+            codes, uniques = pd.factorize(df[column], sort=True)
+        else:
+            codes, uniques = np.full(len(df), -1), pd.Index([])
+        labels[key] = pd.Index(uniques)
+        row_codes[key] = codes.astype(np.int64)
+
+    # Chave única por célula: dia (mais significativo) e códigos combinados num inteiro
+    cell_key = days - (days.min() if len(days) else 0)
+    for key in row_codes:
+        cell_key = cell_key * (len(labels[key]) + 1) + (row_codes[key] + 1)
+    cells, first_row, inverse = np.unique(cell_key, return_index=True, return_inverse=True)
+
+    if 'Placa' in df.columns:
+        plate_codes, plate_labels = pd.factorize(df['Placa'])
+        plates = build_plate_sketch(inverse, plate_codes, plate_labels, len(cells))
+    else:
+        plates = None
+
+    volume = df['Volume'].to_numpy(dtype=float) if 'Volume' in df.columns else np.zeros(len(df))
+    value = df['Valor Bruto Total'].to_numpy(dtype=float) if 'Valor Bruto Total' in df.columns else np.zeros(len(df))
+    return Cube(
+        labels=labels,
+        codes={key: codes[first_row].astype(np.int32) for key, codes in row_codes.items()},
+        days=days[first_row],
+        trips=np.bincount(inverse, minlength=len(cells)).astype(np.int64),
+        volume=np.bincount(inverse, weights=volume, minlength=len(cells)),
+        value=np.bincount(inverse, weights=value, minlength=len(cells)),
+        plates=plates,
+    )
+
+
+def get_cube(dataset) -> Cube:
+    """Cubo da versão atual, calculado uma única vez por versão."""
+    return dataset.derive('cube', lambda ds: build_cube(ds.df))
+
+
+def cube_for_filters(dataset, filters) -> Cube:
+    """Cubo da versão atual ou, com placas selecionadas, um cubo só com as linhas delas."""
+    if filters.get('placas'):
+        positions = get_plate_index(dataset).positions(filters['placas'])
+        return build_cube(dataset.df.iloc[positions])
+    return get_cube(dataset)
+
+
+def distinct_vehicles(dataset, filters) -> int:
+    """Veículos distintos para os filtros normalizados (exato ou HyperLogLog, ver logic/sketches.py)."""
+    return cube_for_filters(dataset, filters).distinct_plates(filters)
+
+
+def facet_options(dataset, filters) -> dict:
+    """
+    Opções em cascata de cada filtro de lista: {chave: [{'label', 'value'}, ...]}.
+    Valores sem viagens na seleção atual somem, exceto os já selecionados.
+    Com placas selecionadas, as contagens vêm de um cubo montado só com as linhas delas.
+    """
+    cube = cube_for_filters(dataset, filters)
+    options = {}
+    for key in FACET_DIMENSIONS:
+        counts = dict(zip(cube.label_values[key], cube.facet_counts(key, filters).tolist())) if len(cube) else {}
+        for value in filters.get(key) or []:
+            counts.setdefault(value, 0)
+        options[key] = [
+            {'label': f"{value} ({count:,})".replace(",", "."), 'value': value}
+            for value, count in sorted(counts.items())
+            if count > 0 or value in (filters.get(key) or [])
+        ]
+    return options
@@ -2,11 +2,16 @@
 
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
+import os
+import sqlite3
+from contextlib import closing
 from functools import lru_cache
 from datetime import datetime
 import database
+from logic.load_report import LoadProfiler, maybe_profile
+from logic.shifts import ShiftTable, assign_shifts, build_shift_table, fetch_shift_frames
+from logic.clients import assign_clients
+from logic.pricing_coverage import lookup_interval_prices
 
 # --- Funções de Limpeza de Dados (sem alterações) ---
 def clean_numeric_column(series: pd.Series) -> pd.Series:
@@ -20,35 +25,88 @@ def clean_text_column(series: pd.Series) -> pd.Series:
     """Limpa e padroniza uma coluna de texto."""
     return series.astype(str).str.strip().str.upper()
 
+# Fonte local opcional (benchmarks, testes de carga, ambientes offline): a variável de ambiente
+# LOCAL_DATA_DIR aponta para um diretório com volume.csv, frota.csv e, opcionalmente,
+# pricing.sqlite (tabela 'pricing' com o mesmo esquema do Postgres).
+PRICING_COLUMNS = ['id', 'destination', 'price_per_ton', 'start_date', 'end_date']
+
+def fetch_source_frames(local_dir=None):
+    """Obtém as três fontes brutas (volume, frota, precificação), das planilhas ou de LOCAL_DATA_DIR."""
+    local_dir = local_dir or os.getenv("LOCAL_DATA_DIR")
+    if local_dir:
+        df_volume = pd.read_csv(os.path.join(local_dir, 'volume.csv'))
+        df_frota = pd.read_csv(os.path.join(local_dir, 'frota.csv'))
+        sqlite_path = os.path.join(local_dir, 'pricing.sqlite')
+        if os.path.exists(sqlite_path):
+            with closing(sqlite3.connect(sqlite_path)) as conn:
+                df_precificacao = pd.read_sql_query(f"SELECT {', '.join(PRICING_COLUMNS)} FROM pricing", conn)
+            return df_volume, df_frota, df_precificacao
+    else:
+        # URLs com timestamp para evitar cache
+        timestamp = datetime.now().timestamp()
+        base_url = 'https://docs.google.com/spreadsheets/d/1gUfUjoYN-zKOuAmzzl4AP35wz0PeaR5eGm4B34Cj0LI/export?format=csv'
+        url_volume = f'{base_url}&gid=0&timestamp={timestamp}'
+        url_frota = f'{base_url}&gid=1061355856&timestamp={timestamp}'
+        df_volume = pd.read_csv(url_volume)
+        df_frota = pd.read_csv(url_frota)
+
+    all_pricing_from_db = database.get_all_pricing()
+    df_precificacao = pd.DataFrame(all_pricing_from_db, columns=PRICING_COLUMNS)
+    return df_volume, df_frota, df_precificacao
+
+_last_profiler = None
+
+def last_load_profiler():
+    """Profiler da última execução de load_and_prepare_data() (etapas, tempos, memória)."""
+    return _last_profiler
+
 @lru_cache(maxsize=None)
 def load_and_prepare_data() -> pd.DataFrame:
     """
     Carrega, padroniza, pré-processa e une os dados de todas as fontes de forma segura e robusta.
+    Cada etapa é medida (ver logic/load_report.py); o relatório fica em last_load_profiler().
     """
+    global _last_profiler
+    profiler = _last_profiler = LoadProfiler()
     try:
         print("--- INICIANDO CARREGAMENTO DE DADOS ---")
+        with maybe_profile(profiler):
+            # 1. Carregamento dos dados
+            with profiler.stage('fetch') as stage:
+                df_volume, df_frota, df_precificacao = fetch_source_frames()
+                df_shifts, df_clients = fetch_shift_frames()
+                shift_table = build_shift_table(df_shifts, df_clients)
+                stage.rows_out = len(df_volume)
+                stage.note = (f"{len(df_frota)} de frota, {len(df_precificacao)} de preços, {len(df_clients)} clientes, "
+                              f"{len(shift_table.destinations)} destinos com turnos próprios")
+            print(f"-> Dados carregados: {df_volume.shape[0]} de volume, {df_frota.shape[0]} de frota, {len(df_precificacao)} de preços.")
 
-        # URLs com timestamp para evitar cache
-        timestamp = datetime.now().timestamp()
-        base_url = 'https://docs.google.com/spreadsheets/d/1gUfUjoYN-zKOuAmzzl4AP35wz0PeaR5eGm4B34Cj0LI/export?format=csv'
-        url_volume = f'{base_url}&gid=0&timestamp={timestamp}'
-        url_frota = f'{base_url}&gid=1061355856&timestamp={timestamp}'
+            df_final = prepare_data(df_volume, df_frota, df_precificacao, profiler, shift_table, df_clients)
+        print(f"Processamento de dados concluído em {profiler.total_seconds:.1f}s.")
+        return df_final
 
-        # 1. Carregamento dos dados
-        df_volume = pd.read_csv(url_volume)
-        df_frota = pd.read_csv(url_frota)
-        all_pricing_from_db = database.get_all_pricing()
-        df_precificacao = pd.DataFrame(all_pricing_from_db, columns=['id', 'destination', 'price_per_ton', 'start_date', 'end_date'])
-        print(f"-> Dados carregados: {df_volume.shape[0]} de volume, {df_frota.shape[0]} de frota, {len(df_precificacao)} de preços.")
+    except Exception as e:
+        profiler.error = str(e)
+        print(f"!!!!!!!! OCORREU UM ERRO CRÍTICO AO CARREGAR OS DADOS !!!!!!!!")
+        print(f"Detalhe do erro: {e}")
+        return pd.DataFrame()
+
+def prepare_data(df_volume: pd.DataFrame, df_frota: pd.DataFrame, df_precificacao: pd.DataFrame, profiler: LoadProfiler = None,
+                 shift_table: ShiftTable = None, df_clients: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Padroniza, limpa e une as fontes brutas no DataFrame final (levanta exceção em caso de erro).
+    `shift_table`: turnos por cliente (logic/shifts.py); sem ela, a escala padrão 06h/18h.
+    `df_clients`: clientes cadastrados (client_name, destination) para a coluna Cliente (logic/clients.py).
+    """
+    profiler = profiler or LoadProfiler()
 
-        # 2. PADRONIZAÇÃO DE COLUNAS
+    # 2. PADRONIZAÇÃO DE COLUNAS
+    with profiler.stage('normalize_columns', len(df_volume)) as stage:
         df_volume.columns = df_volume.columns.astype(str).str.strip().str.lower().str.replace(' ', '_')
         df_frota.columns = df_frota.columns.astype(str).str.strip().str.lower().str.replace(' ', '_')
         if not df_precificacao.empty:
             df_precificacao.columns = df_precificacao.columns.astype(str).str.strip().str.lower()
-        
-        # 3. PREPARAÇÃO E LIMPEZA
-        
+
         # Renomeia colunas conhecidas que podem ter nomes inconsistentes
         df_volume.rename(columns={'unnamed:_0': 'tag', 'coluna1': 'tag'}, inplace=True, errors='ignore')
 
@@ -57,14 +115,23 @@ def load_and_prepare_data() -> pd.DataFrame:
         if not all(col in df_volume.columns for col in required_cols):
             missing = [col for col in required_cols if col not in df_volume.columns]
             raise KeyError(f"Colunas essenciais faltando na planilha de Volume: {missing}")
+        stage.rows_out = len(df_volume)
 
-        # Preparação do restante dos dados
+    # 3. PREPARAÇÃO E LIMPEZA
+    with profiler.stage('parse_datetime', len(df_volume)) as stage:
         df_volume['data_hora'] = pd.to_datetime(df_volume['data'].astype(str) + ' ' + df_volume['hora'].astype(str), format='mixed', errors='coerce')
         df_volume.dropna(subset=['data_hora'], inplace=True)
         df_volume['data_apenas'] = df_volume['data_hora'].dt.date
         df_volume['hora_do_dia'] = df_volume['data_hora'].dt.hour
+        stage.rows_out = len(df_volume)
+
+    with profiler.stage('clean_values', len(df_volume)) as stage:
         df_volume['volume'] = clean_numeric_column(df_volume['volume'])
-        
+        if 'destino' in df_volume.columns:
+            # Mesma padronização dos destinos da precificação, dos clientes e dos turnos; vazios seguem vazios
+            destinos = df_volume['destino']
+            df_volume['destino'] = clean_text_column(destinos).where(destinos.notna())
+
         if 'placa' in df_frota.columns:
             df_frota.drop_duplicates(subset=['placa'], keep='first', inplace=True)
 
@@ -74,36 +141,41 @@ def load_and_prepare_data() -> pd.DataFrame:
             df_precificacao['end_date'] = pd.to_datetime(df_precificacao['end_date']).dt.date
             if 'destination' in df_precificacao.columns:
                 df_precificacao['destino'] = clean_text_column(df_precificacao['destination'])
-        
-        # 4. JUNÇÃO (MERGE) E CÁLCULOS
+            if 'valor_bruto' in df_precificacao.columns:
+                df_precificacao['valor_bruto'] = clean_numeric_column(df_precificacao['valor_bruto'])
+        stage.rows_out = len(df_volume)
+
+    # 4. JUNÇÃO (MERGE) E CÁLCULOS
+    with profiler.stage('merge_frota', len(df_volume)) as stage:
         df_final = pd.merge(df_volume, df_frota, on='placa', how='left')
-        
-        if not df_precificacao.empty:
-            df_final = pd.merge(df_final, df_precificacao, on='destino', how='left')
-            condition = (df_final['data_apenas'] >= df_final['start_date']) & (df_final['data_apenas'] <= df_final['end_date'])
-            df_final['valor_bruto'] = np.where(condition, clean_numeric_column(df_final['valor_bruto']), 0)
+        stage.rows_out = len(df_final)
+
+    with profiler.stage('merge_pricing', len(df_final)) as stage:
+        # Busca por intervalo: exatamente um preço (ou 0) por viagem, sem multiplicar linhas
+        if not df_precificacao.empty and 'destino' in df_final.columns:
+            df_final['valor_bruto'] = lookup_interval_prices(df_final['destino'], df_final['data_hora'].to_numpy(), df_precificacao)
+            stage.note = f"{int((df_final['valor_bruto'] > 0).sum())} viagens com preço, {len(df_precificacao)} períodos"
         else:
             df_final['valor_bruto'] = 0
+        stage.rows_out = len(df_final)
 
+    with profiler.stage('derive_columns', len(df_final)) as stage:
         df_final['valor_bruto_total'] = clean_numeric_column(df_final['volume']) * df_final['valor_bruto']
-        df_final['turno'] = np.where((df_final['hora_do_dia'] >= 6) & (df_final['hora_do_dia'] < 18), '1º Turno', '2º Turno')
-        df_final['dia_da_semana_num'] = pd.to_datetime(df_final['data_apenas']).dt.dayofweek
+        destinos = df_final['destino'] if 'destino' in df_final.columns else pd.Series(np.nan, index=df_final.index)
+        df_final['turno'] = assign_shifts(destinos, df_final['data_hora'].to_numpy(), shift_table)
+        df_final['cliente'] = assign_clients(destinos, df_clients)
+        df_final['dia_da_semana_num'] = df_final['data_hora'].dt.dayofweek
 
         # 5. RENOMEAÇÃO FINAL
         df_final.rename(columns={
             'data_hora': 'Data_Hora', 'data_apenas': 'Data_Apenas', 'hora_do_dia': 'Hora_Do_Dia',
             'volume': 'Volume', 'placa': 'Placa', 'destino': 'Destino', 'material': 'Material',
             'tag': 'TAG', 'valor_bruto': 'Valor Bruto', 'valor_bruto_total': 'Valor Bruto Total',
-            'empresa': 'Empresa', 'turno': 'Turno', 'dia_da_semana_num': 'Dia_Da_Semana_Num'
+            'empresa': 'Empresa', 'cliente': 'Cliente', 'turno': 'Turno', 'dia_da_semana_num': 'Dia_Da_Semana_Num'
         }, inplace=True, errors='ignore')
+        stage.rows_out = len(df_final)
 
-        print("Processamento de dados concluído.")
-        return df_final
-
-    except Exception as e:
-        print(f"!!!!!!!! OCORREU UM ERRO CRÍTICO AO CARREGAR OS DADOS !!!!!!!!")
-        print(f"Detalhe do erro: {e}")
-        return pd.DataFrame()
+    return df_final
     
 # --- Funções de Análise e Geração de Gráficos ---
 
@@ -122,7 +194,7 @@ def create_matrix_data(dff: pd.DataFrame) -> pd.DataFrame:
     return pd.DataFrame()
 
 
-def create_figure_from_df(fig_df: pd.DataFrame, chart_type: str, x_col: str, y_col: str, title: str, color_sequence=None) -> go.Figure:
+def create_figure_from_df(fig_df: pd.DataFrame, chart_type: str, x_col: str, y_col: str, title: str, color_sequence=None):
     """
     Cria uma figura Plotly genérica a partir de um DataFrame,
     aplicando o estilo visual do tema.
@@ -147,6 +219,10 @@ def create_figure_from_df(fig_df: pd.DataFrame, chart_type: str, x_col: str, y_c
         'hsl(220, 50%, 75%)', # Azul mais suave
     ]
 
+    # Importações de plotly adiadas para não pesar no import deste módulo (cold start)
+    import plotly.express as px
+    import plotly.graph_objects as go
+
     if chart_type == 'bar':
         fig = px.bar(fig_df, x=x_col, y=y_col, title=title, text_auto='.2s',
                      color_discrete_sequence=color_sequence)
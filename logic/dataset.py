@@ -0,0 +1,339 @@
+# logic/dataset.py
+"""
+Acesso preguiçoso ao dataset preparado.
+
+Nada é baixado no import: o primeiro uso (primeira requisição de layout ou callback)
+carrega os dados, a partir de um snapshot local recente se existir, ou das fontes
+originais via load_and_prepare_data(). Cada carga recebe uma versão (hash do conteúdo),
+e estruturas derivadas (índices, agregados) ficam memorizadas por versão.
+Re-rotulagens de turnos/clientes feitas em um worker chegam aos demais por um marcador
+no backend compartilhado do cache (ver _sync_labels).
+"""
+import os
+import time
+import hashlib
+import threading
+
+from collections import deque, OrderedDict
+from datetime import date, timedelta
+
+import pandas as pd
+
+import database
+from logic.data_processing import load_and_prepare_data, last_load_profiler
+from logic.load_report import LoadProfiler
+from logic.archive import HISTORY_ARCHIVE_DIR, write_archive, hot_window, get_archive
+from logic.shifts import assign_shifts, build_shift_table, fetch_shift_frames, load_shift_table
+from logic.clients import assign_clients, fetch_client_frame
+from logic.serialization import frame_to_bytes, frame_from_bytes
+from logic.singleflight import SingleFlight
+from logic.cache import CACHE_TTL_SECONDS, get_result_cache, make_key
+
+# Snapshot opcional do DataFrame preparado, para cold starts sem rede (ex.: /tmp/fleetmaster.arrow).
+# Gravado no formato colunar de logic/serialization.py (tipado, comprimido, sem pickle).
+SNAPSHOT_PATH = os.getenv("DATA_SNAPSHOT_PATH")
+SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("DATA_SNAPSHOT_MAX_AGE", "900"))
+
+
+class Dataset:
+    """DataFrame preparado + versão + cache de estruturas derivadas dessa versão."""
+
+    def __init__(self, df: pd.DataFrame, version: str, loaded_at: float = None):
+        self.df = df
+        self.version = version
+        self.loaded_at = loaded_at or time.time()
+        self.load_report = None  # relatório por etapa da carga que gerou esta versão
+        self.archive_version = None  # versão do arquivo de histórico gravada com esta carga (logic/archive.py)
+        self._derived = {}
+        self._derived_locks = {}  # um lock por nome: derivações encadeadas não se bloqueiam
+        self._derived_lock = threading.Lock()
+
+    def derive(self, name, builder):
+        """
+        Calcula `builder(self)` uma única vez por versão e reaproveita o resultado.
+        Só quem pede o mesmo nome espera pelo cálculo; o builder pode chamar derive de outros nomes.
+        """
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._derived_lock:
+            lock = self._derived_locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in self._derived:
+                self._derived[name] = builder(self)
+            return self._derived[name]
+
+    def __repr__(self):
+        return f'<Dataset {self.version} ({len(self.df)} linhas)>'
+
+
+_current = None
+_load_lock = threading.Lock()
+# Últimos relatórios deste processo (a página de admin usa quando o banco não responde)
+_recent_reports = deque(maxlen=20)
+# Modo arquivo: datasets de períodos anteriores à janela quente mantidos em memória (os mais recentes)
+PERIOD_DATASETS_KEPT = int(os.getenv("PERIOD_DATASETS_KEPT", "2"))
+_period_datasets = OrderedDict()
+_period_lock = threading.Lock()
+_period_flight = SingleFlight('period_datasets')
+
+# Re-rotulagem entre workers: quem refaz as colunas Turno/Cliente grava um marcador no backend
+# compartilhado do cache; os demais workers o conferem em get_dataset() (no máximo a cada
+# LABELS_SYNC_SECONDS) e re-rotulam também. Mesmos cadastros => mesma versão em todos.
+LABELS_SYNC_SECONDS = float(os.getenv("LABELS_SYNC_SECONDS", "5"))
+_LABELS_MARKER_KEY = make_key('dataset_labels', 'global', 'marker')
+_labels_seen = None
+_labels_checked_at = 0.0
+_labels_lock = threading.Lock()
+
+
+def compute_version(df: pd.DataFrame) -> str:
+    """Hash curto e determinístico do conteúdo (mesmos dados => mesma versão em qualquer worker)."""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(",".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def _read_snapshot():
+    if not SNAPSHOT_PATH or not os.path.exists(SNAPSHOT_PATH):
+        return None
+    if time.time() - os.path.getmtime(SNAPSHOT_PATH) > SNAPSHOT_MAX_AGE_SECONDS:
+        return None
+    try:
+        with open(SNAPSHOT_PATH, 'rb') as f:
+            df = frame_from_bytes(f.read())
+    except Exception as e:
+        print(f"AVISO: snapshot de dados ilegível ({e}); recarregando das fontes.")
+        return None
+    print(f"-> Dataset restaurado do snapshot {SNAPSHOT_PATH} ({len(df)} linhas).")
+    return df
+
+
+def _write_snapshot(df: pd.DataFrame):
+    if not SNAPSHOT_PATH:
+        return
+    tmp_path = f"{SNAPSHOT_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(frame_to_bytes(df))
+        os.replace(tmp_path, SNAPSHOT_PATH)  # troca atômica: leitores nunca veem arquivo parcial
+    except Exception as e:
+        print(f"AVISO: não foi possível gravar o snapshot de dados: {e}")
+
+
+def _store_load_report(report):
+    _recent_reports.appendleft(report)
+    try:
+        database.add_load_report(report)
+    except Exception as e:
+        print(f"AVISO: relatório de carga não gravado no banco: {e}")
+
+
+def recent_load_reports():
+    """Relatórios de carga mantidos em memória por este processo (mais recente primeiro)."""
+    return list(_recent_reports)
+
+
+def _load(use_snapshot=True) -> Dataset:
+    df = None
+    profiler = None
+    archive_version = None
+    if use_snapshot and SNAPSHOT_PATH:
+        profiler = LoadProfiler(source='snapshot')
+        with profiler.stage('read_snapshot') as stage:
+            df = _read_snapshot()
+            stage.rows_out = None if df is None else len(df)
+        if df is not None and 'Cliente' not in df.columns:
+            # Snapshot anterior à dimensão Cliente
+            df = df.assign(Cliente=assign_clients(df['Destino'], fetch_client_frame()))
+    if df is None:
+        df = load_and_prepare_data()
+        profiler = last_load_profiler() or LoadProfiler()
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            # A falha não fica memorizada: a próxima chamada tenta carregar as fontes de novo
+            load_and_prepare_data.cache_clear()
+            _store_load_report(profiler.report())
+            raise ValueError("A função load_and_prepare_data() retornou um DataFrame vazio ou inválido.")
+        if HISTORY_ARCHIVE_DIR:
+            # Modo arquivo: histórico completo em partições mensais; em memória, só a janela quente
+            with profiler.stage('write_archive', len(df)) as stage:
+                # Versão do histórico completo: mesmos dados => mesmo diretório, gravado uma vez só
+                archive_version = compute_version(df)
+                archived = write_archive(df, archive_version, HISTORY_ARCHIVE_DIR)
+                stage.note = HISTORY_ARCHIVE_DIR if archived else "falhou; histórico inteiro em memória"
+            if archived:
+                with profiler.stage('hot_window', len(df)) as stage:
+                    df = hot_window(df)
+                    stage.rows_out = len(df)
+                load_and_prepare_data.cache_clear()  # solta o histórico completo
+            else:
+                archive_version = None
+        if SNAPSHOT_PATH:
+            with profiler.stage('write_snapshot', len(df)):
+                _write_snapshot(df)
+
+    with profiler.stage('version', len(df)) as stage:
+        version = compute_version(df)
+        stage.rows_out = len(df)
+    dataset = Dataset(df, version)
+    dataset.archive_version = archive_version
+    dataset.load_report = profiler.report(version=version, rows=len(df))
+    _store_load_report(dataset.load_report)
+    return dataset
+
+
+def get_dataset() -> Dataset:
+    """
+    Retorna o dataset atual, carregando-o no primeiro uso (thread-safe). Se outro worker
+    re-rotulou turnos/clientes desde a última conferência, re-rotula este também.
+    """
+    global _current, _labels_seen, _labels_checked_at
+    dataset = _current
+    if dataset is not None:
+        return _sync_labels(dataset)
+    with _load_lock:
+        if _current is None:
+            # O marcador é lido antes da carga: uma re-rotulagem durante a carga ainda é aplicada depois
+            _labels_seen = get_result_cache().backend.get(_LABELS_MARKER_KEY)
+            _labels_checked_at = time.monotonic()
+            _current = _load()
+        return _current
+
+
+def _sync_labels(dataset) -> Dataset:
+    # Confere o marcador de re-rotulagem (barato: uma leitura no backend a cada LABELS_SYNC_SECONDS)
+    global _labels_seen, _labels_checked_at
+    now = time.monotonic()
+    if now - _labels_checked_at < LABELS_SYNC_SECONDS or not _labels_lock.acquire(blocking=False):
+        return dataset
+    try:
+        backend = get_result_cache().backend
+        # Sem conferir por mais que o TTL, um marcador pode ter expirado sem ser visto
+        stale = backend.name != 'none' and now - _labels_checked_at > CACHE_TTL_SECONDS
+        _labels_checked_at = now
+        marker = backend.get(_LABELS_MARKER_KEY)
+        if not stale and (marker is None or marker == _labels_seen):
+            return dataset
+        _labels_seen = marker if marker is not None else _labels_seen
+        print("-> Turnos/clientes alterados em outro worker; re-rotulando o dataset.")
+        return _publish_relabeled('sincronizacao', 'assign_clients', _relabel_clients)
+    except Exception as e:
+        print(f"AVISO: não foi possível sincronizar turnos/clientes entre workers: {e}")
+        return dataset
+    finally:
+        _labels_lock.release()
+
+
+def _announce_relabel(dataset) -> Dataset:
+    # Grava um marcador novo para que os outros workers re-rotulem (ver _sync_labels)
+    global _labels_seen
+    marker = f"{time.time_ns()}:{os.getpid()}:{dataset.version}".encode()
+    get_result_cache().backend.set(_LABELS_MARKER_KEY, marker)
+    _labels_seen = marker
+    return dataset
+
+
+def refresh_dataset() -> Dataset:
+    """Força uma nova carga das fontes originais e publica uma nova versão."""
+    global _current
+    with _load_lock:
+        load_and_prepare_data.cache_clear()
+        _current = _load(use_snapshot=False)
+        return _current
+
+
+def _publish_relabeled(source, stage_name, relabel) -> Dataset:
+    # Aplica `relabel(df) -> (df, nota)` ao dataset atual e publica a nova versão (sem recarregar as fontes)
+    global _current
+    with _load_lock:
+        current = _current if _current is not None else _load()
+        profiler = LoadProfiler(source=source)
+        with profiler.stage(stage_name, len(current.df)) as stage:
+            df, stage.note = relabel(current.df)
+            stage.rows_out = len(df)
+        if SNAPSHOT_PATH:
+            with profiler.stage('write_snapshot', len(df)):
+                _write_snapshot(df)
+        with profiler.stage('version', len(df)) as stage:
+            version = compute_version(df)
+            stage.rows_out = len(df)
+        if version == current.version:
+            return current
+        dataset = Dataset(df, version)
+        dataset.archive_version = current.archive_version  # a re-rotulagem não regrava o histórico
+        dataset.load_report = profiler.report(version=version, rows=len(df))
+        _store_load_report(dataset.load_report)
+        _current = dataset
+        return dataset
+
+
+def reassign_shifts(shift_table=None) -> Dataset:
+    """
+    Re-rotula a coluna Turno com os turnos cadastrados e publica uma nova versão, sem
+    recarregar as fontes (uma busca binária vetorizada sobre o histórico, ver logic/shifts.py).
+    """
+    def relabel(df):
+        table = shift_table or load_shift_table()
+        df = df.assign(Turno=assign_shifts(df['Destino'], df['Data_Hora'].to_numpy(), table))
+        return df, f"{len(table.destinations)} destinos com turnos próprios"
+    return _announce_relabel(_publish_relabeled('turnos', 'assign_shifts', relabel))
+
+
+def _relabel_clients(df):
+    # Colunas Cliente e Turno a partir dos clientes e turnos cadastrados
+    df_shifts, df_clients = fetch_shift_frames()
+    table = build_shift_table(df_shifts, df_clients)
+    df = df.assign(
+        Cliente=assign_clients(df['Destino'], df_clients),
+        Turno=assign_shifts(df['Destino'], df['Data_Hora'].to_numpy(), table),
+    )
+    return df, f"{len(df_clients)} clientes, {len(table.destinations)} destinos com turnos próprios"
+
+
+def reassign_clients() -> Dataset:
+    """
+    Refaz as colunas Cliente e Turno (os turnos dependem do cliente de cada destino) com os
+    clientes cadastrados e publica uma nova versão, sem recarregar as fontes (ver logic/clients.py).
+    """
+    return _announce_relabel(_publish_relabeled('clientes', 'assign_clients', _relabel_clients))
+
+
+def _build_period_dataset(dataset, archive, start: date, end: date, version) -> Dataset:
+    # Viagens do período anteriores à janela quente (arquivo, só as partições do período) + as da janela quente
+    columns = list(dataset.df.columns)
+    archived_end = min(end, archive.hot_start - timedelta(days=1))
+    chunks = list(archive.scan({}, columns, start, archived_end))
+    hot_rows = dataset.df[dataset.df['Data_Apenas'].between(archive.hot_start, end)] if end >= archive.hot_start else dataset.df.iloc[:0]
+    df = pd.concat([chunk.reindex(columns=columns) for chunk in chunks] + [hot_rows], ignore_index=True)
+    print(f"-> Período {start} a {end} lido do arquivo de histórico ({len(df)} linhas).")
+    return Dataset(df, version)
+
+
+def dataset_for_filters(dataset, filters) -> Dataset:
+    """
+    Dataset que cobre o período dos filtros. Fora do modo arquivo, ou com o período dentro da
+    janela quente, é o próprio dataset atual. Para períodos que começam antes da janela quente,
+    um Dataset com as viagens do período: as anteriores à janela lidas do arquivo (só as
+    partições que cruzam o período) mais as da janela quente. Filtros, cubo e índices operam
+    sobre ele sem mudanças, memorizados pela versão dele (atual + arquivo + período).
+    """
+    start, end = (filters or {}).get('start_date'), (filters or {}).get('end_date')
+    archive = get_archive(dataset)
+    if archive is None or not start or not end or not archive.covers(start):
+        return dataset
+    key = (dataset.version, archive.version, start, end)
+    with _period_lock:
+        if key in _period_datasets:
+            _period_datasets.move_to_end(key)
+            return _period_datasets[key]
+    version = hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
+    period = _period_flight.do(key, _build_period_dataset, dataset, archive,
+                               date.fromisoformat(start), date.fromisoformat(end), version)
+    with _period_lock:
+        _period_datasets[key] = period
+        _period_datasets.move_to_end(key)
+        while len(_period_datasets) > PERIOD_DATASETS_KEPT:
+            _period_datasets.popitem(last=False)
+    return period
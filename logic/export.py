@@ -0,0 +1,160 @@
+# logic/export.py
+"""
+Exportação das viagens filtradas e da matriz em CSV/XLSX, em streaming.
+
+As rotas /export/<tipo>.<formato> recebem os filtros normalizados na query string
+(?filters=<json>, o mesmo conteúdo do token do dcc.Store; a matriz aceita também
+?grain=<granularidade>, a mesma do seletor da aba) e respondem com um gerador:
+o arquivo sai em blocos de EXPORT_CHUNK_ROWS linhas, então o download começa logo e o
+arquivo inteiro nunca fica em memória.
+
+  - CSV: separador ';' e vírgula decimal (abre direto no Excel em pt-BR), UTF-8 com BOM.
+  - XLSX: openpyxl em modo write-only (cada linha vai para um arquivo temporário, memória
+    constante). O zip do .xlsx só pode ser montado no fim: a planilha inteira é gerada antes
+    do primeiro byte sair e só então é enviada do disco em blocos. Por isso o XLSX vai até
+    XLSX_EXPORT_MAX_ROWS linhas; acima disso a rota responde 413 indicando o CSV.
+
+Só usuários autenticados exportam (Flask-Login, mesmo login do painel).
+"""
+import codecs
+import json
+import os
+import tempfile
+from urllib.parse import quote
+
+import pandas as pd
+from flask import Response, request, stream_with_context, abort
+from flask_login import login_required
+
+from logic.analysis_functions import create_matrix_data
+from logic.dataset import get_dataset, dataset_for_filters
+from logic.filters import LIST_FILTERS, normalize_filters, get_filtered_frame
+from logic.resample import GRAINS, DEFAULT_GRAIN
+
+# Linhas por bloco do streaming
+EXPORT_CHUNK_ROWS = 50_000
+# Bytes por bloco ao enviar o .xlsx do arquivo temporário
+XLSX_READ_BYTES = 1024 * 1024
+# Linhas de dados por aba do .xlsx (limite do Excel: 1.048.576 linhas, com o cabeçalho)
+XLSX_MAX_ROWS = 1_048_575
+# Maior exportação em XLSX (a planilha é montada inteira antes do download começar)
+XLSX_EXPORT_MAX_ROWS = int(os.getenv("XLSX_EXPORT_MAX_ROWS", "200000"))
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+# Tipo de exportação -> (nome do arquivo, função que monta o DataFrame a partir das viagens filtradas e da granularidade)
+EXPORT_KINDS = {
+    'trips': ('viagens', lambda dff, grain: dff),
+    'matrix': ('matriz', create_matrix_data),
+}
+
+
+def export_href(kind, export_format, filters, grain=None) -> str:
+    """URL de exportação para os filtros normalizados (e a granularidade, na matriz)."""
+    href = f"/export/{kind}.{export_format}?filters={quote(json.dumps(filters, separators=(',', ':')))}"
+    return f"{href}&grain={quote(grain)}" if grain else href
+
+
+def filters_from_query(raw) -> dict:
+    """Filtros da query string, normalizados de novo (nada do cliente é usado sem passar por normalize_filters)."""
+    try:
+        filters = json.loads(raw) if raw else {}
+    except ValueError:
+        abort(400)
+    if not isinstance(filters, dict):
+        abort(400)
+    try:
+        return normalize_filters(filters.get('start_date'), filters.get('end_date'),
+                                 **{key: filters.get(key) for key in LIST_FILTERS})
+    except (ValueError, TypeError):
+        abort(400)  # datas inválidas (mesma regra de logic/api.parse_query)
+
+
+def iter_csv(df: pd.DataFrame, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Cabeçalho e blocos de linhas em CSV (bytes), sem materializar o arquivo."""
+    yield codecs.BOM_UTF8 + df.iloc[:0].to_csv(index=False, sep=';').encode('utf-8')
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        yield chunk.to_csv(index=False, header=False, sep=';', decimal=',', date_format='%Y-%m-%d %H:%M:%S').encode('utf-8')
+
+
+def _xlsx_rows(chunk: pd.DataFrame):
+    # openpyxl não aceita NaN/NaT nem tipos numpy: converte coluna a coluna para objetos Python
+    columns = []
+    for name in chunk.columns:
+        values = chunk[name]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            columns.append(values.dt.to_pydatetime().astype(object))
+            columns[-1][values.isna().to_numpy()] = None
+        else:
+            column = values.to_numpy(dtype=object, copy=True)
+            column[pd.isna(values).to_numpy()] = None
+            columns.append(column)
+    return zip(*columns) if columns else iter(())
+
+
+def iter_xlsx(df: pd.DataFrame, sheet_title='Dados', chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Planilha em modo write-only (memória constante) enviada do arquivo temporário em blocos.
+    Acima de XLSX_MAX_ROWS linhas, os dados continuam em abas seguintes.
+    """
+    from openpyxl import Workbook  # só quem exporta XLSX carrega o openpyxl
+
+    workbook = Workbook(write_only=True)
+    header = [str(column) for column in df.columns]
+    for sheet_number, sheet_start in enumerate(range(0, max(len(df), 1), XLSX_MAX_ROWS)):
+        sheet = workbook.create_sheet(sheet_title if not sheet_number else f"{sheet_title} {sheet_number + 1}")
+        sheet.append(header)
+        sheet_end = min(sheet_start + XLSX_MAX_ROWS, len(df))
+        for start in range(sheet_start, sheet_end, chunk_rows):
+            for row in _xlsx_rows(df.iloc[start:min(start + chunk_rows, sheet_end)]):
+                sheet.append(row)
+
+    handle, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(handle)
+    try:
+        workbook.save(path)
+        with open(path, 'rb') as f:
+            while True:
+                block = f.read(XLSX_READ_BYTES)
+                if not block:
+                    break
+                yield block
+    finally:
+        os.remove(path)
+
+
+def _filename(kind_name, filters, export_format):
+    period = f"-{filters['start_date']}_{filters['end_date']}" if filters.get('start_date') else ""
+    return f"{kind_name}{period}.{export_format}"
+
+
+def register_export_routes(server):
+    """Expõe /export/<tipo>.<formato> no servidor Flask (login obrigatório)."""
+
+    @server.route('/export/<kind>.<export_format>')
+    @login_required
+    def export_endpoint(kind, export_format):
+        if kind not in EXPORT_KINDS or export_format not in EXPORT_FORMATS:
+            abort(404)
+        filters = filters_from_query(request.args.get('filters'))
+        grain = request.args.get('grain', DEFAULT_GRAIN)
+        if grain not in GRAINS:
+            abort(400)
+        kind_name, build = EXPORT_KINDS[kind]
+        df = build(get_filtered_frame(dataset_for_filters(get_dataset(), filters), filters), grain)
+        if export_format == 'xlsx' and len(df) > XLSX_EXPORT_MAX_ROWS:
+            return Response(
+                f"A exportação tem {len(df):,} linhas; o Excel vai até {XLSX_EXPORT_MAX_ROWS:,}. "
+                "Use a exportação em CSV ou reduza o período.".replace(',', '.'),
+                status=413, mimetype='text/plain; charset=utf-8')
+        chunks = iter_csv(df) if export_format == 'csv' else iter_xlsx(df, sheet_title=kind_name.capitalize())
+        return Response(
+            stream_with_context(chunks),
+            mimetype=EXPORT_FORMATS[export_format],
+            headers={
+                'Content-Disposition': f'attachment; filename="{_filename(kind_name, filters, export_format)}"',
+                'Cache-Control': 'no-store',
+            },
+        )
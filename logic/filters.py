@@ -0,0 +1,127 @@
+# logic/filters.py
+"""
+Normalização e aplicação dos filtros do painel lateral.
+
+O dcc.Store 'filtered-data-store' guarda apenas um "token" pequeno
+({'version': <versão do dataset>, 'filters': {...}}); o DataFrame filtrado é resolvido
+no servidor por get_filtered_frame(), com cálculos idênticos simultâneos coalescidos
+e o resultado guardado no cache compartilhado (logic/cache.py).
+"""
+import numpy as np
+import pandas as pd
+
+from logic.cache import get_result_cache, dump_array, load_array
+from logic.plate_index import get_plate_index
+from logic.singleflight import SingleFlight
+
+# Filtros de lista: chave no token -> coluna do DataFrame
+LIST_FILTERS = {
+    'empresas': 'Empresa',
+    'clientes': 'Cliente',
+    'destinos': 'Destino',
+    'materiais': 'Material',
+    'placas': 'Placa',
+}
+
+_filter_flight = SingleFlight('filters')
+
+
+def _normalize_date(value):
+    if not value:
+        return None
+    return pd.to_datetime(value).date().isoformat()
+
+
+def normalize_filters(start_date=None, end_date=None, **selections) -> dict:
+    """
+    Gera a forma canônica dos filtros: datas ISO e listas ordenadas sem repetição.
+    Seleções equivalentes (ordem diferente, datas em formatos diferentes) geram o mesmo dict.
+    """
+    filters = {'start_date': None, 'end_date': None}
+    if start_date and end_date:
+        filters['start_date'] = _normalize_date(start_date)
+        filters['end_date'] = _normalize_date(end_date)
+    for key in LIST_FILTERS:
+        filters[key] = sorted(set(selections.get(key) or []))
+    return filters
+
+
+def filters_key(filters) -> tuple:
+    """Chave hashable (para caches/single-flight) a partir de filtros normalizados."""
+    filters = filters or normalize_filters()
+    return (filters.get('start_date'), filters.get('end_date')) + tuple(
+        tuple(filters.get(key) or ()) for key in LIST_FILTERS
+    )
+
+
+def make_filter_token(dataset, filters) -> dict:
+    """Conteúdo do dcc.Store: versão do dataset + filtros normalizados."""
+    return {'version': dataset.version, 'filters': filters}
+
+
+def filters_from_token(token) -> dict:
+    if not token or not isinstance(token, dict) or 'filters' not in token:
+        return normalize_filters()
+    return token['filters']
+
+
+def filter_mask(df: pd.DataFrame, filters) -> np.ndarray:
+    """Máscara booleana das linhas que passam pelos filtros normalizados."""
+    mask = np.ones(len(df), dtype=bool)
+
+    # 1. Filtro por Data
+    if filters.get('start_date') and filters.get('end_date'):
+        start_date_obj = pd.to_datetime(filters['start_date']).date()
+        end_date_obj = pd.to_datetime(filters['end_date']).date()
+        mask &= df['Data_Apenas'].between(start_date_obj, end_date_obj).to_numpy()
+
+    # 2. Filtros de lista (Empresa, Cliente, Destino, Material, Placa)
+    for key, column in LIST_FILTERS.items():
+        selected = filters.get(key)
+        if selected and column in df.columns:
+            mask &= df[column].isin(selected).to_numpy()
+
+    return mask
+
+
+def filter_positions(df: pd.DataFrame, filters) -> np.ndarray:
+    """Posições (iloc) das linhas filtradas; forma compacta guardada no cache compartilhado."""
+    positions = np.flatnonzero(filter_mask(df, filters))
+    return positions.astype(np.int32) if len(df) < 2**31 else positions
+
+
+def apply_filters(df: pd.DataFrame, filters) -> pd.DataFrame:
+    """Aplica os filtros normalizados ao DataFrame (sem cache)."""
+    return df[filter_mask(df, filters)]
+
+
+def _dataset_positions(dataset, filters):
+    # Com placas selecionadas, parte só das linhas delas (índice de placas) em vez do DataFrame todo
+    if not filters.get('placas'):
+        return filter_positions(dataset.df, filters)
+    candidates = get_plate_index(dataset).positions(filters['placas'])
+    mask = filter_mask(dataset.df.iloc[candidates], dict(filters, placas=[]))
+    positions = candidates[mask]
+    return positions.astype(np.int32) if len(dataset.df) < 2**31 else positions
+
+
+def _cached_positions(dataset, filters):
+    return get_result_cache().get_or_compute(
+        'filter', dataset.version, filters_key(filters),
+        lambda: _dataset_positions(dataset, filters),
+        dumps=dump_array, loads=load_array
+    )
+
+
+def get_filtered_frame(dataset, filters) -> pd.DataFrame:
+    """
+    DataFrame filtrado da versão atual. As posições das linhas ficam no cache de resultados
+    (compartilhado entre workers) e requisições simultâneas com os mesmos filtros compartilham
+    um único cálculo. O resultado é compartilhado: não modifique-o.
+    """
+    filters = filters or normalize_filters()
+    if not any(filters_key(filters)):
+        return dataset.df
+    key = (dataset.version, filters_key(filters))
+    positions = _filter_flight.do(key, _cached_positions, dataset, filters)
+    return dataset.df.iloc[positions]
@@ -0,0 +1,162 @@
+# logic/fleet_efficiency.py
+"""
+Tempo de ciclo e utilização da frota.
+
+Para cada viagem, o intervalo até a viagem anterior da mesma placa (tempo de ciclo) é
+calculado uma única vez por versão do dataset, sobre o histórico inteiro: ordena por
+(placa, horário) e tira a diferença entre linhas vizinhas da mesma placa. Assim o ciclo
+de uma viagem não depende dos filtros (a viagem anterior pode ser para outro destino).
+
+Os turnos são os da escala de cada destino (logic/shifts.py: padrão 06h-18h/18h-06h ou
+os cadastrados por cliente). Cada viagem pertence a um turno trabalhado, identificado pelo
+minuto em que aquele turno começou (um turno que atravessa a meia-noite é um só). Dentro
+de um mesmo turno trabalhado, intervalos de até CYCLE_MAX_MINUTES contam como ciclo
+(veículo operando) e os maiores como ociosidade. Intervalos entre turnos diferentes não
+contam: o veículo estava fora de operação.
+
+Utilização = horas operando / soma da duração cadastrada dos turnos trabalhados. Viagens
+em horários fora dos turnos (OFF_SHIFT_LABEL) não entram na utilização.
+
+Para a seleção filtrada, as métricas por placa e por turno saem de np.bincount sobre
+os códigos das linhas filtradas, sem laços em Python.
+"""
+import numpy as np
+import pandas as pd
+
+from logic.shifts import OFF_SHIFT_LABEL, ShiftTable, build_shift_table, get_shift_table
+
+# Intervalo máximo entre viagens do mesmo turno considerado ciclo (acima disso: ociosidade)
+CYCLE_MAX_MINUTES = 240
+# Mínimo de ciclos para uma placa entrar no ranking de piores ciclos
+MIN_CYCLES_FOR_RANKING = 5
+
+
+class TripGaps:
+    """Intervalos por viagem (alinhados às linhas do dataset) e os códigos usados nos agrupamentos."""
+
+    def __init__(self, plate_codes, plate_labels, shift_codes, shift_labels, shift_instance, shift_minutes,
+                 cycle_minutes, idle_minutes):
+        self.plate_codes = plate_codes          # código da placa por linha (-1 = sem placa)
+        self.plate_labels = plate_labels
+        self.shift_codes = shift_codes          # código do turno por linha (-1 = sem turno)
+        self.shift_labels = shift_labels
+        self.shift_instance = shift_instance    # turno trabalhado (minuto em que o turno começou) por linha
+        self.shift_minutes = shift_minutes      # duração do turno da linha (0 = fora de turno)
+        self.cycle_minutes = cycle_minutes      # NaN quando a linha não fecha um ciclo
+        self.idle_minutes = idle_minutes        # NaN quando não houve ociosidade antes da linha
+
+
+def build_trip_gaps(df: pd.DataFrame, table: ShiftTable = None) -> TripGaps:
+    """Tempo de ciclo e ociosidade de cada viagem: ordenação por (placa, horário) + diferença."""
+    table = table or build_shift_table()
+    plate_codes, plate_labels = pd.factorize(df['Placa'])
+    minutes = df['Data_Hora'].to_numpy().astype('datetime64[m]').astype(np.int64)
+
+    # Trecho da escala de cada viagem: turno, duração e o minuto em que o turno começou
+    segments = table.locate(table.trip_schedules(df['Destino']), minutes)
+    shift_labels = pd.Index(table.labels)
+    shift_codes = table.label_codes[segments]
+    shift_minutes = table.segment_minutes[segments]
+    segment_start = minutes - minutes % (24 * 60) + table.keys[segments] % (24 * 60)
+    shift_instance = segment_start - table.segment_offsets[segments]
+
+    order = np.lexsort((minutes, plate_codes))
+    sorted_plates, sorted_minutes, sorted_instance = plate_codes[order], minutes[order], shift_instance[order]
+    gaps = np.full(len(df), np.nan)
+    gaps[1:] = np.diff(sorted_minutes).astype(float)
+    same_shift = np.zeros(len(df), dtype=bool)
+    same_shift[1:] = (sorted_plates[1:] == sorted_plates[:-1]) & (sorted_instance[1:] == sorted_instance[:-1])
+    same_shift &= sorted_plates >= 0
+
+    cycle = np.full(len(df), np.nan)
+    idle = np.full(len(df), np.nan)
+    is_cycle = same_shift & (gaps <= CYCLE_MAX_MINUTES)
+    is_idle = same_shift & (gaps > CYCLE_MAX_MINUTES)
+    cycle[order[is_cycle]] = gaps[is_cycle]
+    idle[order[is_idle]] = gaps[is_idle]
+    return TripGaps(plate_codes, plate_labels, shift_codes, shift_labels, shift_instance, shift_minutes, cycle, idle)
+
+
+def get_trip_gaps(dataset) -> TripGaps:
+    """Intervalos da versão atual (com as escalas da versão), calculados uma única vez por versão."""
+    table = get_shift_table(dataset)
+    return dataset.derive('trip_gaps', lambda ds: build_trip_gaps(ds.df, table))
+
+
+def fleet_efficiency(dataset, dff: pd.DataFrame) -> dict:
+    """
+    Métricas de eficiência das viagens filtradas (dff é um recorte de dataset.df):
+    distribuição dos tempos de ciclo, resumo por turno e por placa.
+    """
+    gaps = get_trip_gaps(dataset)
+    positions = dataset.df.index.get_indexer(dff.index)
+    plates = gaps.plate_codes[positions]
+    shifts = gaps.shift_codes[positions]
+    instances = gaps.shift_instance[positions]
+    durations = gaps.shift_minutes[positions]
+    cycle = gaps.cycle_minutes[positions]
+    idle = gaps.idle_minutes[positions]
+    has_cycle, has_idle = ~np.isnan(cycle), ~np.isnan(idle)
+    cycle_or_zero, idle_or_zero = np.where(has_cycle, cycle, 0.0), np.where(has_idle, idle, 0.0)
+
+    # Turnos trabalhados: pares (turno trabalhado, turno, placa) distintos, com a duração do turno.
+    # Fora de turno não é turno trabalhado: não entra na utilização.
+    n_shifts, n_plates = len(gaps.shift_labels), len(gaps.plate_labels)
+    on_shift = durations > 0
+    worked = (plates >= 0) & on_shift
+    pair_keys = (instances[worked] * (n_shifts + 1) + shifts[worked]) * max(n_plates, 1) + plates[worked]
+    pairs, first = np.unique(pair_keys, return_index=True)
+    pair_shifts = pairs // max(n_plates, 1) % (n_shifts + 1)
+    pair_plates = pairs % max(n_plates, 1)
+    pair_hours = durations[worked][first] / 60
+
+    # Por turno: horas operando / soma da duração dos turnos trabalhados
+    valid_shift = shifts >= 0
+    shift_trips = np.bincount(shifts[valid_shift], minlength=n_shifts)
+    shift_operating = np.bincount(shifts[valid_shift], weights=cycle_or_zero[valid_shift], minlength=n_shifts) / 60
+    shift_idle = np.bincount(shifts[valid_shift], weights=idle_or_zero[valid_shift], minlength=n_shifts) / 60
+    worked_shifts = np.bincount(pair_shifts, minlength=n_shifts)
+    worked_hours = np.bincount(pair_shifts, weights=pair_hours, minlength=n_shifts)
+    by_shift = pd.DataFrame({
+        'Turno': list(gaps.shift_labels),
+        'Viagens': shift_trips,
+        'Horas_Operando': shift_operating,
+        'Horas_Ociosas': shift_idle,
+        'Turnos_Trabalhados': worked_shifts,
+    })
+    by_shift['Utilizacao'] = np.where(worked_hours > 0, shift_operating / np.maximum(worked_hours, 1e-9), 0.0)
+    # Só turnos com viagens na seleção; fora de turno não tem utilização
+    by_shift = by_shift[(by_shift['Viagens'] > 0) & (by_shift['Turno'] != OFF_SHIFT_LABEL)].reset_index(drop=True)
+
+    # Por placa: ciclo médio, ociosidade e viagens por hora de operação
+    valid_plate = plates >= 0
+    plate_trips = np.bincount(plates[valid_plate], minlength=n_plates)
+    plate_cycles = np.bincount(plates[valid_plate], weights=has_cycle[valid_plate], minlength=n_plates)
+    plate_cycle_minutes = np.bincount(plates[valid_plate], weights=cycle_or_zero[valid_plate], minlength=n_plates)
+    plate_idle_minutes = np.bincount(plates[valid_plate], weights=idle_or_zero[valid_plate], minlength=n_plates)
+    plate_worked_hours = np.bincount(pair_plates, weights=pair_hours, minlength=n_plates)
+    on_shift_operating = np.bincount(plates[valid_plate], weights=np.where(on_shift, cycle_or_zero, 0.0)[valid_plate],
+                                     minlength=n_plates) / 60
+    operating_hours = plate_cycle_minutes / 60
+    by_plate = pd.DataFrame({
+        'Placa': np.asarray(gaps.plate_labels, dtype=object),
+        'Viagens': plate_trips,
+        'Ciclos': plate_cycles.astype(int),
+        'Ciclo_Medio_Min': np.where(plate_cycles > 0, plate_cycle_minutes / np.maximum(plate_cycles, 1), np.nan),
+        'Horas_Ociosas': plate_idle_minutes / 60,
+        'Viagens_Por_Hora': np.where(operating_hours > 0, plate_cycles / np.maximum(operating_hours, 1e-9), np.nan),
+        'Utilizacao': np.where(plate_worked_hours > 0, on_shift_operating / np.maximum(plate_worked_hours, 1e-9), np.nan),
+    })
+    by_plate = by_plate[by_plate['Viagens'] > 0].reset_index(drop=True)
+
+    total_operating = cycle_or_zero.sum() / 60
+    return {
+        'cycle_minutes': cycle[has_cycle],
+        'median_cycle': float(np.median(cycle[has_cycle])) if has_cycle.any() else None,
+        'p90_cycle': float(np.percentile(cycle[has_cycle], 90)) if has_cycle.any() else None,
+        'trips_per_hour': float(has_cycle.sum() / total_operating) if total_operating else None,
+        'idle_hours': float(idle_or_zero.sum() / 60),
+        'by_shift': by_shift,
+        'by_plate': by_plate,
+        'worst_plates': by_plate[by_plate['Ciclos'] >= MIN_CYCLES_FOR_RANKING].nlargest(10, 'Ciclo_Medio_Min'),
+    }
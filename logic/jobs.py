@@ -0,0 +1,66 @@
+# logic/jobs.py
+"""
+Gerenciador local de jobs para callbacks em segundo plano (background callbacks do Dash).
+
+Páginas pesadas (ex.: matriz de um ano inteiro) rodam num subprocesso gerenciado pelo
+DiskcacheManager do Dash: o worker web só dispara o job e responde às consultas de
+progresso, ficando livre para requisições baratas. Sem broker externo: o estado dos
+jobs e os resultados ficam num diskcache local em JOB_CACHE_DIR.
+
+Requer `dash[diskcache]` (diskcache, multiprocess, psutil). Sem esses pacotes,
+get_background_manager() retorna None e as páginas voltam a ser renderizadas no
+próprio callback, como antes.
+"""
+import json
+import os
+import tempfile
+import threading
+
+from flask import request, Response
+from flask_login import current_user
+
+JOB_CACHE_DIR = os.getenv("JOB_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "fleetmaster-jobs")
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", "600"))
+BACKGROUND_CALLBACKS = os.getenv("BACKGROUND_CALLBACKS", "1") != "0"
+
+_manager = None
+_manager_ready = False
+_manager_lock = threading.Lock()
+
+
+def get_background_manager():
+    """DiskcacheManager compartilhado pelo processo, ou None se indisponível/desligado."""
+    global _manager, _manager_ready
+    if _manager_ready:
+        return _manager
+    with _manager_lock:
+        if not _manager_ready:
+            if BACKGROUND_CALLBACKS:
+                try:
+                    import diskcache
+                    from dash import DiskcacheManager
+                    _manager = DiskcacheManager(diskcache.Cache(JOB_CACHE_DIR), expire=JOB_RESULT_TTL_SECONDS)
+                except ImportError as e:
+                    print(f"AVISO: callbacks em segundo plano indisponíveis ({e}); páginas pesadas serão síncronas.")
+            _manager_ready = True
+    return _manager
+
+
+def require_login_for_outputs(server, output_ids):
+    """
+    O job roda fora do contexto da requisição (sem current_user), então a autenticação
+    das saídas em segundo plano é verificada aqui, antes de o Dash disparar o job.
+    """
+    output_ids = tuple(output_ids)
+
+    @server.before_request
+    def protect_background_outputs():
+        if not request.path.endswith('/_dash-update-component') or current_user.is_authenticated:
+            return None
+        try:
+            output = json.loads(request.get_data() or b'{}').get('output', '')
+        except ValueError:
+            return None
+        if any(f"{output_id}." in output for output_id in output_ids):
+            return Response("forbidden\n", status=403, mimetype='text/plain')
+        return None
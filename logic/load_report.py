@@ -0,0 +1,104 @@
+# logic/load_report.py
+"""
+Relatório por etapa da carga de dados.
+
+Cada etapa nomeada do pipeline (fetch, normalize_columns, parse_datetime, ...) registra
+tempo de parede, linhas de entrada/saída e variação de memória (RSS do processo).
+O relatório acompanha a versão do dataset (Dataset.load_report), é gravado na tabela
+load_reports e pode ser consultado pelos administradores em /management/load-report.
+
+Com LOAD_PROFILE_DIR definido, a carga inteira roda sob cProfile e o arquivo .prof
+(abra com `python -m pstats` ou snakeviz) fica nesse diretório.
+"""
+import cProfile
+import os
+import time
+from contextlib import contextmanager
+
+LOAD_PROFILE_DIR = os.getenv("LOAD_PROFILE_DIR")
+
+
+def _rss_mb():
+    """RSS atual do processo em MB (Linux); None se indisponível."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StageRecord:
+    """Dados de uma etapa em andamento; `rows_out` é preenchido pelo código da etapa."""
+
+    def __init__(self, name, rows_in):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.note = None
+
+
+class LoadProfiler:
+    """Coleta as etapas de uma carga e produz o relatório estruturado (dict serializável em JSON)."""
+
+    def __init__(self, source='fontes'):
+        self.source = source
+        self.stages = []
+        self.started_at = time.time()
+        self.profile_path = None
+        self.error = None
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        record = StageRecord(name, rows_in)
+        memory_before = _rss_mb()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            elapsed = time.perf_counter() - start
+            memory_after = _rss_mb()
+            memory_delta = None if memory_before is None or memory_after is None else memory_after - memory_before
+            self.stages.append({
+                'name': name,
+                'seconds': round(elapsed, 4),
+                'rows_in': record.rows_in,
+                'rows_out': record.rows_out,
+                'memory_delta_mb': None if memory_delta is None else round(memory_delta, 1),
+                'note': record.note,
+            })
+            print(f"-> Etapa {name}: {elapsed:.2f}s, linhas {record.rows_in} -> {record.rows_out}")
+
+    @property
+    def total_seconds(self):
+        return round(sum(stage['seconds'] for stage in self.stages), 4)
+
+    def report(self, version=None, rows=None) -> dict:
+        return {
+            'version': version,
+            'source': self.source,
+            'started_at': self.started_at,
+            'total_seconds': self.total_seconds,
+            'rows': rows,
+            'stages': list(self.stages),
+            'profile_path': self.profile_path,
+            'error': self.error,
+        }
+
+
+@contextmanager
+def maybe_profile(profiler: LoadProfiler, profile_dir=LOAD_PROFILE_DIR):
+    """Roda o bloco sob cProfile quando LOAD_PROFILE_DIR está definido e grava o .prof."""
+    if not profile_dir:
+        yield
+        return
+    os.makedirs(profile_dir, exist_ok=True)
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        path = os.path.join(profile_dir, f"load-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.prof")
+        profile.dump_stats(path)
+        profiler.profile_path = path
+        print(f"-> Perfil cProfile da carga gravado em {path}")
@@ -0,0 +1,215 @@
+# logic/metrics.py
+"""
+Instrumentação dos callbacks do Dash e endpoint /metrics (formato texto do Prometheus).
+
+Todo callback registrado é envolvido por instrument_callbacks(), que mede por chamada:
+  - tempo de parede e tempo de CPU (da thread);
+  - tamanho do payload de entrada (corpo da requisição) e de saída (JSON da resposta);
+  - resultado: ok, prevented (PreventUpdate) ou error.
+Acertos/erros do cache de resultados (logic/cache.py) são atribuídos ao callback em execução.
+
+Para o callback que renderiza as páginas, o rótulo `page` traz a rota (url.pathname),
+o que permite SLOs de latência por página. Rotas desconhecidas viram 'other', para não
+explodir a cardinalidade das séries.
+
+Acesso a /metrics: `Authorization: Bearer <METRICS_TOKEN>` (para o Prometheus) ou sessão
+de usuário logado no painel. Acesso sem autenticação só com METRICS_PUBLIC=1, explícito.
+"""
+import hmac
+import os
+import threading
+import time
+from collections import defaultdict
+
+from flask import Response, request
+from flask_login import current_user
+from dash import exceptions
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+# /metrics aberto sem autenticação (só em rede interna confiável)
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "0").lower() in ("1", "true", "yes")
+METRIC_PREFIX = "fleetmaster"
+
+# Limites superiores dos buckets (o Prometheus acrescenta +Inf)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histogram:
+    """Histograma cumulativo por combinação de rótulos (thread-safe)."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}  # rótulos -> [contagens por bucket..., +Inf], soma
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            series[1] += value
+
+    def render(self, label_names):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+        for labels, (counts, total) in sorted(snapshot.items()):
+            base = _format_labels(label_names, labels)
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {counts[-1]}')
+            lines.append(f"{self.name}_sum{{{base}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {counts[-1]}")
+        return lines
+
+
+class Counter:
+    """Contador por combinação de rótulos (thread-safe)."""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._lock = threading.Lock()
+        self._values = defaultdict(int)
+
+    def inc(self, labels: tuple, amount=1):
+        with self._lock:
+            self._values[labels] += amount
+
+    def render(self, label_names):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = dict(self._values)
+        for labels, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{{{_format_labels(label_names, labels)}}} {value}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+CALLBACK_LABELS = ('callback', 'page')
+CALLBACK_DURATION = Histogram(f"{METRIC_PREFIX}_callback_duration_seconds",
+                              "Tempo de parede por chamada de callback.", LATENCY_BUCKETS)
+CALLBACK_CPU = Histogram(f"{METRIC_PREFIX}_callback_cpu_seconds",
+                         "Tempo de CPU (thread) por chamada de callback.", LATENCY_BUCKETS)
+CALLBACK_INPUT_BYTES = Histogram(f"{METRIC_PREFIX}_callback_input_bytes",
+                                 "Tamanho do corpo da requisição do callback.", SIZE_BUCKETS)
+CALLBACK_OUTPUT_BYTES = Histogram(f"{METRIC_PREFIX}_callback_output_bytes",
+                                  "Tamanho da resposta JSON do callback (sem compressão).", SIZE_BUCKETS)
+CALLBACK_CALLS = Counter(f"{METRIC_PREFIX}_callback_calls_total",
+                         "Chamadas de callback por resultado (ok, prevented, error).")
+CACHE_LABELS = ('callback', 'namespace', 'result')
+CACHE_REQUESTS = Counter(f"{METRIC_PREFIX}_cache_requests_total",
+                         "Consultas ao cache de resultados (local_hit, shared_hit, miss) por callback.")
+
+_current = threading.local()
+_known_pages = {"/"}
+
+
+def record_cache_event(namespace, result):
+    """Chamado por logic/cache.py; atribui o evento ao callback em execução nesta thread."""
+    CACHE_REQUESTS.inc((getattr(_current, 'callback', ''), namespace, result))
+
+
+def _page_label(callback_context):
+    """Rota da página quando o callback recebe url.pathname; vazio caso contrário."""
+    for item in getattr(callback_context, 'inputs_list', None) or []:
+        if isinstance(item, dict) and item.get('id') == 'url' and item.get('property') == 'pathname':
+            pathname = item.get('value') or '/'
+            return pathname if pathname in _known_pages else 'other'
+    return ''
+
+
+def _payload_size(result):
+    if isinstance(result, (str, bytes)):
+        return len(result)
+    if isinstance(result, Response):
+        return result.calculate_content_length() or 0
+    return 0
+
+
+def _instrument(name, func):
+    def instrumented(*args, **kwargs):
+        labels = (name, _page_label(kwargs.get('callback_context')))
+        input_size = request.content_length or 0
+        outcome = 'ok'
+        _current.callback = name
+        start, start_cpu = time.perf_counter(), time.thread_time()
+        try:
+            result = func(*args, **kwargs)
+            CALLBACK_OUTPUT_BYTES.observe(labels, _payload_size(result))
+            return result
+        except exceptions.PreventUpdate:
+            outcome = 'prevented'
+            raise
+        except Exception:
+            outcome = 'error'
+            raise
+        finally:
+            CALLBACK_DURATION.observe(labels, time.perf_counter() - start)
+            CALLBACK_CPU.observe(labels, time.thread_time() - start_cpu)
+            CALLBACK_INPUT_BYTES.observe(labels, input_size)
+            CALLBACK_CALLS.inc(labels + (outcome,))
+            _current.callback = ''
+
+    instrumented.__name__ = name
+    instrumented.__wrapped__ = func
+    return instrumented
+
+
+def instrument_callbacks(app, known_pages=()):
+    """Envolve todos os callbacks já registrados em `app` (chamar após register_callbacks)."""
+    _known_pages.update(known_pages)
+    for entry in app.callback_map.values():
+        func = entry['callback']
+        if getattr(func, '_metrics', False):
+            continue  # já instrumentado
+        wrapped = _instrument(getattr(func, '__name__', 'callback'), func)
+        wrapped._metrics = True
+        entry['callback'] = wrapped
+
+
+def render_metrics() -> str:
+    lines = []
+    lines += CALLBACK_DURATION.render(CALLBACK_LABELS)
+    lines += CALLBACK_CPU.render(CALLBACK_LABELS)
+    lines += CALLBACK_INPUT_BYTES.render(CALLBACK_LABELS)
+    lines += CALLBACK_OUTPUT_BYTES.render(CALLBACK_LABELS)
+    lines += CALLBACK_CALLS.render(CALLBACK_LABELS + ('outcome',))
+    lines += CACHE_REQUESTS.render(CACHE_LABELS)
+    return "\n".join(lines) + "\n"
+
+
+def _metrics_authorized() -> bool:
+    if METRICS_PUBLIC:
+        return True
+    if METRICS_TOKEN:
+        header = request.headers.get('Authorization', '')
+        if hmac.compare_digest(header.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+            return True
+    return current_user.is_authenticated
+
+
+def register_metrics_route(server):
+    """Expõe /metrics no servidor Flask (token, login do painel ou METRICS_PUBLIC=1)."""
+
+    @server.route('/metrics')
+    def metrics_endpoint():
+        if not _metrics_authorized():
+            return Response("unauthorized\n", status=401, mimetype='text/plain',
+                            headers={'WWW-Authenticate': 'Bearer realm="FleetMaster metrics"'})
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4; charset=utf-8')
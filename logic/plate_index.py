@@ -0,0 +1,97 @@
+# logic/plate_index.py
+"""
+Índice ordenado de placas, calculado uma vez por versão do dataset.
+
+A frota tem centenas de placas: em vez de embutir todas como opções estáticas no
+layout (como os demais filtros), o dropdown de placas é alimentado pelo servidor a
+partir do texto digitado (`search_value`). As placas ficam ordenadas pela chave de
+busca (maiúsculas, sem espaços nas pontas), então um prefixo vira um intervalo
+contíguo achado com duas buscas binárias (np.searchsorted).
+
+O índice também guarda as linhas de cada placa agrupadas (posições iloc + offsets),
+para que filtros com poucas placas selecionadas não precisem varrer o DataFrame.
+"""
+import numpy as np
+import pandas as pd
+
+# Máximo de placas devolvidas por busca (as com mais viagens primeiro)
+PLATE_SEARCH_LIMIT = 50
+
+
+def _search_key(values):
+    return np.char.upper(np.char.strip(np.asarray(values, dtype=str)))
+
+
+class PlateIndex:
+    """Placas ordenadas pela chave de busca, com viagens e posições das linhas de cada uma."""
+
+    def __init__(self, plates, keys, row_order, offsets):
+        self.plates = plates          # placas na ordem da chave de busca
+        self.keys = keys              # chaves de busca ordenadas (np.str_)
+        self.row_order = row_order    # posições iloc agrupadas por placa
+        self.offsets = offsets        # linhas da placa i: row_order[offsets[i]:offsets[i + 1]]
+        self.trips = np.diff(offsets)
+        self.plate_codes = {plate: code for code, plate in enumerate(plates.tolist())}
+
+    def __len__(self):
+        return len(self.plates)
+
+    def search(self, prefix, limit=PLATE_SEARCH_LIMIT) -> np.ndarray:
+        """Códigos das placas que começam com `prefix`, ordenados por viagens (desc)."""
+        key = str(_search_key([prefix or ''])[0])
+        if key:
+            lo, hi = np.searchsorted(self.keys, [key, key + '\uffff'])
+        else:
+            lo, hi = 0, len(self)
+        top = np.argsort(-self.trips[lo:hi], kind='stable')[:limit]
+        return lo + top
+
+    def positions(self, selected) -> np.ndarray:
+        """Posições iloc (crescentes) das linhas das placas selecionadas."""
+        codes = [self.plate_codes[plate] for plate in selected if plate in self.plate_codes]
+        if not codes:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([self.row_order[self.offsets[code]:self.offsets[code + 1]] for code in codes]))
+
+    def options(self, codes) -> list:
+        return [{'label': f"{self.plates[code]} ({self.trips[code]:,})".replace(",", "."), 'value': self.plates[code]}
+                for code in codes]
+
+
+def build_plate_index(df: pd.DataFrame) -> PlateIndex:
+    if 'Placa' not in df.columns:
+        empty = np.empty(0, dtype=str)
+        return PlateIndex(empty, empty, np.empty(0, dtype=np.int64), np.zeros(1, dtype=np.int64))
+
+    codes, uniques = pd.factorize(df['Placa'])
+    plates = np.asarray(uniques, dtype=object)
+    keys = _search_key(plates)
+    order = np.argsort(keys, kind='stable')
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+
+    # Linhas agrupadas pela placa já na ordem do índice (linhas sem placa ficam de fora)
+    row_codes = np.where(codes >= 0, rank[np.maximum(codes, 0)], -1)
+    row_order = np.argsort(row_codes, kind='stable')
+    row_order = row_order[np.searchsorted(row_codes[row_order], 0):]
+    offsets = np.searchsorted(row_codes[row_order], np.arange(len(order) + 1))
+    return PlateIndex(plates[order], keys[order], row_order, offsets)
+
+
+def get_plate_index(dataset) -> PlateIndex:
+    """Índice de placas da versão atual, calculado uma única vez por versão."""
+    return dataset.derive('plate_index', lambda ds: build_plate_index(ds.df))
+
+
+def plate_options(dataset, search_value, selected=None, limit=PLATE_SEARCH_LIMIT) -> list:
+    """
+    Opções do dropdown de placas para o texto digitado: as placas com mais viagens que
+    começam com o prefixo, mais as já selecionadas (que precisam continuar nas opções).
+    """
+    index = get_plate_index(dataset)
+    codes = index.search(search_value, limit).tolist()
+    for plate in selected or []:
+        code = index.plate_codes.get(plate)
+        if code is not None and code not in codes:
+            codes.append(code)
+    return index.options(codes)
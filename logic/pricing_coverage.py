@@ -0,0 +1,245 @@
+# logic/pricing_coverage.py
+"""
+Cobertura da precificação: viagens fora de qualquer período de preço.
+
+Viagens cujo dia não cai em nenhum período de preço do destino ficam com Valor Bruto 0
+na carga (lookup_interval_prices, abaixo) e a receita sai menor sem aviso. Esta análise
+mostra onde isso acontece. A carga e esta análise usam a mesma regra, covering_periods():
+o preço de um dia é o do período do destino que o contém (o de início mais recente, se
+houver mais de um).
+
+As viagens são reduzidas uma vez por versão do dataset a pares distintos (destino, dia)
+com viagens e volume. Os períodos de preço são ordenados pela chave composta
+destino x início, e o maior fim acumulado (np.maximum.accumulate) dá a união dos períodos
+já vistos. Um único np.searchsorted dos pares contra essa chave diz se cada dia está
+coberto e em qual "buraco" da cobertura cai, tudo em O((n + m) log m):
+
+  - gaps: intervalos sem preço que têm viagens (com viagens, volume e primeiro/último dia);
+  - overlaps: períodos que se sobrepõem a (ou encostam em) períodos anteriores do destino.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+_EPOCH = date(1970, 1, 1)
+
+
+class TripDays:
+    """Viagens agregadas por (destino, dia): pares ordenados por destino e dia."""
+
+    def __init__(self, destinations, days, trips, volume):
+        self.destinations = destinations  # rótulo do destino de cada par
+        self.days = days                  # dias desde 1970-01-01
+        self.trips = trips
+        self.volume = volume
+
+
+def build_trip_days(df: pd.DataFrame) -> TripDays:
+    codes, labels = pd.factorize(df['Destino'], sort=True)
+    days = df['Data_Hora'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    valid = (codes >= 0) & (days > np.iinfo(np.int64).min)
+    codes, days = codes[valid], days[valid]
+    if not len(days):
+        empty = np.zeros(0, dtype=np.int64)
+        return TripDays(np.array([], dtype=object), empty, empty, np.zeros(0))
+    offset = days.min()
+    span = int(days.max() - offset) + 1
+    pairs, inverse = np.unique(codes.astype(np.int64) * span + (days - offset), return_inverse=True)
+    volume = np.bincount(inverse, weights=np.nan_to_num(df['Volume'].to_numpy(dtype=float)[valid]), minlength=len(pairs))
+    return TripDays(np.asarray(labels, dtype=object)[pairs // span], pairs % span + offset,
+                    np.bincount(inverse, minlength=len(pairs)), volume)
+
+
+def get_trip_days(dataset) -> TripDays:
+    """Pares (destino, dia) da versão atual, calculados uma única vez por versão."""
+    return dataset.derive('trip_days', lambda ds: build_trip_days(ds.df))
+
+
+def covering_periods(trip_codes, trip_days, price_codes, start_days, end_days) -> np.ndarray:
+    """
+    Período de preço (posição nos arrays de preço) que vale para cada viagem, ou -1 se nenhum
+    período do destino contém o dia. Entre períodos sobrepostos ou aninhados vale o de início
+    mais recente que contém o dia. Códigos de destino e dias (desde 1970-01-01) são inteiros.
+
+    Um np.searchsorted da chave (destino, dia) na chave ordenada (destino, início) dá o último
+    período iniciado; se ele já terminou, a cadeia "período anterior do destino com fim maior"
+    (pilha monotônica, uma passada sobre os preços) pula direto os que terminam antes dele.
+    """
+    result = np.full(len(trip_days), -1, dtype=np.int64)
+    if not len(start_days) or not len(trip_days):
+        return result
+    order = np.lexsort((start_days, price_codes))
+    codes, starts, ends = price_codes[order], start_days[order], end_days[order]
+    fallback = np.full(len(order), -1, dtype=np.int64)
+    stack = []
+    for position in range(len(order)):
+        if position and codes[position] != codes[position - 1]:
+            stack = []
+        while stack and ends[stack[-1]] <= ends[position]:
+            stack.pop()
+        fallback[position] = stack[-1] if stack else -1
+        stack.append(position)
+
+    all_days = np.concatenate([trip_days, starts, ends])
+    offset = int(all_days.min())
+    span = int(all_days.max()) - offset + 1
+    candidate = np.searchsorted(codes * span + (starts - offset), trip_codes * span + (trip_days - offset), side='right') - 1
+    safe = np.clip(candidate, 0, None)
+    candidate = np.where((candidate >= 0) & (codes[safe] == trip_codes), candidate, -1)
+    pending = np.flatnonzero(candidate >= 0)
+    while len(pending):
+        current = candidate[pending]
+        covers = ends[current] >= trip_days[pending]
+        result[pending[covers]] = order[current[covers]]
+        candidate[pending[~covers]] = fallback[current[~covers]]
+        pending = pending[~covers][fallback[current[~covers]] >= 0]
+    return result
+
+
+def lookup_interval_prices(destinos: pd.Series, days: np.ndarray, df_precificacao: pd.DataFrame) -> np.ndarray:
+    """
+    Preço por tonelada de cada viagem na carga (logic/data_processing.prepare_data): o período
+    de preço do destino que contém o dia da viagem (0 se não houver); em períodos sobrepostos
+    ou aninhados, o de início mais recente que contém o dia (covering_periods, a mesma regra
+    da análise de cobertura). Uma linha de saída por viagem.
+    `df_precificacao`: colunas destino, start_date, end_date e valor_bruto (numérico);
+    `days` são os dias das viagens em datetime64[D].
+    """
+    prices = np.zeros(len(destinos))
+    pricing = df_precificacao.dropna(subset=['destino', 'start_date', 'end_date'])
+    if pricing.empty or len(destinos) == 0:
+        return prices
+
+    destination_index = pd.Index(pricing['destino'].unique())
+    trip_codes = destination_index.get_indexer(destinos)  # -1: destino sem nenhum preço
+    price_codes = destination_index.get_indexer(pricing['destino'])
+    trip_days = days.astype('datetime64[D]').astype(np.int64)
+    start_days = pd.to_datetime(pricing['start_date']).to_numpy().astype('datetime64[D]').astype(np.int64)
+    end_days = pd.to_datetime(pricing['end_date']).to_numpy().astype('datetime64[D]').astype(np.int64)
+
+    period = covering_periods(trip_codes, trip_days, price_codes, start_days, end_days)
+    valid = period >= 0
+    values = pd.to_numeric(pricing['valor_bruto'], errors='coerce').fillna(0).to_numpy(dtype=float)
+    prices[valid] = values[period[valid]]
+    return prices
+
+
+def _day_label(day) -> str:
+    return (_EPOCH + timedelta(days=int(day))).strftime('%d/%m/%Y')
+
+
+def pricing_coverage(trip_days: TripDays, df_pricing: pd.DataFrame) -> dict:
+    """
+    Buracos e sobreposições da precificação para os pares (destino, dia) das viagens.
+    `df_pricing`: colunas destination, start_date, end_date (como em database.get_all_pricing()).
+    """
+    pricing = df_pricing.dropna(subset=['destination', 'start_date', 'end_date'])
+    destinations = pd.Index(np.unique(np.concatenate([
+        trip_days.destinations.astype(str),
+        pricing['destination'].astype(str).str.strip().str.upper().to_numpy(dtype=str),
+    ])))
+    trip_codes = destinations.get_indexer(trip_days.destinations.astype(str))
+    price_codes = destinations.get_indexer(pricing['destination'].astype(str).str.strip().str.upper())
+    start_days = pd.to_datetime(pricing['start_date']).to_numpy().astype('datetime64[D]').astype(np.int64)
+    end_days = pd.to_datetime(pricing['end_date']).to_numpy().astype('datetime64[D]').astype(np.int64)
+
+    all_days = np.concatenate([trip_days.days, start_days, end_days])
+    offset = int(all_days.min()) - 1 if len(all_days) else 0
+    span = int(all_days.max()) - offset + 2 if len(all_days) else 1
+
+    # Períodos ordenados por (destino, início); fim acumulado = união dos períodos até aqui
+    order = np.lexsort((start_days, price_codes))
+    sorted_codes, sorted_starts, sorted_ends = price_codes[order], start_days[order], end_days[order]
+    start_keys = sorted_codes * span + (sorted_starts - offset)
+    reach_keys = np.maximum.accumulate(sorted_codes * span + (sorted_ends - offset)) if len(order) else start_keys
+    reach = reach_keys - sorted_codes * span + offset           # maior fim visto no destino (ou antes dele)
+    same_destination = np.r_[False, sorted_codes[1:] == sorted_codes[:-1]]
+    previous_reach = np.r_[np.iinfo(np.int64).min, reach[:-1]]
+    # Novo bloco de cobertura contínua quando o período começa depois do fim acumulado + 1
+    new_block = ~same_destination | (sorted_starts > previous_reach + 1)
+    block = np.cumsum(new_block) - 1
+
+    # Cada par (destino, dia): coberto se a regra da carga acha um período de preço para ele;
+    # o último período com início <= dia no mesmo destino diz em qual buraco o par descoberto cai
+    covered = covering_periods(trip_codes, trip_days.days, price_codes, start_days, end_days) >= 0
+    trip_keys = trip_codes * span + (trip_days.days - offset)
+    candidate = np.searchsorted(start_keys, trip_keys, side='right') - 1
+    if len(order):
+        safe = np.clip(candidate, 0, None)
+        has_candidate = (candidate >= 0) & (sorted_codes[safe] == trip_codes)
+        candidate_block = block[safe]
+    else:
+        has_candidate = np.zeros(len(trip_keys), dtype=bool)
+        candidate_block = np.zeros(len(trip_keys), dtype=np.int64)
+
+    # Buraco de cada par descoberto: (destino, bloco anterior ou -1 antes do primeiro período)
+    uncovered = np.flatnonzero(~covered)
+    gap_block = np.where(has_candidate[uncovered], candidate_block[uncovered], -1)
+    gap_keys = trip_codes[uncovered].astype(np.int64) * (len(order) + 1) + (gap_block + 1)
+    gap_ids, gap_inverse = np.unique(gap_keys, return_inverse=True)
+    gaps = pd.DataFrame({
+        'Destino': destinations[gap_ids // (len(order) + 1)],
+        'Viagens': np.bincount(gap_inverse, weights=trip_days.trips[uncovered], minlength=len(gap_ids)).astype(int),
+        'Volume': np.bincount(gap_inverse, weights=trip_days.volume[uncovered], minlength=len(gap_ids)),
+    })
+    first_day = np.full(len(gap_ids), np.iinfo(np.int64).max)
+    last_day = np.full(len(gap_ids), np.iinfo(np.int64).min)
+    np.minimum.at(first_day, gap_inverse, trip_days.days[uncovered])
+    np.maximum.at(last_day, gap_inverse, trip_days.days[uncovered])
+
+    # Limites do buraco pela precificação: fim do bloco anterior + 1 até início do bloco seguinte - 1
+    n_blocks = int(block[-1]) + 1 if len(block) else 0
+    block_end = np.zeros(n_blocks, dtype=np.int64)
+    block_start = np.zeros(n_blocks, dtype=np.int64)
+    block_code = np.zeros(n_blocks, dtype=np.int64)
+    np.maximum.at(block_end, block, reach)
+    block_start[block[new_block]] = sorted_starts[new_block]
+    block_code[block[new_block]] = sorted_codes[new_block]
+    gap_block_ids = gap_ids % (len(order) + 1) - 1
+    gap_codes = gap_ids // (len(order) + 1)
+    # Bloco seguinte ao buraco: o próximo bloco, ou o primeiro do destino para buracos antes do primeiro período
+    next_block = np.where(gap_block_ids >= 0, gap_block_ids + 1, np.searchsorted(block_code, gap_codes, side='left'))
+    has_next = next_block < n_blocks
+    has_next[has_next] = block_code[next_block[has_next]] == gap_codes[has_next]
+    gaps['Sem Preço Desde'] = [_day_label(block_end[b] + 1) if b >= 0 else '-' for b in gap_block_ids]
+    gaps['Sem Preço Até'] = [_day_label(block_start[b] - 1) if ok else '-' for b, ok in zip(next_block, has_next)]
+    gaps['Primeira Viagem'] = [_day_label(day) for day in first_day]
+    gaps['Última Viagem'] = [_day_label(day) for day in last_day]
+    gaps['Sem Nenhum Preço'] = ~np.isin(gap_codes, price_codes)
+    gaps = gaps.sort_values('Volume', ascending=False).reset_index(drop=True)
+
+    # Sobreposições e períodos encostados: comparados à união dos períodos anteriores do destino
+    touching = same_destination & (sorted_starts <= previous_reach + 1)
+    positions = np.flatnonzero(touching)
+    pricing_rows = pricing.iloc[order[positions]]
+    overlaps = pd.DataFrame({
+        'Destino': destinations[sorted_codes[positions]],
+        'Início': [_day_label(day) for day in sorted_starts[positions]],
+        'Fim': [_day_label(day) for day in sorted_ends[positions]],
+        'Cobertura Anterior Até': [_day_label(day) for day in previous_reach[positions]],
+        'Tipo': np.where(sorted_starts[positions] <= previous_reach[positions], 'Sobreposição', 'Adjacente'),
+    })
+    if 'id' in pricing_rows.columns:
+        overlaps.insert(0, 'ID', pricing_rows['id'].to_numpy())
+
+    total_trips = int(trip_days.trips.sum())
+    return {
+        'gaps': gaps,
+        'overlaps': overlaps,
+        'trips': total_trips,
+        'uncovered_trips': int(gaps['Viagens'].sum()),
+        'uncovered_volume': float(gaps['Volume'].sum()),
+        'uncovered_share': float(gaps['Viagens'].sum() / total_trips) if total_trips else 0.0,
+    }
+
+
+def pricing_frame(pricing_rows) -> pd.DataFrame:
+    """Linhas de database.get_all_pricing() como DataFrame (com as colunas mesmo sem linhas)."""
+    return pd.DataFrame([dict(row) for row in pricing_rows],
+                        columns=['id', 'destination', 'price_per_ton', 'start_date', 'end_date'])
+
+
+def get_pricing_coverage(dataset, pricing_rows) -> dict:
+    """Cobertura da precificação cadastrada para as viagens da versão atual do dataset."""
+    return pricing_coverage(get_trip_days(dataset), pricing_frame(pricing_rows))
@@ -0,0 +1,162 @@
+# logic/resample.py
+"""
+Granularidade do eixo do tempo (hora, dia, semana, mês) para as séries e a matriz.
+
+Séries (volume, receita, viagens): o índice de somas acumuladas por hora (logic/time_index.py)
+guarda, por versão do dataset, as fronteiras de cada granularidade em horas; a série de um
+período em qualquer granularidade é a diferença do acumulado nas fronteiras recortadas ao
+período. Trocar a granularidade ou o período não toca nas viagens.
+
+Matriz (período x TAG): as viagens são reduzidas uma vez por versão (e por filtros, no cache
+de resultados) a células distintas (hora, TAG, placa) com volume; cada granularidade agrupa
+essas células (códigos inteiros, np.unique/np.bincount) e o resultado também fica no cache.
+Trocar a granularidade com filtros ativos só reagrupa as células, sem voltar às viagens.
+"""
+import numpy as np
+import pandas as pd
+
+from logic.cache import get_result_cache
+from logic.filters import filters_key, get_filtered_frame
+from logic.serialization import frame_to_bytes, frame_from_bytes
+
+# Granularidades: chave -> (rótulo no seletor, coluna do período na matriz)
+GRAINS = {
+    'hour': ('Hora', 'Hora'),
+    'day': ('Dia', 'Data_Apenas'),
+    'week': ('Semana', 'Semana'),
+    'month': ('Mês', 'Mês'),
+}
+DEFAULT_GRAIN = 'day'
+_EPOCH_HOUR = np.datetime64('1970-01-01T00', 'h')
+_EPOCH_DAY = np.datetime64('1970-01-01', 'D')
+
+
+def bucket_codes(hours: np.ndarray, grain) -> np.ndarray:
+    """Código do período de cada hora (horas desde 1970-01-01) na granularidade pedida."""
+    if grain == 'hour':
+        return hours
+    days = hours // 24
+    if grain == 'day':
+        return days
+    if grain == 'week':
+        return (days + 3) // 7  # 1970-01-01 foi uma quinta-feira: semanas de segunda a domingo
+    return (_EPOCH_DAY + days).astype('datetime64[M]').astype(np.int64)
+
+
+def bucket_labels(codes: np.ndarray, grain) -> np.ndarray:
+    """Rótulos dos períodos: datas para dia, data da segunda-feira para semana, AAAA-MM para mês."""
+    if grain == 'hour':
+        return (_EPOCH_HOUR + codes).astype('datetime64[h]').astype(object)
+    if grain == 'day':
+        return (_EPOCH_DAY + codes).astype('datetime64[D]').astype(object)
+    if grain == 'week':
+        return (_EPOCH_DAY + codes * 7 - 3).astype('datetime64[D]').astype(object)
+    return codes.astype('datetime64[M]').astype(str).astype(object)
+
+
+def grain_boundaries(first_day: int, n_days: int, grain):
+    """
+    (fronteiras, códigos): posições (em horas a partir de first_day) onde cada período começa,
+    mais a posição final, e o código de cada período (ver bucket_codes).
+    """
+    hours = first_day * 24 + np.arange(n_days * 24, dtype=np.int64)
+    codes = bucket_codes(hours, grain)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.zeros(0, dtype=np.int64)
+    return np.r_[starts, n_days * 24], codes[starts]
+
+
+# --- Matriz período x TAG ---
+
+class MatrixCells:
+    """Células distintas (hora, TAG, placa) com o volume somado: base da matriz em qualquer granularidade."""
+
+    def __init__(self, hours, tag_codes, plate_codes, volume, tags):
+        self.hours = hours            # horas desde 1970-01-01
+        self.tag_codes = tag_codes    # códigos de TAG (rótulos em tags, ordenados)
+        self.plate_codes = plate_codes  # -1 = sem placa
+        self.volume = volume
+        self.tags = tags
+
+
+def build_matrix_cells(dff: pd.DataFrame) -> MatrixCells:
+    """Reduz as viagens a células (hora, TAG, placa); viagens sem TAG ficam de fora, como no groupby."""
+    tag_codes, tags = pd.factorize(dff['TAG'], sort=True)
+    plate_codes, _ = pd.factorize(dff['Placa'])
+    hours = (dff['Data_Hora'].to_numpy().astype('datetime64[h]') - _EPOCH_HOUR).astype(np.int64)
+    keep = (tag_codes >= 0) & (hours > np.iinfo(np.int64).min)
+    hours, tag_codes, plate_codes = hours[keep], tag_codes[keep].astype(np.int64), plate_codes[keep].astype(np.int64)
+    volume = np.nan_to_num(dff['Volume'].to_numpy(dtype=float)[keep])
+    if not len(hours):
+        empty = np.zeros(0, dtype=np.int64)
+        return MatrixCells(empty, empty, empty, np.zeros(0), pd.Index(tags))
+
+    n_plates = int(plate_codes.max()) + 2
+    key = ((hours - hours.min()) * len(tags) + tag_codes) * n_plates + (plate_codes + 1)
+    cells, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+    return MatrixCells(hours[first], tag_codes[first], plate_codes[first],
+                       np.bincount(inverse, weights=volume, minlength=len(cells)), pd.Index(tags))
+
+
+def matrix_from_cells(cells: MatrixCells, grain=DEFAULT_GRAIN) -> pd.DataFrame:
+    """Matriz período x TAG: volume total e veículos (placas) distintos, ordenada por período e TAG."""
+    period_column = GRAINS[grain][1]
+    if not len(cells.hours):
+        return pd.DataFrame()
+    buckets = bucket_codes(cells.hours, grain)
+    offset = int(buckets.min())
+    n_plates = int(cells.plate_codes.max()) + 2
+    # Uma única ordenação: pares (período x TAG, placa) distintos; os grupos são trechos contíguos
+    pair_key = ((buckets - offset) * len(cells.tags) + cells.tag_codes) * n_plates + (cells.plate_codes + 1)
+    pairs, inverse = np.unique(pair_key, return_inverse=True)
+    pair_groups = pairs // n_plates
+    starts = np.flatnonzero(np.r_[True, pair_groups[1:] != pair_groups[:-1]])
+    group_of_pair = np.cumsum(np.r_[False, pair_groups[1:] != pair_groups[:-1]])
+    groups = pair_groups[starts]
+    pair_volume = np.bincount(inverse, weights=cells.volume, minlength=len(pairs))
+    return pd.DataFrame({
+        period_column: bucket_labels(groups // len(cells.tags) + offset, grain),
+        'TAG': np.asarray(cells.tags, dtype=object)[groups % len(cells.tags)],
+        'Volume_Total': np.bincount(group_of_pair, weights=pair_volume, minlength=len(groups)),
+        # Veículos (placas) distintos: pares com placa em cada grupo
+        'N_Viagens': np.bincount(group_of_pair, weights=pairs % n_plates > 0, minlength=len(groups)).astype(np.int64),
+    })
+
+
+def cells_to_bytes(cells: MatrixCells) -> bytes:
+    # TAGs como categoria (códigos + rótulos): o formato colunar preserva os dois
+    return frame_to_bytes(pd.DataFrame({
+        'hours': cells.hours,
+        'tag': pd.Categorical.from_codes(cells.tag_codes, categories=cells.tags),
+        'plate_codes': cells.plate_codes,
+        'volume': cells.volume,
+    }))
+
+
+def cells_from_bytes(raw: bytes) -> MatrixCells:
+    frame = frame_from_bytes(raw)
+    tag = frame['tag'].cat
+    return MatrixCells(frame['hours'].to_numpy(np.int64), tag.codes.to_numpy(np.int64),
+                       frame['plate_codes'].to_numpy(np.int64), frame['volume'].to_numpy(float), pd.Index(tag.categories))
+
+
+def get_matrix_cells(dataset, filters) -> MatrixCells:
+    """
+    Células da matriz: derivadas uma vez por versão sem filtros; com filtros, calculadas das
+    linhas filtradas uma vez por (versão, filtros) e guardadas no cache de resultados.
+    """
+    if not any(filters_key(filters)):
+        return dataset.derive('matrix_cells', lambda ds: build_matrix_cells(ds.df))
+    return get_result_cache().get_or_compute(
+        'matrix_cells', dataset.version, filters_key(filters),
+        lambda: build_matrix_cells(get_filtered_frame(dataset, filters)),
+        dumps=cells_to_bytes, loads=cells_from_bytes
+    )
+
+
+def matrix_table(dataset, filters, grain=DEFAULT_GRAIN) -> pd.DataFrame:
+    """Matriz da granularidade pedida para os filtros, guardada no cache de resultados."""
+    return get_result_cache().get_or_compute(
+        'matrix', dataset.version, (grain,) + filters_key(filters),
+        lambda: matrix_from_cells(get_matrix_cells(dataset, filters), grain),
+        dumps=frame_to_bytes, loads=frame_from_bytes
+    )
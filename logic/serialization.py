@@ -0,0 +1,78 @@
+# logic/serialization.py
+"""
+Formato binário colunar para DataFrames que atravessam fronteiras (navegador, cache
+compartilhado entre workers, respostas de API).
+
+Usa Arrow IPC (stream) comprimido com zstd: os dtypes voltam exatamente como saíram
+(datetime64, inteiros, strings, datas Python em 'Data_Apenas'), sem o re-parse manual de
+datas que o caminho to_json/read_json exigia. pyarrow está em requirements.txt; o JSON
+orient='table' fica só como último recurso se ele faltar, e NÃO preserva os tipos
+(Data_Apenas volta como texto, inteiros mudam de dtype): filtros de data e a versão do
+dataset deixam de bater entre workers.
+
+    encode_frame(df) -> str   (base64, pronto para dcc.Store/JSON)
+    decode_frame(s)  -> DataFrame
+    frame_to_bytes / frame_from_bytes: a mesma coisa em bytes (cache, arquivos).
+"""
+import base64
+import io
+import os
+
+import pandas as pd
+
+# Codec do Arrow IPC: 'zstd' (menor), 'lz4' (mais rápido) ou 'none'
+FRAME_COMPRESSION = os.getenv("FRAME_COMPRESSION", "zstd").lower()
+
+_ARROW_MAGIC = b'ARW1'
+_JSON_MAGIC = b'JSN1'
+
+_pyarrow = None
+
+
+def _arrow():
+    """Importa pyarrow sob demanda (pesado no import); None se não estiver instalado."""
+    global _pyarrow
+    if _pyarrow is None:
+        try:
+            import pyarrow
+            import pyarrow.ipc  # noqa: F401
+            _pyarrow = pyarrow
+        except ImportError:
+            print("AVISO: pyarrow não instalado (ver requirements.txt); DataFrames serializados em JSON, sem preservar os tipos.")
+            _pyarrow = False
+    return _pyarrow or None
+
+
+def frame_to_bytes(df: pd.DataFrame, compression=FRAME_COMPRESSION) -> bytes:
+    pa = _arrow()
+    if pa is None:
+        return _JSON_MAGIC + df.to_json(orient='table', date_format='iso', index=False).encode()
+
+    codec = None if compression == 'none' or not pa.Codec.is_available(compression) else compression
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema, options=pa.ipc.IpcWriteOptions(compression=codec)) as writer:
+        writer.write_table(table)
+    return _ARROW_MAGIC + sink.getvalue().to_pybytes()
+
+
+def frame_from_bytes(raw: bytes) -> pd.DataFrame:
+    magic, body = raw[:4], raw[4:]
+    if magic == _ARROW_MAGIC:
+        pa = _arrow()
+        if pa is None:
+            raise RuntimeError("DataFrame em formato Arrow, mas pyarrow não está instalado.")
+        return pa.ipc.open_stream(pa.py_buffer(body)).read_all().to_pandas()
+    if magic == _JSON_MAGIC:
+        return pd.read_json(io.StringIO(body.decode()), orient='table')
+    raise ValueError("Formato de DataFrame serializado desconhecido.")
+
+
+def encode_frame(df: pd.DataFrame, compression=FRAME_COMPRESSION) -> str:
+    """DataFrame -> texto base64 (seguro para dcc.Store e JSON)."""
+    return base64.b64encode(frame_to_bytes(df, compression)).decode('ascii')
+
+
+def decode_frame(text: str) -> pd.DataFrame:
+    """Inverso de encode_frame(), com os dtypes originais."""
+    return frame_from_bytes(base64.b64decode(text))
@@ -0,0 +1,204 @@
+# logic/shifts.py
+"""
+Turnos por cliente e atribuição vetorizada do turno de cada viagem.
+
+Os turnos ficam cadastrados no banco (tabela shifts) por cliente, com início e fim em
+horário do dia; um turno cujo fim é anterior ao início atravessa a meia-noite e vira
+dois trechos ([início, 24h) e [0h, fim)). Cada cliente com turnos cadastrados ganha uma
+"escala"; a escala 0 é a padrão (DEFAULT_SHIFTS), usada pelos destinos sem cliente ou
+por clientes sem turnos. Horários não cobertos pela escala recebem OFF_SHIFT_LABEL.
+
+Todas as escalas viram um único vetor ordenado de fronteiras com a chave
+escala x 1440 + minuto de início. Para as viagens: destino -> cliente -> escala por
+pd.Index.get_indexer, minuto do dia pela coluna Data_Hora e um único np.searchsorted
+sobre as fronteiras. Re-rotular o histórico inteiro é uma passada vetorizada, sem
+recarregar as fontes (ver logic/dataset.py:reassign_shifts).
+
+Cada trecho guarda também quanto tempo depois do início do turno ele começa e a duração
+do turno: a utilização da frota (logic/fleet_efficiency.py) identifica cada turno
+trabalhado pelo minuto em que ele começou e usa a duração cadastrada, e o congestionamento
+(logic/congestion.py) usa os horários de troca da escala de cada destino.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import database
+from logic.clients import fetch_client_frame
+
+# Escala padrão: a regra histórica do painel (1º turno 06h-18h, 2º turno 18h-06h)
+DEFAULT_SHIFTS = [
+    ('1º Turno', '06:00', '18:00'),
+    ('2º Turno', '18:00', '06:00'),
+]
+# Rótulo dos horários que não caem em nenhum turno cadastrado do cliente
+OFF_SHIFT_LABEL = 'Fora de Turno'
+SHIFT_COLUMNS = ['id', 'client_name', 'shift_name', 'start_time', 'end_time']
+
+_MINUTES_PER_DAY = 24 * 60
+
+
+def parse_minute(value) -> int:
+    """Minuto do dia de 'HH:MM' (ou 'HH:MM:SS', datetime.time)."""
+    if hasattr(value, 'hour'):
+        return value.hour * 60 + value.minute
+    hours, minutes = str(value).strip().split(':')[:2]
+    minute = int(hours) * 60 + int(minutes)
+    if not 0 <= minute < _MINUTES_PER_DAY:
+        raise ValueError(f"Horário inválido: {value}")
+    return minute
+
+
+def shift_segments(start, end):
+    """Trechos [início, fim) em minutos do dia; turnos que atravessam a meia-noite viram dois."""
+    start, end = parse_minute(start), parse_minute(end)
+    if start < end:
+        return [(start, end)]
+    if start == end:  # turno de 24h
+        return [(start, _MINUTES_PER_DAY)] + ([(0, start)] if start else [])
+    return [(start, _MINUTES_PER_DAY)] + ([(0, end)] if end else [])
+
+
+def find_overlap(shifts, start, end):
+    """Nome do primeiro turno de `shifts` [(nome, início, fim)] que se sobrepõe a [start, end), ou None."""
+    new_segments = shift_segments(start, end)
+    for name, other_start, other_end in shifts:
+        for lo, hi in shift_segments(other_start, other_end):
+            if any(lo < new_hi and new_lo < hi for new_lo, new_hi in new_segments):
+                return name
+    return None
+
+
+def shift_minutes(start, end) -> int:
+    """Duração do turno em minutos (24h quando início e fim coincidem)."""
+    return (parse_minute(end) - parse_minute(start)) % _MINUTES_PER_DAY or _MINUTES_PER_DAY
+
+
+class ShiftTable:
+    """Fronteiras ordenadas de todas as escalas e o mapa destino -> escala."""
+
+    def __init__(self, keys, label_codes, labels, destinations, destination_schedules,
+                 segment_offsets=None, segment_minutes=None, schedule_changes=None):
+        self.keys = keys                                    # escala x 1440 + minuto de início
+        self.label_codes = label_codes                      # rótulo (índice em labels) de cada trecho
+        self.labels = np.asarray(labels, dtype=object)
+        self.destinations = pd.Index(destinations)          # destinos com escala própria
+        self.destination_schedules = destination_schedules  # escala de cada destino acima
+        # Minutos entre o início do turno e o início do trecho (> 0 no trecho depois da meia-noite)
+        self.segment_offsets = segment_offsets if segment_offsets is not None else np.zeros(len(keys), dtype=np.int64)
+        # Duração do turno de cada trecho, em minutos (0 nos trechos fora de turno)
+        self.segment_minutes = segment_minutes if segment_minutes is not None else np.zeros(len(keys), dtype=np.int64)
+        self.schedule_changes = schedule_changes or {}      # escala -> minutos do dia com troca de turno
+
+    def schedules_for(self, destinos) -> np.ndarray:
+        positions = self.destinations.get_indexer(destinos)
+        return np.where(positions >= 0, self.destination_schedules[positions], 0)
+
+    def trip_schedules(self, destinos) -> np.ndarray:
+        """Escala de cada viagem (alinhada às linhas), fatorando os destinos uma vez."""
+        if not len(self.destinations):
+            return np.zeros(len(destinos), dtype=np.int64)
+        codes, uniques = pd.factorize(destinos)
+        schedules = self.schedules_for(uniques)[codes]
+        schedules[codes < 0] = 0
+        return schedules
+
+    def locate(self, schedules, minutes) -> np.ndarray:
+        """Trecho (posição nas fronteiras) de cada viagem, a partir da escala e do minuto do dia."""
+        return np.searchsorted(self.keys, schedules * _MINUTES_PER_DAY + minutes % _MINUTES_PER_DAY, side='right') - 1
+
+    @property
+    def off_shift_code(self) -> int:
+        return int(np.flatnonzero(self.labels == OFF_SHIFT_LABEL)[0])
+
+
+def _schedule_rows(schedule, shifts, label_positions):
+    """
+    (chave, código do rótulo, deslocamento desde o início do turno, duração do turno) dos
+    trechos de uma escala, com as lacunas em OFF_SHIFT_LABEL.
+    """
+    segments = sorted(
+        (lo, hi, label_positions[name], (lo - parse_minute(start)) % _MINUTES_PER_DAY, shift_minutes(start, end))
+        for name, start, end in shifts
+        for lo, hi in shift_segments(start, end)
+    )
+    off_code = label_positions[OFF_SHIFT_LABEL]
+    rows, cursor = [], 0
+    for lo, hi, code, offset, duration in segments:
+        if lo > cursor:
+            rows.append((cursor, off_code, 0, 0))
+        rows.append((lo, code, offset, duration))
+        cursor = max(cursor, hi)
+    if cursor < _MINUTES_PER_DAY or not rows:
+        rows.append((cursor % _MINUTES_PER_DAY, off_code, 0, 0))
+    return [(schedule * _MINUTES_PER_DAY + minute, code, offset, duration) for minute, code, offset, duration in rows]
+
+
+def build_shift_table(df_shifts: pd.DataFrame = None, df_clients: pd.DataFrame = None) -> ShiftTable:
+    """
+    Monta as escalas a partir dos turnos cadastrados (client_name, shift_name, start_time,
+    end_time) e dos clientes (client_name, destination). Sem turnos, só a escala padrão.
+    """
+    schedules = [DEFAULT_SHIFTS]
+    client_schedules = {}
+    if df_shifts is not None and not df_shifts.empty:
+        for client_name, group in df_shifts.groupby('client_name', sort=True):
+            client_schedules[client_name] = len(schedules)
+            schedules.append(list(zip(group['shift_name'], group['start_time'], group['end_time'])))
+
+    labels = list(dict.fromkeys([name for shifts in schedules for name, _, _ in shifts] + [OFF_SHIFT_LABEL]))
+    label_positions = {label: position for position, label in enumerate(labels)}
+    rows = [row for schedule, shifts in enumerate(schedules) for row in _schedule_rows(schedule, shifts, label_positions)]
+    keys, label_codes, segment_offsets, segment_minutes = (np.array(column, dtype=np.int64) for column in zip(*rows))
+    # Trocas de turno de cada escala: inícios e fins dos turnos, em minutos do dia
+    schedule_changes = {
+        schedule: np.unique([parse_minute(value) for _, start, end in shifts for value in (start, end)])
+        for schedule, shifts in enumerate(schedules)
+    }
+
+    destinations, destination_schedules = [], []
+    if client_schedules and df_clients is not None and not df_clients.empty:
+        mapped = df_clients[df_clients['client_name'].isin(list(client_schedules))]
+        # Mesma regra de clean_text_column, aplicada à coluna Destino na carga (prepare_data)
+        mapped_destinations = mapped['destination'].astype(str).str.strip().str.upper()
+        destinations = mapped_destinations.tolist()
+        destination_schedules = mapped['client_name'].map(client_schedules).tolist()
+    return ShiftTable(keys, label_codes, labels, destinations, np.array(destination_schedules, dtype=np.int64),
+                      segment_offsets, segment_minutes, schedule_changes)
+
+
+def assign_shifts(destinos, data_hora, table: ShiftTable = None) -> np.ndarray:
+    """Turno de cada viagem (array de rótulos alinhado às linhas): uma busca binária sobre as fronteiras."""
+    table = table or build_shift_table()
+    minutes = np.asarray(data_hora).astype('datetime64[m]').astype(np.int64)
+    positions = table.locate(table.trip_schedules(destinos), minutes)
+    return table.labels[table.label_codes[positions]]
+
+
+def fetch_shift_frames(local_dir=None):
+    """
+    (turnos, clientes) cadastrados: do banco, ou de shifts.csv/clients.csv em LOCAL_DATA_DIR.
+    Falhas não interrompem a carga: os dados ficam com a escala padrão.
+    """
+    local_dir = local_dir or os.getenv("LOCAL_DATA_DIR")
+    df_clients = fetch_client_frame(local_dir)
+    empty_shifts = pd.DataFrame(columns=SHIFT_COLUMNS)
+    try:
+        if local_dir:
+            shifts_path = os.path.join(local_dir, 'shifts.csv')
+            return (pd.read_csv(shifts_path, dtype=str) if os.path.exists(shifts_path) else empty_shifts), df_clients
+        return pd.DataFrame([dict(row) for row in database.get_all_shifts()], columns=SHIFT_COLUMNS), df_clients
+    except Exception as e:
+        print(f"AVISO: turnos cadastrados indisponíveis ({e}); usando a escala padrão.")
+        return empty_shifts, df_clients
+
+
+def load_shift_table(local_dir=None) -> ShiftTable:
+    """Escalas atuais (banco ou LOCAL_DATA_DIR)."""
+    return build_shift_table(*fetch_shift_frames(local_dir))
+
+
+def get_shift_table(dataset) -> ShiftTable:
+    """Escalas da versão atual (a coluna Turno foi rotulada com elas), lidas uma vez por versão."""
+    return dataset.derive('shift_table', lambda ds: load_shift_table())
@@ -0,0 +1,58 @@
+# logic/singleflight.py
+"""
+Coalescência de chamadas idênticas concorrentes ("single-flight").
+
+Se várias threads pedem o mesmo cálculo (mesma chave) ao mesmo tempo, apenas a primeira
+executa; as demais esperam e recebem o mesmo resultado (ou a mesma exceção).
+O resultado é compartilhado entre as threads: quem o recebe não deve modificá-lo.
+"""
+import threading
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, name='singleflight'):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Executa `fn(*args, **kwargs)` uma única vez por chave entre chamadas simultâneas."""
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    def in_flight(self):
+        """Quantidade de chaves sendo calculadas neste momento."""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,104 @@
+# logic/sketches.py
+"""
+Contagem de placas distintas (veículos únicos) que pode ser combinada entre células.
+
+Contagens distintas não se somam: dois dias com 10 veículos cada podem ter de 10 a 20
+veículos no total. Por isso cada célula do cubo (logic/cube.py) guarda um resumo do
+conjunto de placas, e o total de qualquer recorte é a união dos resumos das células:
+
+  - PlateBitsets (exato): um bit por placa. Usado enquanto o universo de placas é pequeno
+    (até BITSET_MAX_PLATES); a união é um OR e a contagem, os bits ligados.
+  - HyperLogLog (aproximado): 2**HLL_PRECISION registradores por célula; a união é o
+    máximo por registrador. Erro padrão ~1.04/sqrt(2**HLL_PRECISION) (~6,5% com 8).
+
+Ambos respondem count(mask) para uma máscara booleana de células.
+"""
+import numpy as np
+import pandas as pd
+
+# Universo de placas até o qual a contagem é exata (bitset); acima, HyperLogLog
+BITSET_MAX_PLATES = 2048
+# Registradores por célula do HyperLogLog = 2**HLL_PRECISION
+HLL_PRECISION = 8
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Número de bits significativos de cada uint64 (0 para 0), sem passar por float."""
+    values = values.astype(np.uint64)
+    length = np.zeros(len(values), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >= np.uint64(1 << shift)
+        length += high * shift
+        values = np.where(high, values >> np.uint64(shift), values)
+    return length + (values > 0)
+
+
+def _popcount(words: np.ndarray) -> int:
+    return int(np.unpackbits(np.ascontiguousarray(words).view(np.uint8)).sum())
+
+
+class PlateBitsets:
+    """Conjunto exato de placas por célula: (células, palavras de 64 bits)."""
+    exact = True
+
+    def __init__(self, bits: np.ndarray):
+        self.bits = bits
+
+    def count(self, mask) -> int:
+        selected = self.bits[mask]
+        return _popcount(np.bitwise_or.reduce(selected, axis=0)) if len(selected) else 0
+
+    @classmethod
+    def build(cls, cells, plates, n_cells, n_plates):
+        n_words = max((n_plates + 63) // 64, 1)
+        bits = np.zeros(n_cells * n_words, dtype=np.uint64)
+        # Pares (célula, placa) distintos: somar as potências de 2 equivale ao OR
+        pairs = np.unique(cells.astype(np.int64) * n_plates + plates)
+        pair_cells, pair_plates = pairs // n_plates, pairs % n_plates
+        np.add.at(bits, pair_cells * n_words + (pair_plates >> 6), np.left_shift(np.uint64(1), (pair_plates & 63).astype(np.uint64)))
+        return cls(bits.reshape(n_cells, n_words))
+
+
+class HyperLogLog:
+    """Registradores HyperLogLog por célula: (células, 2**precision) uint8."""
+    exact = False
+
+    def __init__(self, registers: np.ndarray, precision=HLL_PRECISION):
+        self.registers = registers
+        self.precision = precision
+
+    def count(self, mask) -> int:
+        selected = self.registers[mask]
+        if not len(selected):
+            return 0
+        merged = selected.max(axis=0).astype(float)
+        m = len(merged)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(2.0 ** -merged)
+        zeros = int(np.sum(merged == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # correção para cardinalidades pequenas
+        return int(round(estimate))
+
+    @classmethod
+    def build(cls, cells, plates, plate_labels, n_cells, precision=HLL_PRECISION):
+        hashes = pd.util.hash_array(np.asarray(plate_labels, dtype=object))[plates]
+        width = 64 - precision
+        register = (hashes >> np.uint64(width)).astype(np.int64)
+        rest = hashes & np.uint64((1 << width) - 1)
+        rank = (width - _bit_length(rest) + 1).astype(np.uint8)
+        registers = np.zeros(n_cells << precision, dtype=np.uint8)
+        np.maximum.at(registers, (cells.astype(np.int64) << precision) + register, rank)
+        return cls(registers.reshape(n_cells, 1 << precision), precision)
+
+
+def build_plate_sketch(cells, plates, plate_labels, n_cells):
+    """
+    Resumo das placas por célula. `cells`: célula de cada linha; `plates`: código da placa
+    (pd.factorize; linhas sem placa, código -1, ficam de fora).
+    """
+    valid = plates >= 0
+    cells, plates = cells[valid], plates[valid]
+    if len(plate_labels) <= BITSET_MAX_PLATES:
+        return PlateBitsets.build(cells, plates, n_cells, len(plate_labels))
+    return HyperLogLog.build(cells, plates, plate_labels, n_cells)
+
@@ -0,0 +1,172 @@
+# logic/time_index.py
+"""
+Índice de somas acumuladas no tempo (prefix sums), por versão do dataset.
+
+Para cada hora do histórico guarda o acumulado de volume, receita e viagens desde o
+primeiro dia. O total de qualquer período é a diferença de duas posições do acumulado,
+sem refiltrar nem re-somar linhas; comparações ("esta semana vs a anterior", "este mês
+vs o mesmo mês do ano passado") custam quatro consultas. As horas começam à meia-noite
+do primeiro dia, então o acumulado por dia é o mesmo vetor lido de 24 em 24 posições.
+
+Sem seleção de empresa/destino/material/placa, o índice é derivado do dataset inteiro;
+com seleção, é calculado sobre as linhas filtradas (sem o período) e guardado no cache
+de resultados, já que a comparação precisa enxergar fora do período filtrado.
+Em modo arquivo (logic/archive.py), períodos anteriores à janela quente saem do arquivo.
+
+O mesmo acumulado serve as séries por hora, dia, semana ou mês (logic/resample.py): as
+fronteiras de cada granularidade são calculadas uma vez por índice, e a série de um período
+é a diferença do acumulado nessas fronteiras.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+
+from logic.archive import period_totals
+from logic.cache import get_result_cache, dump_array, load_array
+from logic.filters import filters_key, get_filtered_frame
+from logic.resample import grain_boundaries, bucket_labels
+
+# Medidas acumuladas (colunas do índice)
+MEASURES = ('volume', 'revenue', 'trips')
+# Modos de comparação dos KPIs
+COMPARISON_MODES = {
+    'previous': "Período anterior",
+    'year': "Mesmo período do ano anterior",
+}
+_EPOCH_HOUR = np.datetime64('1970-01-01T00', 'h')
+
+
+class TimeIndex:
+    """Somas acumuladas por hora (e por dia) a partir do primeiro dia do histórico."""
+
+    def __init__(self, first_day: int, hourly: np.ndarray):
+        self.first_day = first_day     # dias desde 1970-01-01
+        self.hourly = hourly           # (horas, medidas): somas de cada hora
+        self.n_days = len(hourly) // 24
+        self.hour_prefix = np.vstack([np.zeros((1, len(MEASURES))), np.cumsum(hourly, axis=0)])
+        self.day_prefix = self.hour_prefix[::24]
+        self._grains = {}  # granularidade -> (fronteiras em horas, códigos dos períodos)
+
+    def _day_position(self, value) -> int:
+        day = (np.datetime64(str(value)[:10], 'D') - np.datetime64('1970-01-01', 'D')).astype(np.int64)
+        return int(min(max(day - self.first_day, 0), self.n_days))
+
+    def totals(self, start_date, end_date) -> dict:
+        """Somas das medidas entre as datas (inclusive), em duas consultas ao acumulado."""
+        lo = self._day_position(start_date)
+        hi = self._day_position(np.datetime64(str(end_date)[:10], 'D') + 1)
+        sums = self.day_prefix[max(hi, lo)] - self.day_prefix[lo]
+        return dict(zip(MEASURES, sums.tolist()))
+
+    def hour_totals(self, start, end) -> dict:
+        """Somas entre dois instantes [start, end) com resolução de hora."""
+        first_hour = self.first_day * 24
+        positions = [(np.datetime64(str(value), 'h') - _EPOCH_HOUR).astype(np.int64) - first_hour for value in (start, end)]
+        lo, hi = (int(min(max(position, 0), len(self.hourly))) for position in positions)
+        sums = self.hour_prefix[max(hi, lo)] - self.hour_prefix[lo]
+        return dict(zip(MEASURES, sums.tolist()))
+
+    def series(self, grain, start_date=None, end_date=None):
+        """
+        (rótulos, somas por medida) dos períodos da granularidade entre as datas (inclusive);
+        períodos nas pontas somam só as horas dentro do intervalo.
+        """
+        if grain not in self._grains:
+            self._grains[grain] = grain_boundaries(self.first_day, self.n_days, grain)
+        boundaries, codes = self._grains[grain]
+        lo = self._day_position(start_date) * 24 if start_date else 0
+        hi = self._day_position(np.datetime64(str(end_date)[:10], 'D') + 1) * 24 if end_date else len(self.hourly)
+        clipped = np.clip(boundaries, lo, max(hi, lo))
+        sums = self.hour_prefix[clipped[1:]] - self.hour_prefix[clipped[:-1]]
+        keep = clipped[1:] > clipped[:-1]
+        return bucket_labels(codes[keep], grain), sums[keep]
+
+    def bounds(self):
+        """(primeiro dia, último dia) do histórico como datetime.date, ou (None, None)."""
+        if not self.n_days:
+            return None, None
+        first = date(1970, 1, 1) + timedelta(days=self.first_day)
+        return first, first + timedelta(days=self.n_days - 1)
+
+    def to_array(self) -> np.ndarray:
+        # Primeira linha leva o dia inicial; as demais são as somas por hora
+        header = np.zeros((1, len(MEASURES)))
+        header[0, 0] = self.first_day
+        return np.vstack([header, self.hourly])
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> 'TimeIndex':
+        return cls(int(array[0, 0]), array[1:])
+
+
+def build_time_index(df) -> TimeIndex:
+    """Soma volume, receita e viagens por hora (np.bincount) sobre o DataFrame preparado."""
+    if df.empty or 'Data_Hora' not in df.columns:
+        return TimeIndex(0, np.zeros((0, len(MEASURES))))
+    hours = (df['Data_Hora'].to_numpy().astype('datetime64[h]') - _EPOCH_HOUR).astype(np.int64)
+    valid = hours >= np.iinfo(np.int64).min + 1  # NaT vira o menor int64
+    hours = hours[valid]
+    if not len(hours):
+        return TimeIndex(0, np.zeros((0, len(MEASURES))))
+    first_day = int(hours.min() // 24)
+    n_hours = (int(hours.max() // 24) - first_day + 1) * 24
+    positions = hours - first_day * 24
+
+    columns = []
+    for column in ('Volume', 'Valor Bruto Total'):
+        weights = df[column].to_numpy(dtype=float)[valid] if column in df.columns else np.zeros(len(positions))
+        columns.append(np.bincount(positions, weights=np.nan_to_num(weights), minlength=n_hours))
+    columns.append(np.bincount(positions, minlength=n_hours).astype(float))
+    return TimeIndex(first_day, np.column_stack(columns))
+
+
+def get_time_index(dataset, filters) -> TimeIndex:
+    """Índice das linhas que passam pelos filtros de lista (o período é ignorado)."""
+    list_filters = dict(filters or {}, start_date=None, end_date=None)
+    key = filters_key(list_filters)
+    if not any(key):
+        return dataset.derive('time_index', lambda ds: build_time_index(ds.df))
+    return get_result_cache().get_or_compute(
+        'time_index', dataset.version, key,
+        lambda: build_time_index(get_filtered_frame(dataset, list_filters)),
+        dumps=lambda index: dump_array(index.to_array()),
+        loads=lambda raw: TimeIndex.from_array(load_array(raw))
+    )
+
+
+def comparison_period(start: date, end: date, mode: str):
+    """Período de comparação: o anterior de mesmo tamanho, ou as mesmas datas um ano antes."""
+    if mode == 'year':
+        def year_before(day):
+            try:
+                return day.replace(year=day.year - 1)
+            except ValueError:  # 29/02
+                return day.replace(year=day.year - 1, day=28)
+        return year_before(start), year_before(end)
+    length = (end - start).days + 1
+    return start - timedelta(days=length), start - timedelta(days=1)
+
+
+def period_comparison(dataset, filters, mode='previous') -> dict:
+    """
+    Totais do período filtrado e do período de comparação, com a variação percentual.
+    Sem período filtrado, compara o histórico inteiro (normalmente sem base anterior).
+    """
+    index = get_time_index(dataset, filters)
+    if filters.get('start_date') and filters.get('end_date'):
+        start, end = date.fromisoformat(filters['start_date']), date.fromisoformat(filters['end_date'])
+    else:
+        start, end = index.bounds()
+        if start is None:
+            return None
+    base_start, base_end = comparison_period(start, end, mode)
+    current = period_totals(dataset, filters, start, end, index)
+    base = period_totals(dataset, filters, base_start, base_end, index)
+    return {
+        'mode': mode,
+        'period': (start.isoformat(), end.isoformat()),
+        'base_period': (base_start.isoformat(), base_end.isoformat()),
+        'current': current,
+        'base': base,
+        'delta_pct': {measure: (current[measure] / base[measure] - 1) if base[measure] else None for measure in MEASURES},
+    }
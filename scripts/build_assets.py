@@ -0,0 +1,115 @@
+# scripts/build_assets.py
+"""
+Gera variantes leves das imagens de fundo e o CSS que as referencia.
+
+Para cada imagem de BACKGROUNDS, cria em assets/img/ versões redimensionadas em AVIF e WebP
+(uma por largura de VARIANT_WIDTHS) e escreve assets/backgrounds.css com:
+  - o PNG original como fallback (navegadores sem image-set);
+  - image-set() com AVIF, WebP e PNG, escolhido pelo navegador conforme o suporte;
+  - media queries servindo a variante menor em telas estreitas.
+Todas as URLs levam ?v=<hash do conteúdo>, o que habilita o cache imutável (logic/compression.py).
+
+Requer Pillow (apenas no build): pip install Pillow
+Uso: python scripts/build_assets.py
+"""
+import hashlib
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ASSETS_DIR = os.path.join(ROOT_DIR, 'assets')
+OUTPUT_DIR = os.path.join(ASSETS_DIR, 'img')
+CSS_PATH = os.path.join(ASSETS_DIR, 'backgrounds.css')
+
+# imagem original -> seletor CSS que a usa como fundo
+BACKGROUNDS = {
+    'background_principal.png': '.content-below-topbar',
+    'background_login.png': '.auth-container-background',
+}
+VARIANT_WIDTHS = [1920, 1280]
+FORMATS = [  # (extensão, formato Pillow, tipo MIME, opções de gravação)
+    ('avif', 'AVIF', 'image/avif', {'quality': 55}),
+    ('webp', 'WEBP', 'image/webp', {'quality': 78, 'method': 6}),
+]
+
+
+def _fingerprint(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:10]
+
+
+def _asset_url(path):
+    relative = os.path.relpath(path, ASSETS_DIR).replace(os.sep, '/')
+    return f"/assets/{relative}?v={_fingerprint(path)}"
+
+
+def build_variants(image_module, source_name):
+    """Gera as variantes de uma imagem e retorna {largura: [(url, mime), ...]}."""
+    source_path = os.path.join(ASSETS_DIR, source_name)
+    stem = os.path.splitext(source_name)[0]
+    image = image_module.open(source_path)
+    image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+    variants = {}
+    for width in VARIANT_WIDTHS:
+        width = min(width, image.width)
+        height = round(image.height * width / image.width)
+        resized = image if width == image.width else image.resize((width, height), image_module.LANCZOS)
+        urls = []
+        for extension, pillow_format, mime, options in FORMATS:
+            output_path = os.path.join(OUTPUT_DIR, f"{stem}-{width}.{extension}")
+            try:
+                resized.save(output_path, pillow_format, **options)
+            except (KeyError, OSError, ValueError) as e:
+                # Pillow sem suporte ao formato (ex.: AVIF): segue só com os demais
+                print(f"AVISO: {pillow_format} indisponível para {source_name}: {e}")
+                continue
+            urls.append((_asset_url(output_path), mime))
+            print(f"-> {os.path.relpath(output_path, ROOT_DIR)} ({os.path.getsize(output_path) / 1024:.0f} KB)")
+        variants[width] = urls
+    return variants
+
+
+def _background_rule(selector, fallback_url, urls):
+    image_set = ", ".join(f'url("{url}") type("{mime}")' for url, mime in urls)
+    return (
+        f"{selector} {{\n"
+        f"  background-image: url(\"{fallback_url}\");\n"
+        f"  background-image: image-set({image_set}, url(\"{fallback_url}\") type(\"image/png\"));\n"
+        f"}}\n"
+    )
+
+
+def render_css(all_variants):
+    lines = ["/* Gerado por scripts/build_assets.py - não editar à mão. */\n"]
+    widths = sorted(VARIANT_WIDTHS, reverse=True)
+    for source_name, selector in BACKGROUNDS.items():
+        fallback_url = _asset_url(os.path.join(ASSETS_DIR, source_name))
+        variants = all_variants[source_name]
+        largest = max(variants)
+        lines.append(_background_rule(selector, fallback_url, variants[largest]))
+        for width in widths[1:]:
+            if width in variants and width != largest:
+                lines.append(f"@media (max-width: {width}px) {{\n")
+                lines.append(_background_rule(selector, fallback_url, variants[width]))
+                lines.append("}\n")
+    return "".join(lines)
+
+
+def main():
+    try:
+        from PIL import Image
+    except ImportError:
+        print("ERRO: Pillow não está instalado. Rode `pip install Pillow` e tente novamente.")
+        return 1
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    all_variants = {name: build_variants(Image, name) for name in BACKGROUNDS}
+    with open(CSS_PATH, 'w', encoding='utf-8') as f:
+        f.write(render_css(all_variants))
+    print(f"CSS gerado em {os.path.relpath(CSS_PATH, ROOT_DIR)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
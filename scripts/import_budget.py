@@ -0,0 +1,98 @@
+# scripts/import_budget.py
+"""
+Relatório de tempo de import (estilo `python -X importtime`) com orçamento.
+
+Mede o cold start do handler serverless: importa o módulo alvo num processo novo,
+lista os pacotes mais caros e falha (exit 1) se o total passar do orçamento ou se
+algum módulo proibido (ex.: plotly.express) for importado no boot.
+
+Uso:
+    python scripts/import_budget.py                      # alvo 'app', orçamento padrão
+    python scripts/import_budget.py --budget-ms 1500 --top 15
+    python scripts/import_budget.py --forbid plotly.express --forbid openpyxl
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "3000"))
+DEFAULT_FORBIDDEN = ['plotly.express']
+
+# Formato das linhas: "import time:       123 |       4567 |   package.module"
+_LINE_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+
+def measure_imports(target):
+    """Importa `target` num interpretador novo e retorna [(módulo, self_us, cumulativo_us, nível)]."""
+    env = dict(os.environ)
+    env.setdefault("SCHEMA_CHECK_ON_BOOT", "0")  # mede só o import, sem ida ao banco
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao importar '{target}':\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        level = (len(indent) - 1) // 2
+        entries.append((module, int(self_us), int(cumulative_us), level))
+    return entries
+
+
+def summarize(entries, top, target):
+    """
+    Total = soma dos imports de nível 0. O ranking usa o custo cumulativo de cada pacote raiz
+    no ponto em que foi importado pela primeira vez (pacotes aninhados aparecem em ambos).
+    """
+    total_us = sum(cumulative_us for _, _, cumulative_us, level in entries if level == 0)
+    by_package = {}
+    for module, _, cumulative_us, _ in entries:
+        root = module.split('.')[0]
+        if root == target.split('.')[0]:
+            continue
+        by_package[root] = max(by_package.get(root, 0), cumulative_us)
+    ranking = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return total_us, ranking
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', default='app', help="Módulo a importar (padrão: app)")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help="Orçamento total em ms")
+    parser.add_argument('--top', type=int, default=10, help="Quantos pacotes listar")
+    parser.add_argument('--forbid', action='append', default=None,
+                        help="Módulo que não pode ser importado no boot (repetível)")
+    args = parser.parse_args(argv)
+    forbidden = args.forbid if args.forbid is not None else DEFAULT_FORBIDDEN
+
+    entries = measure_imports(args.target)
+    total_us, ranking = summarize(entries, args.top, args.target)
+
+    print(f"Import de '{args.target}': {total_us / 1000:.1f} ms (orçamento {args.budget_ms:.0f} ms)")
+    print(f"{'pacote':<32}{'cumulativo (ms)':>18}")
+    for package, cumulative_us in ranking:
+        print(f"{package:<32}{cumulative_us / 1000:>18.1f}")
+
+    failures = []
+    if total_us / 1000 > args.budget_ms:
+        failures.append(f"orçamento estourado: {total_us / 1000:.1f} ms > {args.budget_ms:.0f} ms")
+    imported = {module for module, _, _, _ in entries}
+    for module in forbidden:
+        if module in imported:
+            failures.append(f"módulo proibido importado no boot: {module}")
+
+    for failure in failures:
+        print(f"FALHA: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+# scripts/prune_archive.py
+"""
+Limpeza do arquivo de histórico (logic/archive.py), fora dos workers do painel.
+
+Remove as versões do arquivo que não são a CURRENT e que nenhum worker lê há mais que
+ARCHIVE_KEEP_SECONDS (ou --keep-hours), além de montagens interrompidas (.build-*).
+Os workers nunca apagam partições: rode este script por cron ou no deploy.
+
+Uso:
+    python scripts/prune_archive.py                    # HISTORY_ARCHIVE_DIR do ambiente
+    python scripts/prune_archive.py --dir /dados/historico --keep-hours 48
+    python scripts/prune_archive.py --dry-run
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from logic.archive import HISTORY_ARCHIVE_DIR, ARCHIVE_KEEP_SECONDS, current_version, prune_archive  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', default=HISTORY_ARCHIVE_DIR, help="diretório do arquivo (padrão: HISTORY_ARCHIVE_DIR)")
+    parser.add_argument('--keep-hours', type=float, default=ARCHIVE_KEEP_SECONDS / 3600,
+                        help="idade mínima (sem uso) das versões removidas")
+    parser.add_argument('--dry-run', action='store_true', help="só lista o que seria removido")
+    args = parser.parse_args()
+
+    if not args.dir or not os.path.isdir(args.dir):
+        print("Nenhum arquivo de histórico encontrado (defina HISTORY_ARCHIVE_DIR ou use --dir).")
+        return 1
+    keep_seconds = args.keep_hours * 3600
+    print(f"Versão atual: {current_version(args.dir) or '(nenhuma)'}")
+    if args.dry_run:
+        current = current_version(args.dir)
+        now = time.time()
+        for entry in sorted(os.scandir(args.dir), key=lambda entry: entry.name):
+            if entry.is_dir() and entry.name != current and now - entry.stat().st_mtime > keep_seconds:
+                print(f"  removeria {entry.path}")
+        return 0
+    removed = prune_archive(args.dir, keep_seconds)
+    for path in removed:
+        print(f"  removido {path}")
+    print(f"{len(removed)} diretório(s) removido(s).")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,33 @@
+# tests/conftest.py
+"""Ambiente dos testes: cache só em memória, dataset sintético pequeno (bench/synthetic.py)."""
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+os.environ.setdefault("CACHE_BACKEND", "none")
+os.environ.setdefault("SCHEMA_CHECK_ON_BOOT", "0")
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def synthetic_dir(tmp_path, monkeypatch):
+    """Diretório LOCAL_DATA_DIR com um dataset sintético pequeno."""
+    from bench.synthetic import write_dataset
+    directory = write_dataset(str(tmp_path / 'data'), 2000)
+    monkeypatch.setenv("LOCAL_DATA_DIR", directory)
+    return directory
+
+
+@pytest.fixture
+def cold_dataset(synthetic_dir):
+    """Dataset recém-preparado, sem nenhuma estrutura derivada calculada."""
+    from logic.data_processing import fetch_source_frames, prepare_data
+    from logic.dataset import Dataset, compute_version
+    from logic.shifts import fetch_shift_frames, build_shift_table
+
+    df_shifts, df_clients = fetch_shift_frames(synthetic_dir)
+    df = prepare_data(*fetch_source_frames(synthetic_dir), shift_table=build_shift_table(df_shifts, df_clients),
+                      df_clients=df_clients)
+    return Dataset(df, compute_version(df))
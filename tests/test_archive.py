@@ -0,0 +1,51 @@
+# tests/test_archive.py
+import os
+import time
+from datetime import date
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from logic import archive  # noqa: E402
+
+
+def make_trips(days, volume=1.0):
+    moments = pd.to_datetime(days)
+    return pd.DataFrame({'Data_Hora': moments, 'Volume': [volume] * len(moments), 'Placa': ['AAA1A11'] * len(moments)})
+
+
+def test_each_version_is_written_once_and_never_pruned_by_writers(tmp_path):
+    root = str(tmp_path)
+    first = make_trips(['2024-01-05', '2024-02-10', '2024-02-11'])
+    assert archive.write_archive(first, 'aa', root)
+    partitions = sorted(os.listdir(os.path.join(root, 'aa')))
+    assert partitions == ['trips-2024-01.parquet', 'trips-2024-02.parquet']
+    written_at = os.stat(os.path.join(root, 'aa', partitions[0])).st_mtime_ns
+
+    # Outro worker carregando os mesmos dados não regrava nada
+    assert archive.write_archive(first, 'aa', root)
+    assert os.stat(os.path.join(root, 'aa', partitions[0])).st_mtime_ns == written_at
+
+    # Nova versão: diretório novo; a anterior continua legível por quem ainda a usa
+    assert archive.write_archive(make_trips(['2024-03-01']), 'bb', root)
+    assert archive.current_version(root) == 'bb'
+    old = archive.open_archive(root, 'aa', date(2024, 12, 1))
+    totals = old.totals({}, '2024-02-01', '2024-02-29')
+    assert (totals['trips'], totals['volume'], totals['vehicles']) == (2, 2.0, 1)
+    assert not [name for name in os.listdir(root) if name.startswith('.build-')]
+
+
+def test_prune_keeps_current_and_recently_used_versions(tmp_path):
+    root = str(tmp_path)
+    for version in ('aa', 'bb', 'cc'):
+        assert archive.write_archive(make_trips(['2024-01-05']), version, root)
+    past = time.time() - 3 * 86400
+    for version in ('aa', 'bb', 'cc'):
+        os.utime(os.path.join(root, version), (past, past))
+    archive.open_archive(root, 'bb', date(2024, 12, 1))  # 'bb' em uso por um worker
+
+    removed = archive.prune_archive(root, keep_seconds=86400)
+    assert [os.path.basename(path) for path in removed] == ['aa']
+    assert sorted(name for name in os.listdir(root) if not name.startswith('.')) == ['CURRENT', 'bb', 'cc']
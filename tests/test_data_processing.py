@@ -0,0 +1,34 @@
+# tests/test_data_processing.py
+import numpy as np
+import pandas as pd
+
+from logic.clients import UNMAPPED_CLIENT_LABEL
+from logic.data_processing import prepare_data
+from logic.shifts import OFF_SHIFT_LABEL, build_shift_table
+
+
+def test_trip_destinations_are_standardized_like_pricing_clients_and_shifts():
+    df_volume = pd.DataFrame({
+        'TAG': ['T1', 'T2', 'T3', 'T4'],
+        'Data': ['2024-01-10', '2024-01-10', '2024-01-10', '2024-01-10'],
+        'Hora': ['08:00:00', '09:00:00', '10:00:00', '23:00:00'],
+        'Volume': ['10', '20', '30', '40'],
+        'Placa': ['AAA1A11', 'AAA1A11', 'BBB2B22', 'BBB2B22'],
+        'Destino': [' porto ', 'Porto', None, 'PORTO'],
+        'Material': ['BRITA', 'BRITA', 'AREIA', 'AREIA'],
+    })
+    df_frota = pd.DataFrame({'Placa': ['AAA1A11', 'BBB2B22'], 'Empresa': ['X', 'Y']})
+    df_pricing = pd.DataFrame({'id': [1], 'destination': ['Porto '], 'price_per_ton': ['2,5'],
+                               'start_date': ['2024-01-01'], 'end_date': ['2024-01-31']})
+    df_clients = pd.DataFrame({'id': [1], 'client_name': ['Cliente Porto'], 'destination': ['porto']})
+    df_shifts = pd.DataFrame({'id': [1], 'client_name': ['Cliente Porto'], 'shift_name': ['Dia'],
+                              'start_time': '07:00', 'end_time': '19:00'})
+
+    df = prepare_data(df_volume, df_frota, df_pricing, shift_table=build_shift_table(df_shifts, df_clients),
+                      df_clients=df_clients)
+
+    assert df['Destino'].tolist()[:2] == ['PORTO', 'PORTO'] and pd.isna(df['Destino'].iloc[2])
+    assert df['Valor Bruto'].tolist() == [2.5, 2.5, 0.0, 2.5]
+    assert np.allclose(df['Valor Bruto Total'], [25.0, 50.0, 0.0, 100.0])
+    assert df['Cliente'].astype(str).tolist() == ['Cliente Porto', 'Cliente Porto', UNMAPPED_CLIENT_LABEL, 'Cliente Porto']
+    assert list(df['Turno'])[:2] == ['Dia', 'Dia'] and df['Turno'].iloc[3] == OFF_SHIFT_LABEL
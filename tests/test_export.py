@@ -0,0 +1,26 @@
+# tests/test_export.py
+
+import pytest
+from werkzeug.exceptions import BadRequest
+
+from logic.export import export_href, filters_from_query
+
+
+@pytest.mark.parametrize('raw', [
+    '{"start_date": "2024-13-45", "end_date": "2024-01-31"}',
+    '{"start_date": "ontem", "end_date": "2024-01-31"}',
+    '{"start_date": "2024-01-01", "end_date": ["2024-01-31"]}',
+    '{"destinos": 5}',
+    '[1, 2]',
+    'não é json',
+])
+def test_invalid_filters_are_a_bad_request(raw):
+    with pytest.raises(BadRequest):
+        filters_from_query(raw)
+
+
+def test_valid_filters_round_trip_through_the_href():
+    filters = filters_from_query('{"start_date": "2024-01-01", "end_date": "2024-01-31", "destinos": ["PORTO"]}')
+    assert (filters['start_date'], filters['end_date'], filters['destinos']) == ('2024-01-01', '2024-01-31', ['PORTO'])
+    href = export_href('matrix', 'csv', filters, 'week')
+    assert href.startswith('/export/matrix.csv?filters=') and href.endswith('&grain=week')
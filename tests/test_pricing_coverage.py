@@ -0,0 +1,135 @@
+# tests/test_pricing_coverage.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from logic.pricing_coverage import covering_periods, lookup_interval_prices
+
+# Destino 0: A [1, 100] contém B [10, 20] e C [15, 30] (C sobrepõe B); D [50, 60] dentro de A.
+# Destino 1: E [10, 20]. Fora de ordem de propósito.
+PRICE_CODES = np.array([0, 1, 0, 0, 0])
+START_DAYS = np.array([15, 10, 1, 50, 10])
+END_DAYS = np.array([30, 20, 100, 60, 20])
+PERIODS = {'A': 2, 'B': 4, 'C': 0, 'D': 3, 'E': 1}
+
+
+def brute_force(trip_codes, trip_days, price_codes, start_days, end_days):
+    """Período de início mais recente do destino que contém o dia (empate: o último na entrada)."""
+    result = np.full(len(trip_days), -1)
+    for i, (code, day) in enumerate(zip(trip_codes, trip_days)):
+        best = None
+        for j in range(len(start_days)):
+            if price_codes[j] == code and start_days[j] <= day <= end_days[j]:
+                if best is None or start_days[j] >= start_days[best]:
+                    best = j
+        result[i] = -1 if best is None else best
+    return result
+
+
+def test_covering_periods_nested_and_overlapping():
+    cases = [  # (destino, dia, período esperado)
+        (0, 0, None), (0, 5, 'A'), (0, 12, 'B'), (0, 17, 'C'), (0, 20, 'C'), (0, 25, 'C'),
+        (0, 31, 'A'), (0, 55, 'D'), (0, 61, 'A'), (0, 100, 'A'), (0, 101, None),
+        (1, 9, None), (1, 10, 'E'), (1, 20, 'E'), (1, 25, None), (-1, 15, None),
+    ]
+    trip_codes = np.array([code for code, _, _ in cases])
+    trip_days = np.array([day for _, day, _ in cases])
+    expected = [PERIODS[name] if name else -1 for _, _, name in cases]
+    assert covering_periods(trip_codes, trip_days, PRICE_CODES, START_DAYS, END_DAYS).tolist() == expected
+
+
+def test_covering_periods_matches_brute_force():
+    rng = np.random.default_rng(7)
+    for _ in range(50):
+        n_periods = int(rng.integers(0, 12))
+        price_codes = rng.integers(0, 3, n_periods)
+        start_days = rng.integers(0, 60, n_periods)
+        end_days = start_days + rng.integers(0, 40, n_periods)
+        trip_codes = rng.integers(-1, 3, 200)
+        trip_days = rng.integers(-5, 110, 200)
+        np.testing.assert_array_equal(
+            covering_periods(trip_codes, trip_days, price_codes, start_days, end_days),
+            brute_force(trip_codes, trip_days, price_codes, start_days, end_days),
+        )
+
+
+def test_lookup_interval_prices_uses_the_covering_period():
+    pricing = pd.DataFrame({
+        'destino': ['PORTO', 'PORTO', 'PORTO', 'USINA'],
+        'start_date': ['2024-01-01', '2024-01-10', '2024-01-15', '2024-01-01'],
+        'end_date': ['2024-03-31', '2024-01-20', '2024-01-31', '2024-01-05'],
+        'valor_bruto': [10.0, 20.0, 30.0, 5.0],
+    })
+    destinos = pd.Series(['PORTO', 'PORTO', 'PORTO', 'PORTO', 'USINA', 'USINA', 'PEDREIRA'])
+    days = pd.to_datetime(['2024-01-05 00:00', '2024-01-12 00:00', '2024-01-18 00:00', '2024-02-01 00:00',
+                           '2024-01-05 23:00', '2024-01-06 00:00', '2024-01-05 00:00']).to_numpy()
+    prices = lookup_interval_prices(destinos, days, pricing)
+    assert prices.tolist() == [10.0, 20.0, 30.0, 10.0, 5.0, 0.0, 0.0]
+
+
+def coverage_scenario():
+    from logic.pricing_coverage import build_trip_days, pricing_coverage
+    trips = pd.DataFrame([
+        ('PORTO', '2023-12-31 10:00', 1.0),   # antes do primeiro período
+        ('PORTO', '2024-01-03 10:00', 2.0),   # coberto
+        ('PORTO', '2024-01-25 10:00', 4.0),   # buraco 21/01 a 31/01
+        ('PORTO', '2024-01-26 08:00', 5.0),
+        ('PORTO', '2024-01-26 09:00', 5.0),
+        ('PORTO', '2024-02-15 10:00', 16.0),  # depois do último período
+        ('USINA', '2024-01-11 10:00', 32.0),  # coberto
+        ('USINA', '2024-01-13 10:00', 64.0),  # depois do único período
+        ('PEDREIRA', '2024-01-05 10:00', 128.0),  # destino sem nenhum preço
+    ], columns=['Destino', 'Data_Hora', 'Volume']).assign(Data_Hora=lambda df: pd.to_datetime(df['Data_Hora']))
+    pricing = pd.DataFrame([
+        (1, 'PORTO', 10.0, '2024-01-01', '2024-01-10'),
+        (2, 'Porto ', 11.0, '2024-01-05', '2024-01-15'),  # sobrepõe o 1
+        (3, 'PORTO', 12.0, '2024-01-16', '2024-01-20'),   # encosta no 2
+        (4, 'PORTO', 13.0, '2024-02-01', '2024-02-10'),
+        (5, 'USINA', 9.0, '2024-01-10', '2024-01-12'),
+    ], columns=['id', 'destination', 'price_per_ton', 'start_date', 'end_date'])
+    return pricing_coverage(build_trip_days(trips), pricing)
+
+
+def test_coverage_gaps_are_reported_with_their_limits():
+    report = coverage_scenario()
+    gaps = report['gaps'][['Destino', 'Viagens', 'Volume', 'Sem Preço Desde', 'Sem Preço Até',
+                           'Primeira Viagem', 'Última Viagem', 'Sem Nenhum Preço']]
+    assert gaps.values.tolist() == [
+        ['PEDREIRA', 1, 128.0, '-', '-', '05/01/2024', '05/01/2024', True],
+        ['USINA', 1, 64.0, '13/01/2024', '-', '13/01/2024', '13/01/2024', False],
+        ['PORTO', 1, 16.0, '11/02/2024', '-', '15/02/2024', '15/02/2024', False],
+        ['PORTO', 3, 14.0, '21/01/2024', '31/01/2024', '25/01/2024', '26/01/2024', False],
+        ['PORTO', 1, 1.0, '-', '31/12/2023', '31/12/2023', '31/12/2023', False],
+    ]
+    assert (report['trips'], report['uncovered_trips'], report['uncovered_volume']) == (9, 7, 223.0)
+    assert report['uncovered_share'] == pytest.approx(7 / 9)
+
+
+def test_overlapping_and_adjacent_periods_are_reported():
+    overlaps = coverage_scenario()['overlaps']
+    assert overlaps.values.tolist() == [
+        [2, 'PORTO', '05/01/2024', '15/01/2024', '10/01/2024', 'Sobreposição'],
+        [3, 'PORTO', '16/01/2024', '20/01/2024', '15/01/2024', 'Adjacente'],
+    ]
+
+
+def test_coverage_agrees_with_the_load_pricing_rule():
+    # Um par (destino, dia) é descoberto exatamente quando a carga o deixa com preço 0
+    from logic.pricing_coverage import build_trip_days, pricing_coverage
+    rng = np.random.default_rng(11)
+    for _ in range(20):
+        n_periods = int(rng.integers(1, 10))
+        starts = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 60, n_periods), unit='D')
+        pricing = pd.DataFrame({
+            'id': np.arange(n_periods), 'destination': rng.choice(['A', 'B'], n_periods), 'price_per_ton': 1.0,
+            'start_date': starts, 'end_date': starts + pd.to_timedelta(rng.integers(0, 20, n_periods), unit='D'),
+        })
+        trips = pd.DataFrame({
+            'Destino': rng.choice(['A', 'B', 'C'], 300),
+            'Data_Hora': pd.Timestamp('2023-12-25') + pd.to_timedelta(rng.integers(0, 90 * 24, 300), unit='h'),
+            'Volume': 1.0,
+        })
+        prices = lookup_interval_prices(trips['Destino'], trips['Data_Hora'].to_numpy(),
+                                        pricing.rename(columns={'destination': 'destino', 'price_per_ton': 'valor_bruto'}))
+        report = pricing_coverage(build_trip_days(trips), pricing)
+        assert report['uncovered_trips'] == int((prices == 0).sum())
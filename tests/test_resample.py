@@ -0,0 +1,44 @@
+# tests/test_resample.py
+import numpy as np
+import pandas as pd
+
+from logic import resample
+from logic.resample import build_matrix_cells, cells_from_bytes, cells_to_bytes, matrix_from_cells
+
+
+def make_trips():
+    return pd.DataFrame({
+        'Data_Hora': pd.to_datetime(['2024-01-01 08:10', '2024-01-01 08:40', '2024-01-02 09:00',
+                                     '2024-01-08 10:00', '2024-02-01 07:00']),
+        'TAG': ['B', 'B', 'A', 'B', None],
+        'Placa': ['P1', 'P1', 'P2', 'P2', 'P1'],
+        'Volume': [10.0, 5.0, 7.0, np.nan, 3.0],
+    })
+
+
+def test_cells_round_trip_through_the_cache_format():
+    cells = build_matrix_cells(make_trips())
+    restored = cells_from_bytes(cells_to_bytes(cells))
+    assert list(restored.tags) == ['A', 'B']
+    for name in ('hours', 'tag_codes', 'plate_codes', 'volume'):
+        np.testing.assert_array_equal(getattr(restored, name), getattr(cells, name))
+    pd.testing.assert_frame_equal(matrix_from_cells(restored, 'week'), matrix_from_cells(cells, 'week'))
+
+
+def test_matrix_grains_from_cells():
+    cells = build_matrix_cells(make_trips())
+    day = matrix_from_cells(cells, 'day')
+    assert day[['TAG', 'Volume_Total', 'N_Viagens']].values.tolist() == [['B', 15.0, 1], ['A', 7.0, 1], ['B', 0.0, 1]]
+    month = matrix_from_cells(cells, 'month')
+    assert month[['Mês', 'TAG', 'Volume_Total', 'N_Viagens']].values.tolist() == [['2024-01', 'A', 7.0, 1], ['2024-01', 'B', 15.0, 2]]
+
+
+def test_grain_switch_with_filters_does_not_rebuild_cells(cold_dataset, monkeypatch):
+    from logic.filters import normalize_filters
+    filters = normalize_filters(destinos=[cold_dataset.df['Destino'].iloc[0]])
+    builds = []
+    original = resample.build_matrix_cells
+    monkeypatch.setattr(resample, 'build_matrix_cells', lambda dff: builds.append(len(dff)) or original(dff))
+    for grain in ('day', 'week', 'month', 'hour'):
+        assert not resample.matrix_table(cold_dataset, filters, grain).empty
+    assert len(builds) == 1
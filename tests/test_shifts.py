@@ -0,0 +1,54 @@
+# tests/test_shifts.py
+import numpy as np
+import pandas as pd
+
+from logic.shifts import (OFF_SHIFT_LABEL, assign_shifts, build_shift_table, find_overlap, shift_minutes,
+                          shift_segments)
+
+
+def minutes_of(day, times):
+    return pd.to_datetime([f"{day} {time}" for time in times]).to_numpy()
+
+
+def test_shift_segments_split_at_midnight():
+    assert shift_segments('08:00', '17:00') == [(480, 1020)]
+    assert shift_segments('22:00', '06:00') == [(1320, 1440), (0, 360)]
+    assert shift_segments('18:00', '00:00') == [(1080, 1440)]
+    assert shift_segments('06:00', '06:00') == [(360, 1440), (0, 360)]  # 24h
+    assert shift_segments('00:00', '00:00') == [(0, 1440)]
+    assert shift_minutes('22:00', '06:00') == 480
+    assert shift_minutes('06:00', '06:00') == 1440
+
+
+def test_find_overlap_across_midnight():
+    shifts = [('Noite', '22:00', '06:00'), ('Dia', '08:00', '16:00')]
+    assert find_overlap(shifts, '05:00', '07:00') == 'Noite'
+    assert find_overlap(shifts, '23:30', '00:30') == 'Noite'
+    assert find_overlap(shifts, '06:00', '08:00') is None
+    assert find_overlap(shifts, '16:00', '22:00') is None
+
+
+def test_default_schedule_boundaries():
+    times = ['00:00', '05:59', '06:00', '17:59', '18:00', '23:59']
+    labels = assign_shifts(pd.Series(['QUALQUER'] * len(times)), minutes_of('2024-03-01', times), build_shift_table())
+    assert list(labels) == ['2º Turno', '2º Turno', '1º Turno', '1º Turno', '2º Turno', '2º Turno']
+
+
+def test_client_shift_crossing_midnight():
+    df_clients = pd.DataFrame({'id': [1], 'client_name': ['Cliente Porto'], 'destination': ['PORTO']})
+    df_shifts = pd.DataFrame({'id': [1, 2], 'client_name': ['Cliente Porto'] * 2, 'shift_name': ['Noite', 'Dia'],
+                              'start_time': ['22:00', '08:00'], 'end_time': ['06:00', '16:00']})
+    table = build_shift_table(df_shifts, df_clients)
+    times = ['21:59', '22:00', '00:30', '05:59', '06:00', '08:00', '15:59', '16:00']
+    destinos = pd.Series(['PORTO'] * len(times) + ['OUTRO'])
+    moments = np.concatenate([minutes_of('2024-03-01', times), minutes_of('2024-03-01', ['05:00'])])
+
+    labels = assign_shifts(destinos, moments, table)
+    assert list(labels) == [OFF_SHIFT_LABEL, 'Noite', 'Noite', 'Noite', OFF_SHIFT_LABEL, 'Dia', 'Dia', OFF_SHIFT_LABEL,
+                            '2º Turno']  # destinos sem cliente seguem a escala padrão
+
+    # Depois da meia-noite o trecho lembra quando o turno começou (22:00 do dia anterior)
+    positions = table.locate(table.trip_schedules(pd.Series(['PORTO', 'PORTO'])),
+                             moments[[1, 2]].astype('datetime64[m]').astype(np.int64))
+    assert table.segment_offsets[positions].tolist() == [0, 120]
+    assert table.segment_minutes[positions].tolist() == [480, 480]
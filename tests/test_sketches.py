@@ -0,0 +1,66 @@
+# tests/test_sketches.py
+import numpy as np
+
+from logic.sketches import BITSET_MAX_PLATES, HyperLogLog, PlateBitsets, build_plate_sketch
+
+
+def plate_labels(n):
+    return np.array([f"PLC{i:05d}" for i in range(n)], dtype=object)
+
+
+def test_bitsets_union_is_exact_across_cells_and_words():
+    # Célula 0: placas 0 e 1; célula 1: placas 1 e 70 (segunda palavra); célula 2: placa 70
+    sketch = PlateBitsets.build(np.array([0, 0, 0, 1, 1, 2]), np.array([0, 1, 1, 1, 70, 70]), 3, 100)
+    assert sketch.bits.shape == (3, 2)
+    assert sketch.count(np.array([True, False, False])) == 2
+    assert sketch.count(np.array([False, True, True])) == 2
+    assert sketch.count(np.array([True, True, False])) == 3
+    assert sketch.count(np.array([True, True, True])) == 3
+    assert sketch.count(np.array([False, False, False])) == 0
+
+
+def test_sketch_is_exact_up_to_the_bitset_limit():
+    rng = np.random.default_rng(3)
+    n_plates = BITSET_MAX_PLATES
+    cells = rng.integers(0, 30, 20_000)
+    plates = rng.integers(-1, n_plates, 20_000)  # -1 = viagem sem placa
+    sketch = build_plate_sketch(cells, plates, plate_labels(n_plates), 30)
+    assert sketch.exact
+    for mask in (np.zeros(30, dtype=bool), np.arange(30) < 10, np.arange(30) % 3 == 0, np.ones(30, dtype=bool)):
+        expected = len(np.unique(plates[(plates >= 0) & mask[cells]]))
+        assert sketch.count(mask) == expected
+
+
+def test_hyperloglog_union_stays_within_error_bounds():
+    rng = np.random.default_rng(5)
+    n_plates = BITSET_MAX_PLATES + 3000
+    cells = rng.integers(0, 40, 60_000)
+    plates = rng.integers(0, n_plates, 60_000)
+    sketch = build_plate_sketch(cells, plates, plate_labels(n_plates), 40)
+    assert isinstance(sketch, HyperLogLog)
+    tolerance = 3 * 1.04 / np.sqrt(2 ** sketch.precision)  # três erros padrão
+    for mask in (np.arange(40) < 5, np.arange(40) % 2 == 0, np.ones(40, dtype=bool)):
+        expected = len(np.unique(plates[mask[cells]]))
+        assert abs(sketch.count(mask) - expected) <= tolerance * expected
+
+    # União = máximo por registrador: contar a união das metades é contar tudo
+    halves = [np.arange(40) < 20, np.arange(40) >= 20]
+    assert sketch.count(halves[0] | halves[1]) == sketch.count(np.ones(40, dtype=bool))
+
+
+def test_hyperloglog_small_cardinality_correction():
+    sketch = HyperLogLog.build(np.zeros(10, dtype=np.int64), np.arange(10), plate_labels(10), 1)
+    assert abs(sketch.count(np.array([True])) - 10) <= 1
+    assert sketch.count(np.array([False])) == 0
+
+
+def test_cube_distinct_vehicles_match_the_filtered_rows(cold_dataset):
+    from logic.cube import distinct_vehicles
+    from logic.filters import apply_filters, normalize_filters
+
+    df = cold_dataset.df
+    days = sorted(df['Data_Apenas'].unique())
+    for filters in (normalize_filters(),
+                    normalize_filters(days[3], days[10]),
+                    normalize_filters(days[0], days[-1], destinos=[df['Destino'].iloc[0]])):
+        assert distinct_vehicles(cold_dataset, filters) == apply_filters(df, filters)['Placa'].nunique()